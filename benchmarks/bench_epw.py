@@ -0,0 +1,47 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+EPWの読み出しのベンチマーク
+"""
+
+import numpy as np
+from weapy.epwfile import EpwFile, EPW_LABELS, EPW_STRING_LABELS, read_epw
+from weapy.epwbatch import load_epw_files
+from .fixtures import fixture
+
+
+class EpwParse:
+
+    def setup(self):
+        self.filename = fixture('epw')
+        self.labels = [label for label in EPW_LABELS if label not in EPW_STRING_LABELS]
+
+    def time_epwfile(self):
+        EpwFile(self.filename).ambient_temperatures
+
+    def time_epwfile_as_array(self):
+        EpwFile(self.filename, as_array=True).ambient_temperatures
+
+    def time_read_epw_all_columns(self):
+        read_epw(self.filename, self.labels)
+
+    def time_read_epw_float32(self):
+        read_epw(self.filename, dtype=np.float32)
+
+    def time_data_frame(self):
+        EpwFile(self.filename).wea_data
+
+
+class EpwBatch:
+    timeout = 300
+
+    def setup(self):
+        self.folder = fixture('epw_dir')
+
+    def time_load_epw_files_serial(self):
+        load_epw_files(self.folder, max_workers=1)
+
+    def time_load_epw_files_pool(self):
+        load_epw_files(self.folder)
@@ -0,0 +1,34 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+相対湿度の計算のベンチマーク（全地点分の配列）
+"""
+
+import numpy as np
+from weapy.weafile import GetPws, calc_relative_humidity
+from weapy.weatherdata import HOURS_PER_YEAR
+from .fixtures import STATIONS, ea_values
+
+
+class RelativeHumidity:
+
+    def setup(self):
+        tamb, abs_hum = ea_values(STATIONS)[:2]
+        self.tamb = tamb
+        self.abs_hum = abs_hum / 1000.0
+        self.elevations = np.linspace(-3.0, 1350.0, STATIONS)[:, np.newaxis]
+
+    def time_calc_relative_humidity(self):
+        calc_relative_humidity(self.abs_hum, self.tamb, self.elevations)
+
+    def time_saturation_pressure(self):
+        GetPws(self.tamb)
+
+    def time_single_station(self):
+        calc_relative_humidity(self.abs_hum[0], self.tamb[0], 6.0)
+
+    def track_values(self):
+        return STATIONS * HOURS_PER_YEAR
+    track_values.unit = 'values'
@@ -0,0 +1,76 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+拡張アメダス気象データ(EA, EA2020)の読み出しのベンチマーク
+"""
+
+import numpy as np
+from weapy.weafile import WeaFile
+from weapy.wea2file import Wea2File
+from weapy.weamap import WeaMap, load_stations
+from weapy.stationindex import station_table
+from .fixtures import fixture, STATIONS
+
+
+class SingleStation:
+    """1地点の読み出し"""
+    params = ['ea', 'ea2020']
+    param_names = ['format']
+
+    def setup(self, kind):
+        self.filename = fixture(kind)
+        self.no = min(363, STATIONS)
+
+    def _open(self, kind):
+        if kind == 'ea':
+            return WeaFile(self.filename, self.no, 6.0)
+        return Wea2File(self.filename, self.no)
+
+    def time_open(self, kind):
+        self._open(kind)
+
+    def time_all_elements(self, kind):
+        wea = self._open(kind)
+        wea.wea_data
+        wea.relative_humidities
+
+    def time_temperature_only(self, kind):
+        self._open(kind).ambient_temperatures
+
+
+class AllStations:
+    """全地点の一括読み出し"""
+    params = ['ea', 'ea2020']
+    param_names = ['format']
+    timeout = 300
+
+    def setup(self, kind):
+        self.filename = fixture(kind)
+        self.elevations = 6.0 if kind == 'ea' else None
+
+    def time_load_stations(self, kind):
+        load_stations(self.filename, elevations=self.elevations)
+
+    def time_load_stations_float32(self, kind):
+        load_stations(self.filename, elevations=self.elevations, dtype=np.float32)
+
+    def peakmem_load_stations(self, kind):
+        load_stations(self.filename, elevations=self.elevations)
+
+    def peakmem_load_stations_float32(self, kind):
+        load_stations(self.filename, elevations=self.elevations, dtype=np.float32)
+
+    def time_weamap_values(self, kind):
+        WeaMap(self.filename).values(0)
+
+
+class StationIndex:
+    """EA2020の地点情報の一覧"""
+
+    def setup(self):
+        self.eamap = WeaMap(fixture('ea2020'))
+
+    def time_station_table(self):
+        station_table(self.eamap)
@@ -0,0 +1,47 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+Type99形式の出力のベンチマーク
+"""
+
+import io
+import shutil
+import tempfile
+from weapy.wea2file import Wea2File
+from weapy.weamap import load_stations, EA2020_ELEMENTS
+from weapy import type99
+from .fixtures import fixture, STATIONS
+
+
+class Type99Write:
+
+    def setup(self):
+        self.wea = Wea2File(fixture('ea2020'), min(363, STATIONS))
+        self.data = type99.type99_data(self.wea)
+        self.fmt = ['%.1f', '%.3f', '%.3f', '%.3f', '%.1f', '%.1f', '%.1f', '%.2f']
+
+    def time_format_columns(self):
+        type99.format_columns(self.data)
+
+    def time_format_columns_fmt(self):
+        type99.format_columns(self.data, fmt=self.fmt)
+
+    def time_write_type99(self):
+        type99.write_type99(io.StringIO(), self.wea, self.wea.latitude, self.wea.longitude)
+
+
+class Type99Stations:
+    """複数地点の出力（32地点）"""
+    timeout = 300
+
+    def setup(self):
+        self.data, self.stations = load_stations(fixture('ea2020'), range(1, min(32, STATIONS) + 1))
+        self.folder = tempfile.mkdtemp(prefix='weapy-bench-type99-')
+
+    def teardown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def time_write_type99_stations(self):
+        type99.write_type99_stations(self.folder, self.data, EA2020_ELEMENTS, self.stations)
@@ -0,0 +1,63 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+ベンチマーク用の合成データ(EA, EA2020, EPW)を用意する
+
+weapy.syntheticで作成した合成データを一時フォルダへ保存して使用する。
+地点数は環境変数 WEAPY_BENCH_STATIONS で変更できる。
+"""
+
+import os
+import tempfile
+from weapy import synthetic
+from weapy.stationindex import set_ea_stations
+
+STATIONS = int(os.environ.get('WEAPY_BENCH_STATIONS', synthetic.STATION_COUNT))   #地点数
+EPW_FILES = int(os.environ.get('WEAPY_BENCH_EPW_FILES', 8))     #EPWのファイル数
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), 'weapy-bench')
+
+
+def ea_values(stations, seed=0):
+    """
+    EAの気象要素の値（換算前の単位）, shape (地点, 8760)の配列のリスト
+    """
+    return synthetic.synthetic_values(synthetic.synthetic_stations(stations, seed), seed)
+
+
+def fixture(kind):
+    """
+    合成データのファイル名を返す（無ければ作成する）
+
+    EAの場合は合成データの地点情報をstationindex.set_ea_stationsで設定する
+
+    Parameters
+    ----------
+    kind : str
+    'ea', 'ea2020', 'epw', 'epw_dir'(EPW_FILES個のEPWのフォルダ)
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    if kind == 'epw_dir':
+        folder = os.path.join(FIXTURE_DIR, 'epw')
+        os.makedirs(folder, exist_ok=True)
+        for i in range(EPW_FILES):
+            filename = os.path.join(folder, 'site{0:03d}.epw'.format(i))
+            if not os.path.exists(filename):
+                synthetic.write_epw(filename, seed=i, city='Site{0}'.format(i))
+        return folder
+
+    names = {'ea': 'ea_{0}.wea', 'ea2020': 'ea2020_{0}.wea2', 'epw': 'synthetic.epw'}
+    filename = os.path.join(FIXTURE_DIR, names[kind].format(STATIONS))
+    if kind == 'ea':
+        set_ea_stations(synthetic.synthetic_stations(STATIONS))
+    if not os.path.exists(filename):
+        tmp = filename + '.tmp'
+        if kind == 'epw':
+            synthetic.write_epw(tmp)
+        elif kind == 'ea':
+            synthetic.write_ea(tmp, STATIONS)
+        else:
+            synthetic.write_ea2020(tmp, STATIONS)
+        os.replace(tmp, filename)   #並列に実行されたベンチマークが作成途中のファイルを読まないように
+    return filename
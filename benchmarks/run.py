@@ -0,0 +1,97 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+asvを使用せずにベンチマークを実行する簡易ランナー
+
+python -m benchmarks.run [-k 名前の一部] [-o results.json] [--compare 前回のresults.json]
+
+time_* の所要時間(最小値)を計測して表示する。-oで結果をweapyのバージョンと共にjsonへ保存し、
+--compareで保存した結果との比を表示する。バージョン毎の結果の蓄積、グラフはasv(asv.conf.json)を使用する。
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import sys
+import timeit
+
+import weapy
+
+
+def _benchmarks(pattern=None):
+    """(名前, クラス, メソッド名, パラメーター) を列挙する"""
+    package = os.path.dirname(__file__)
+    for info in pkgutil.iter_modules([package]):
+        if not info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.' + info.name)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            params = getattr(cls, 'params', [])
+            if params and not isinstance(params[0], (list, tuple)):
+                params = [params]
+            for method in sorted(name for name in dir(cls) if name.startswith('time_')):
+                for values in itertools.product(*params):
+                    name = '{0}.{1}.{2}'.format(info.name, class_name, method)
+                    if values:
+                        name += '({0})'.format(', '.join(map(str, values)))
+                    if pattern is None or pattern in name:
+                        yield name, cls, method, values
+
+
+def run(pattern=None, repeat=5):
+    """
+    ベンチマークを実行して {名前: 所要時間[s]} を返す
+    """
+    results = {}
+    for name, cls, method, values in _benchmarks(pattern):
+        bench = cls()
+        if hasattr(bench, 'setup'):
+            bench.setup(*values)
+        func = getattr(bench, method)
+        try:
+            number, _ = timeit.Timer(lambda: func(*values)).autorange()
+            times = timeit.Timer(lambda: func(*values)).repeat(repeat, number)
+            results[name] = min(times) / number
+        finally:
+            if hasattr(bench, 'teardown'):
+                bench.teardown(*values)
+        print('{0:<70} {1:>12.6f} s'.format(name, results[name]), flush=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='weapyのベンチマークを実行する')
+    parser.add_argument('-k', dest='pattern', default=None, help='名前に含まれる文字列で絞り込む')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='繰り返し回数')
+    parser.add_argument('-o', '--output', default=None, help='結果を保存するjsonファイル')
+    parser.add_argument('--compare', default=None, help='比較する前回の結果(json)')
+    args = parser.parse_args(argv)
+
+    results = run(args.pattern, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'version': weapy.__version__, 'python': platform.python_version(),
+                       'machine': platform.machine(), 'results': results}, f, indent=1)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print('\n{0} -> {1}'.format(previous['version'], weapy.__version__))
+        for name, seconds in results.items():
+            if name in previous['results']:
+                print('{0:<70} {1:>8.2f}x'.format(name, seconds / previous['results'][name]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,7 @@
 """
 
 import weapy.weafile as ea
+from weapy.climatestats import daily_statistics, moving_average
 import plotly.graph_objects as go
 import pandas as pd
 
@@ -47,11 +48,9 @@ def create_hourly_dataframe(temperatures, year):
 
 def calculate_daily_statistics(df):
     """時間単位データから日次統計値を計算"""
-    daily = pd.DataFrame({
-        'max': df['TAMB'].resample("1D").max(),
-        'mean': df['TAMB'].resample("1D").mean(),
-        'min': df['TAMB'].resample("1D").min(),
-    })
+    maximum, mean, minimum = daily_statistics(df['TAMB'].to_numpy())
+    daily = pd.DataFrame({'max': maximum, 'mean': mean, 'min': minimum},
+                         index=df.index[::24].normalize())
     
     print("日次統計値（最初の4日）:")
     print(daily.head(4))
@@ -62,16 +61,9 @@ def calculate_daily_statistics(df):
 
 def calculate_moving_average(daily):
     """移動平均を計算（3段階のスムージング）"""
-    # 前後12日のデータを追加（移動平均計算のため）
-    daily_ext = pd.concat([daily.tail(12), daily, daily.head(12)])
-    
-    # 3段階のスムージング
-    taverage = daily_ext.rolling(9, center=True).mean()
-    taverage = taverage.rolling(9, center=True).mean()
-    taverage = taverage.rolling(9, center=True).mean()
-    
-    # 前後12日分を除去して元の日数に戻す
-    taverage = taverage.iloc[12:-12]
+    # 9日移動平均を3回繰り返す（年の始めと終わりをつないで計算する）
+    taverage = pd.DataFrame(moving_average(daily.to_numpy().T, window=9, passes=3).T,
+                            index=daily.index, columns=daily.columns)
     
     print(f"移動平均データ長: {len(taverage)} 日")
     print()
@@ -12,9 +12,13 @@ setuptools.setup(
         "pandas",
         
     ],
+    extras_require={
+        'arrow': ["pyarrow"],
+    },
     entry_points={
         'console_scripts': [
             # 'wea=weapy:main',
+            'weapy-type99=weapy.type99batch:main',
         ],
     },
     author="Yuichi Yasuda",
@@ -23,7 +27,8 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/yuizi/weapy",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*', 'tests', 'tests.*']),
+    package_data={'weapy': ['data/*.csv']},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,53 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+テスト用の合成データ(weapy.synthetic)
+
+ファイルはテストのセッション毎に一時フォルダへ作成する。
+"""
+
+import pytest
+from weapy import synthetic
+from weapy.stationindex import set_ea_stations
+
+STATIONS = 12   #合成データの地点数（EA, EA2020ともサイズだけでは形式を判定できない数は避ける）
+
+
+@pytest.fixture(scope='session')
+def data_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp('weapy')
+
+
+@pytest.fixture(scope='session')
+def ea_file(data_dir):
+    """EA(1地点8レコード)のファイル名"""
+    filename = str(data_dir / 'synthetic.wea')
+    synthetic.write_ea(filename, STATIONS)
+    return filename
+
+
+@pytest.fixture(scope='session')
+def ea2020_file(data_dir):
+    """EA2020(1地点11レコード)のファイル名"""
+    filename = str(data_dir / 'synthetic.wea2')
+    synthetic.write_ea2020(filename, STATIONS)
+    return filename
+
+
+@pytest.fixture(scope='session')
+def epw_file(data_dir):
+    """EPWのファイル名"""
+    filename = str(data_dir / 'synthetic.epw')
+    synthetic.write_epw(filename)
+    return filename
+
+
+@pytest.fixture
+def ea_stations():
+    """EAの地点情報を合成データの地点に置き換える（テスト後は同梱の地点情報に戻す）"""
+    stations = synthetic.synthetic_stations(STATIONS)
+    set_ea_stations(stations)
+    yield stations
+    set_ea_stations(None)
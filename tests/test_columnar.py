@@ -0,0 +1,39 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import numpy as np
+import pytest
+from weapy.weamap import load_stations, EA2020_ELEMENTS
+
+pytest.importorskip('pyarrow')
+from weapy.columnar import write_dataset, read_dataset, timestamps  # noqa: E402
+
+
+@pytest.mark.parametrize('format', ['parquet', 'feather'])
+def test_round_trip(ea2020_file, tmp_path, format):
+    data, stations = load_stations(ea2020_file, dtype=np.float32)
+    nos = stations['no'].tolist()
+    write_dataset(str(tmp_path), data, nos, EA2020_ELEMENTS, format=format)
+
+    vals, read_nos, elements = read_dataset(str(tmp_path), format=format)
+    assert read_nos == nos
+    assert elements == list(EA2020_ELEMENTS)
+    np.testing.assert_array_equal(vals, data)
+
+
+def test_read_selection(ea2020_file, tmp_path):
+    data, stations = load_stations(ea2020_file, [2, 5, 7], dtype=np.float32)
+    write_dataset(str(tmp_path), data, [2, 5, 7], EA2020_ELEMENTS)
+
+    selected = ['wind_velocities', 'ambient_temperatures']
+    vals, nos, elements = read_dataset(str(tmp_path), stations=[7, 2], elements=selected)
+    assert nos == [7, 2]
+    assert elements == selected
+    np.testing.assert_array_equal(vals, data[[2, 0]][:, [5, 0]])
+
+
+def test_timestamps():
+    times = timestamps(2001)
+    assert str(times[0]) == '2001-01-01T01:00:00'
+    assert str(times[-1]) == '2002-01-01T00:00:00'
@@ -0,0 +1,158 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+デコードした値が、1値ずつstruct.unpackで読み出す元の方法と一致する（ビット単位）ことを確認する
+
+EAの相対湿度は、元の方法(math.exp, math.logで1値ずつ計算)とnp.exp, np.logの丸め誤差の差(数ulp)を
+RH_ATOLまで許容する
+"""
+
+import math
+import struct
+import numpy as np
+import pytest
+from weapy.earecord import (RECORD_LENGTH, EA_RECORDS, EA2020_RECORDS,
+                            EA_SCALE_FACTORS, EA2020_SCALE_FACTORS)
+from weapy.weafile import WeaFile, GetPws, calc_relative_humidity
+from weapy.wea2file import Wea2File
+from weapy.weamap import WeaMap, EA_ELEMENTS, EA2020_ELEMENTS, load_stations
+from weapy.weaseries import WeaSeries
+
+ELEVATION = 35.0
+NOS = [1, 5, 12]
+RH_ATOL = 1e-12     #相対湿度[%]の許容差（np.exp, np.logとmath.exp, math.logの丸め誤差の差）
+RH_INDEX = EA_ELEMENTS.index('relative_humidities')
+
+
+def baseline_pws(t):
+    """
+    元のGetPwsと同じ方法で、1値の飽和水蒸気圧[kPa]を計算する
+    """
+    Tab = t + 273.15
+    if t >= 0.0:
+        return math.exp(-5800.2206 / Tab + 1.3914993 - 0.048640239 * Tab
+                        + 0.4176768 * 10.0**(-4) * Tab**2
+                        - 0.14452093 * 10.0**(-7) * Tab**3
+                        + 6.5459673 * math.log(Tab)) / 1000.0
+    return math.exp(-5674.5359 / Tab + 6.3925247 - 0.9677843*10**(-2) * Tab
+                    + 0.62215701 * 10.0**(-6) * Tab**2
+                    + 0.20747825 * 10.0**(-8) * Tab**3
+                    - 0.9484024 * 10.0**(-12) * Tab**4 + 4.1635019 * math.log(Tab)) / 1000.0
+
+
+def baseline_relative_humidity(abs_hum, tambs, elevation):
+    """
+    元のcalc_relative_humidityと同じ方法で、相対湿度[%]を計算する
+    """
+    po = (1013.2 - 0.12 * elevation + 5.44 * 10**(-6) * elevation ** 2) / 10.0
+    pw = (np.asarray(abs_hum) * po) / (np.asarray(abs_hum) + 0.62198)
+    rh = pw / np.array([baseline_pws(t) for t in tambs]) * 100.0
+    rh = np.where(rh < 0.0, 0.0, rh)
+    return np.where(rh > 100.0, 100.0, rh)
+
+
+def baseline_decode(filename, no, records, first, sf):
+    """
+    元のWeaFile, Wea2Fileと同じ方法で、地点の気象要素をデコードする, list of ndarray (EA_ELEMENTSの並び)
+    """
+    vals = []
+    with open(filename, 'rb') as f:
+        for i in range(first, records):
+            f.seek((no-1)*RECORD_LENGTH*records + i*RECORD_LENGTH + 6) #レコードヘッダーの次
+            codes = struct.unpack('<8760h', f.read(8760 * 2))
+            vals.append(np.array([math.floor(val/10.0) for val in codes]) * sf[i - first])
+    vals[2] = vals[2]/3.6*1000.0
+    vals[3] = vals[3]/3.6*1000.0
+    vals[4] = vals[4] * 22.5
+    return vals
+
+
+def baseline_ea(filename, no):
+    vals = baseline_decode(filename, no, EA_RECORDS, 0, EA_SCALE_FACTORS)
+    vals.append(baseline_relative_humidity(np.array(vals[1]) / 1000.0, np.array(vals[0]), ELEVATION))
+    return vals
+
+
+def baseline_ea2020(filename, no):
+    return baseline_decode(filename, no, EA2020_RECORDS, 1, EA2020_SCALE_FACTORS)
+
+
+@pytest.mark.parametrize('no', NOS)
+def test_weafile(ea_file, no):
+    expected = baseline_ea(ea_file, no)
+    for wea in (WeaFile(ea_file, no, ELEVATION), WeaFile(WeaMap(ea_file), no, ELEVATION)):
+        for name, vals in zip(EA_ELEMENTS[:RH_INDEX], expected):
+            np.testing.assert_array_equal(getattr(wea, name), vals, err_msg=name)
+        np.testing.assert_allclose(wea.relative_humidities, expected[RH_INDEX], rtol=0, atol=RH_ATOL)
+
+
+@pytest.mark.parametrize('no', NOS)
+def test_wea2file(ea2020_file, no):
+    expected = baseline_ea2020(ea2020_file, no)
+    for wea in (Wea2File(ea2020_file, no), Wea2File(WeaMap(ea2020_file), no)):
+        for name, vals in zip(EA2020_ELEMENTS, expected):
+            np.testing.assert_array_equal(getattr(wea, name), vals, err_msg=name)
+
+
+def test_load_stations(ea_file, ea2020_file):
+    data, _ = load_stations(ea_file, NOS, ELEVATION)
+    for vals, no in zip(data, NOS):
+        expected = baseline_ea(ea_file, no)
+        np.testing.assert_array_equal(vals[:RH_INDEX], expected[:RH_INDEX])
+        np.testing.assert_allclose(vals[RH_INDEX], expected[RH_INDEX], rtol=0, atol=RH_ATOL)
+
+    data, _ = load_stations(ea2020_file, NOS)
+    for vals, no in zip(data, NOS):
+        np.testing.assert_array_equal(vals, baseline_ea2020(ea2020_file, no))
+
+
+def test_weaseries(ea2020_file):
+    series = WeaSeries([ea2020_file], year_of=lambda filename, code: 2001)
+    vals, times = series.station_values(5)
+    np.testing.assert_array_equal(vals, baseline_ea2020(ea2020_file, 5))
+    assert len(times) == 8760
+
+
+@pytest.mark.parametrize('element', range(EA_RECORDS))
+def test_weamap_values(ea_file, element):
+    #日射量、大気放射量(2, 3)はW/m2、風向(4)は角度（WeaFileと同じ単位）
+    eamap = WeaMap(ea_file)
+    expected = baseline_decode(ea_file, 5, EA_RECORDS, 0, EA_SCALE_FACTORS)
+    np.testing.assert_array_equal(eamap.values(element, [5])[0], expected[element])
+    np.testing.assert_array_equal(eamap.values(element)[4], expected[element])
+    np.testing.assert_array_equal(eamap.station_values(5)[element], expected[element])
+
+
+@pytest.mark.parametrize('element', range(EA2020_RECORDS - 1))
+def test_weamap_values_ea2020(ea2020_file, element):
+    eamap = WeaMap(ea2020_file)
+    expected = baseline_ea2020(ea2020_file, 5)
+    np.testing.assert_array_equal(eamap.values(element, [5])[0], expected[element])
+    np.testing.assert_array_equal(eamap.station_values(5)[element], expected[element])
+
+
+def test_pws_both_sides_of_zero():
+    #0℃を境に水の上、氷の上の式を切り替える（0.0は水の上）
+    tambs = np.concatenate([np.linspace(-40.0, 45.0, 8501), [-0.05, -1e-9, 0.0, 1e-9, 0.05]])
+    expected = np.array([baseline_pws(t) for t in tambs])
+    np.testing.assert_allclose(GetPws(tambs), expected, rtol=1e-14, atol=0)
+    assert GetPws(np.array([0.0]))[0] == pytest.approx(0.6112, abs=1e-3)    #0℃の飽和水蒸気圧[kPa]
+
+
+@pytest.mark.parametrize('elevation', [-3.0, 0.0, 1350.0])
+def test_relative_humidity_parity(elevation):
+    rng = np.random.default_rng(0)
+    tambs = np.round(rng.uniform(-30.0, 40.0, 20000), 1)
+    tambs[:5] = [-0.1, 0.0, 0.1, -30.0, 40.0]
+    saturated = np.array([baseline_pws(t) for t in tambs]) * 0.62198 / 101.325  #飽和絶対湿度の目安
+    abs_hum = saturated * rng.uniform(0.05, 1.3, len(tambs))    #100%を超える値を含む（100%へ制限）
+    expected = baseline_relative_humidity(abs_hum, tambs, elevation)
+    actual = calc_relative_humidity(abs_hum, tambs, elevation)
+    assert np.any(expected == 100.0) and np.any(tambs < 0.0)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=RH_ATOL)
+
+    #(地点, 時間)の配列と地点毎の標高はブロードキャストする
+    grid = calc_relative_humidity(abs_hum.reshape(4, -1), tambs.reshape(4, -1), np.full((4, 1), elevation))
+    np.testing.assert_array_equal(grid.ravel(), actual)
@@ -0,0 +1,111 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import os
+import shutil
+import numpy as np
+import pytest
+from weapy.diskcache import DiskCache, CACHE_EXT
+from weapy.epwfile import EpwFile
+from weapy.weafile import WeaFile
+from weapy import synthetic
+
+KIND = 'epw-float64'    #EpwFileのキャッシュの種類
+
+
+@pytest.fixture
+def source(tmp_path, epw_file):
+    """変更してよい気象データファイルのコピー"""
+    filename = str(tmp_path / 'source.epw')
+    shutil.copyfile(epw_file, filename)
+    return filename
+
+
+def cache_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(CACHE_EXT))
+
+
+def touch(filename, seconds=1):
+    """更新日時を進める"""
+    st = os.stat(filename)
+    os.utime(filename, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10**9))
+
+
+def test_fetch_uses_cache(tmp_path, source):
+    cache = DiskCache(str(tmp_path / 'cache'))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {'block': np.arange(10)}
+
+    first = cache.fetch(source, KIND, 0, loader)
+    second = cache.fetch(source, KIND, 0, loader)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first['block'], second['block'])
+    assert cache.key(source, KIND, 0) != cache.key(source, KIND, 1)
+    assert cache.key(source, KIND, 0) != cache.key(source, 'epw-float32', 0)
+
+
+def test_ea_readers_do_not_cache(tmp_path, ea_file):
+    #拡張アメダス気象データは地点のレコード一式を1回で読み出すため、キャッシュを使用しない
+    with pytest.raises(TypeError):
+        WeaFile(ea_file, 1, 35.0, cache=DiskCache(str(tmp_path / 'cache')))
+
+
+@pytest.mark.parametrize('content_hash', [False, True])
+def test_modified_file_is_reloaded(tmp_path, source, content_hash):
+    cache = DiskCache(str(tmp_path / 'cache'), content_hash=content_hash)
+    before = EpwFile(source, cache=cache).ambient_temperatures
+
+    #値の異なるファイルに置き換える（更新日時も変える）
+    synthetic.write_epw(source, seed=1)
+    touch(source)
+
+    after = EpwFile(source, cache=cache).ambient_temperatures
+    assert after == EpwFile(source).ambient_temperatures
+    assert before != after
+
+
+def test_touched_file_changes_key(tmp_path, source):
+    cache = DiskCache(str(tmp_path / 'cache'))
+    key = cache.key(source, KIND, 0)
+    touch(source)
+    assert cache.key(source, KIND, 0) != key
+
+    #内容のハッシュをキーにする場合は、更新日時が変わっても同じキー
+    cache = DiskCache(str(tmp_path / 'cache'), content_hash=True)
+    key = cache.key(source, KIND, 0)
+    touch(source, 2)
+    assert cache.key(source, KIND, 0) == key
+
+
+@pytest.mark.parametrize('content', [b'', b'not a zip file', b'PK\x03\x04broken'])
+def test_corrupt_entry_is_miss(tmp_path, source, content):
+    cache = DiskCache(str(tmp_path / 'cache'))
+    key = cache.key(source, KIND, 0)
+    with open(os.path.join(cache.cache_dir, key + CACHE_EXT), 'wb') as f:
+        f.write(content)
+
+    assert cache.load(key) is None
+    assert cache_files(cache) == []
+    assert EpwFile(source, cache=cache).ambient_temperatures == EpwFile(source).ambient_temperatures
+    assert cache_files(cache) == [key + CACHE_EXT]
+
+
+def test_evict_oldest(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache'), max_bytes=10**9)
+    for i in range(3):
+        cache.save('k{0}'.format(i), {'a': np.zeros(1000)})
+        path = os.path.join(cache.cache_dir, 'k{0}{1}'.format(i, CACHE_EXT))
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    size = os.path.getsize(path)
+
+    cache.max_bytes = size * 2
+    cache.load('k0') #最後に使用した日時を更新する
+    cache.evict()
+    assert cache_files(cache) == ['k0' + CACHE_EXT, 'k2' + CACHE_EXT]
+
+    cache.clear()
+    assert cache_files(cache) == []
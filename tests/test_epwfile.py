@@ -0,0 +1,58 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import numpy as np
+import pandas as pd
+import pytest
+from weapy.diskcache import DiskCache
+from weapy.epwfile import EpwFile, EPW_LABELS, EPW_HEADER_LINES
+
+#プロパティと列
+PROPERTIES = [
+    ('ambient_temperatures', 'DryBulb'),
+    ('relative_humidities', 'RelHum'),
+    ('horizontal_global_solar_irradiations', 'GloHorzRad'),
+    ('downward_longwave_irradiations', 'HorzIRSky'),
+    ('wind_directions', 'WindDir'),
+    ('wind_velocities', 'WindSpd'),
+    ('precipitation_amounts', 'Rain'),
+]
+
+
+@pytest.fixture(scope='module')
+def baseline(epw_file):
+    """pandas.read_csvで読み出した値（以前の読み出し方法）"""
+    return pd.read_csv(epw_file, skiprows=EPW_HEADER_LINES, sep=',', header=None, names=EPW_LABELS)
+
+
+@pytest.mark.parametrize('name, label', PROPERTIES)
+def test_lists_match_pandas(epw_file, baseline, name, label):
+    vals = getattr(EpwFile(epw_file), name)
+    expected = baseline[label].values.tolist()
+    assert vals == expected
+    assert [type(val) for val in vals[:24]] == [type(val) for val in expected[:24]]
+
+
+@pytest.mark.parametrize('name, label', PROPERTIES)
+def test_arrays_match_pandas(epw_file, baseline, name, label):
+    vals = getattr(EpwFile(epw_file, as_array=True), name)
+    np.testing.assert_array_equal(vals, baseline[label].to_numpy(dtype=np.float64))
+
+
+def test_cached_values_match(epw_file, tmp_path):
+    cache = DiskCache(str(tmp_path))
+    expected = EpwFile(epw_file)
+    for _ in range(2):  #1回目はキャッシュへ保存、2回目はキャッシュから読み出す
+        wea = EpwFile(epw_file, cache=cache)
+        for name, _ in PROPERTIES:
+            assert getattr(wea, name) == getattr(expected, name)
+        assert wea.location.city == expected.location.city
+
+
+def test_not_implemented(epw_file):
+    wea = EpwFile(epw_file)
+    with pytest.raises(NotImplementedError):
+        wea.absolute_humidities
+    with pytest.raises(NotImplementedError):
+        wea.sunshine_durations
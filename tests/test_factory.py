@@ -0,0 +1,53 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import numpy as np
+import pytest
+from weapy import factory
+
+
+@pytest.fixture(autouse=True)
+def instances():
+    factory.clear()
+    yield
+    factory.clear()
+
+
+def test_shared_instance(ea2020_file):
+    assert factory.open_wea2file(ea2020_file, 3) is factory.open_wea2file(ea2020_file, 3)
+    assert factory.open_wea2file(ea2020_file, 3) is not factory.open_wea2file(ea2020_file, 4)
+
+
+def test_shared_weafile_is_read_only(ea_file, ea_stations):
+    wea = factory.open_weafile(ea_file, 2)
+    for vals in (wea.ambient_temperatures, wea.relative_humidities, wea.wind_directions):
+        with pytest.raises(ValueError):
+            vals[0] = -999.0
+
+
+def test_shared_epwfile_lists_are_copies(epw_file):
+    wea = factory.open_epwfile(epw_file)
+    expected = wea.wind_directions[0]
+    wea.wind_directions[0] = -999
+    wea.ambient_temperatures[0] = -999
+    other = factory.open_epwfile(epw_file)
+    assert other is wea
+    assert other.wind_directions[0] == expected
+    assert other.ambient_temperatures[0] != -999
+
+
+def test_shared_epwfile_data_frame_is_copy(epw_file):
+    wea = factory.open_epwfile(epw_file)
+    expected = wea.wea_data.loc[0, 'DryBulb']
+    data = wea.wea_data
+    data.loc[0, 'DryBulb'] = -999.0
+    assert factory.open_epwfile(epw_file).wea_data.loc[0, 'DryBulb'] == expected
+
+
+def test_shared_epwfile_arrays_are_read_only(epw_file):
+    wea = factory.open_epwfile(epw_file, as_array=True)
+    vals = wea.wind_directions
+    assert isinstance(vals, np.ndarray)
+    with pytest.raises(ValueError):
+        vals[0] = -999.0
@@ -0,0 +1,53 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import numpy as np
+import pytest
+from weapy.epwfile import EpwFile
+from weapy.wea2file import Wea2File
+from weapy.type99 import TYPE99_EA2020_COLUMNS, type99_data
+from weapy.resample import resample, resample_weather, iter_resample, sample_times
+
+
+def test_interp_modes():
+    vals = np.array([0.0, 10.0, 20.0, 10.0, 40.0])
+    np.testing.assert_array_equal(resample(vals, 30, 0), [0, 0, 10, 10, 20, 20, 10, 10, 40, 40])
+    np.testing.assert_array_equal(resample(vals, 30, 1), [0, 0, 5, 10, 15, 20, 15, 10, 25, 40])
+    np.testing.assert_allclose(resample(vals, 30, 2), [0, 0, 5, 10, 17.5, 20, 17.5, 10, 20, 40])
+    with pytest.raises(ValueError):
+        resample(vals, 7)
+
+
+def test_sample_times():
+    times = sample_times(5, 30)
+    assert str(times[0]) == '2001-01-01T00:30:00'
+    assert str(times[-1]) == '2001-01-01T05:00:00'
+
+
+def test_wea2file(ea2020_file):
+    wea = Wea2File(ea2020_file, 2)
+    data, times, columns = resample_weather(wea, 10)
+    assert columns == TYPE99_EA2020_COLUMNS
+    assert data.shape == (len(columns), 8760 * 6) and len(times) == 8760 * 6
+    #補間無しは1時間の平均が変わらない、直線、2次補間は各時刻の値を通る
+    np.testing.assert_allclose(data[2].reshape(-1, 6).mean(axis=1), wea.horizontal_global_solar_irradiations)
+    np.testing.assert_allclose(data[0][5::6], wea.ambient_temperatures)
+    np.testing.assert_allclose(data[1][5::6], wea.relative_humidities)
+
+
+def test_epwfile_skips_missing_columns(epw_file):
+    wea = EpwFile(epw_file)
+    data, _, columns = resample_weather(wea, 15)
+    assert 'sunshine_durations' not in [column[1] for column in columns]
+    assert data.shape == (len(columns), 8760 * 4)
+    np.testing.assert_allclose(data[0][3::4], wea.ambient_temperatures)
+
+
+def test_iter_resample(ea2020_file):
+    wea = Wea2File(ea2020_file, 2)
+    data, times, _ = resample_weather(wea, 10)
+    chunks = list(iter_resample(type99_data(wea, TYPE99_EA2020_COLUMNS), 10,
+                                [column[3] for column in TYPE99_EA2020_COLUMNS], chunk_hours=1000))
+    np.testing.assert_array_equal(np.concatenate([chunk for _, chunk in chunks], axis=1), data)
+    np.testing.assert_array_equal(np.concatenate([t for t, _ in chunks]), times)
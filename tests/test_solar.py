@@ -0,0 +1,138 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import numpy as np
+import pytest
+from weapy.solar import (SOLAR_CONSTANT, MIN_COS_ZENITH, hour_angles, sun_position, erbs_diffuse_fraction,
+                         decompose, solar_components, plane_of_array, tilted_irradiance)
+from weapy.wea2file import Wea2File
+
+TOKYO = (35.69, 139.76)
+SOLSTICE = 171 * 24     #6月21日0時の位置（1時間毎の値）
+
+
+def zenith_azimuth(cos_zenith, azimuth, hour):
+    return np.degrees(np.arccos(cos_zenith[SOLSTICE + hour])), azimuth[SOLSTICE + hour]
+
+
+def test_hour_angles():
+    days, times = hour_angles()
+    assert (days[0], times[0]) == (1, 0.5)
+    assert (days[-1], times[-1]) == (365, 23.5)
+
+
+def test_tokyo_june_solstice():
+    cos_zenith, azimuth, extraterrestrial = sun_position(*TOKYO)
+    #11時30分(JST): 南中(11時43分頃)の少し前。天頂角 = 緯度 - 赤緯(23.44) + 時角の分, 南より東(-)
+    zenith, az = zenith_azimuth(cos_zenith, azimuth, 11)
+    assert zenith == pytest.approx(12.5, abs=0.3)
+    assert az == pytest.approx(-13.2, abs=1.0)
+    #南中を挟む12時30分は西(+)、天頂角は日中で最小の時刻の近く
+    zenith, az = zenith_azimuth(cos_zenith, azimuth, 12)
+    assert az > 0.0 and zenith < 25.0
+    #日の出(4時25分頃)前の3時30分、日の入(19時00分頃)後の19時30分は地平線の下
+    assert cos_zenith[SOLSTICE + 3] < 0.0 and cos_zenith[SOLSTICE + 19] < 0.0
+    assert cos_zenith[SOLSTICE + 5] > 0.0 and cos_zenith[SOLSTICE + 18] > 0.0
+    #大気外日射量は遠日点(7月初め)付近で最小
+    assert extraterrestrial.argmin() // 24 in range(170, 195)
+    assert extraterrestrial.max() == pytest.approx(SOLAR_CONSTANT * 1.034, rel=2e-3)
+
+
+def test_sun_position_broadcast():
+    lat = np.array([TOKYO[0], 43.06, 26.21])
+    lon = np.array([TOKYO[1], 141.33, 127.68])
+    cos_zenith, azimuth, extraterrestrial = sun_position(lat, lon, 48)
+    assert cos_zenith.shape == azimuth.shape == (3, 48) and extraterrestrial.shape == (48,)
+    single, _, _ = sun_position(lat[1], lon[1], 48)
+    np.testing.assert_array_equal(cos_zenith[1], single)
+
+
+def test_erbs_breakpoints():
+    kt = np.array([0.0, 0.22, 0.80, 1.0])
+    np.testing.assert_allclose(erbs_diffuse_fraction(kt), [1.0, 1.0 - 0.09 * 0.22, 0.1652696, 0.165], atol=1e-7)
+    #区間の境界の前後でほぼ連続
+    eps = 1e-9
+    for kt in (0.22, 0.80):
+        below, above = erbs_diffuse_fraction([kt - eps, kt + eps])
+        assert abs(below - above) < 1e-3
+    assert erbs_diffuse_fraction(0.80 + eps) == 0.165
+
+
+def test_decompose():
+    cos_zenith, _, extraterrestrial = sun_position(*TOKYO)
+    rng = np.random.default_rng(0)
+    ghi = np.where(cos_zenith > 0.0, rng.uniform(0.0, 1.1, cos_zenith.shape) * extraterrestrial * cos_zenith, 0.0)
+    ghi[SOLSTICE] = -5.0    #負の値は0とする
+
+    beam_h, diffuse_h, beam_n = decompose(ghi, cos_zenith, extraterrestrial)
+    np.testing.assert_allclose(beam_h + diffuse_h, np.maximum(ghi, 0.0), atol=1e-9)
+    assert np.all(beam_h >= 0.0) and np.all(diffuse_h >= 0.0)
+    assert np.all(beam_n <= extraterrestrial + 1e-9)
+
+    #夜間、太陽高度が低い時間は全て天空日射
+    night = cos_zenith < MIN_COS_ZENITH
+    assert np.all(beam_h[night] == 0.0) and np.all(beam_n[night] == 0.0)
+    np.testing.assert_array_equal(diffuse_h[night], np.maximum(ghi[night], 0.0))
+
+    #晴天指数0.22以下は直達日射の割合が小さい
+    sunlit = cos_zenith > 0.5
+    dull = 0.1 * extraterrestrial * cos_zenith
+    _, diffuse_dull, _ = decompose(dull, cos_zenith, extraterrestrial)
+    np.testing.assert_allclose(diffuse_dull[sunlit], dull[sunlit] * (1.0 - 0.09 * 0.1))
+
+
+def test_solar_components():
+    ghi = np.full((2, 8760), 300.0)
+    beam_h, diffuse_h, _ = solar_components(ghi, [TOKYO[0], 43.06], [TOKYO[1], 141.33])
+    assert beam_h.shape == (2, 8760)
+    np.testing.assert_allclose(beam_h + diffuse_h, ghi)
+
+
+# --------------------------------------------------------------------------------------------
+
+def test_plane_of_array_horizontal():
+    cos_zenith, sun_azimuth, extraterrestrial = sun_position(*TOKYO)
+    ghi = np.clip(800.0 * cos_zenith, 0.0, None)
+    poa = plane_of_array(ghi, cos_zenith, sun_azimuth, extraterrestrial, [0.0, 0.0], [0.0, 90.0], albedo=0.3)
+    #傾斜角0の面は方位角、地面の日射反射率によらず全天日射量と同じ
+    np.testing.assert_allclose(poa, np.broadcast_to(ghi, poa.shape), atol=1e-9)
+
+
+def test_plane_of_array_shape():
+    lat = np.array([TOKYO[0], 43.06, 26.21])
+    lon = np.array([TOKYO[1], 141.33, 127.68])
+    cos_zenith, sun_azimuth, extraterrestrial = sun_position(lat, lon, 48)
+    ghi = np.full((3, 48), 200.0)
+    tilts, azimuths = [0.0, 30.0, 90.0, 90.0], [0.0, 0.0, -90.0, 90.0]
+    poa = plane_of_array(ghi, cos_zenith, sun_azimuth, extraterrestrial, tilts, azimuths)
+    assert poa.shape == (3, 4, 48)      #(地点, 面, 時間)
+    single = plane_of_array(ghi[1], cos_zenith[1], sun_azimuth[1], extraterrestrial, tilts, azimuths)
+    np.testing.assert_allclose(poa[1], single)
+
+
+def test_plane_of_array_ground_reflection():
+    cos_zenith, sun_azimuth, extraterrestrial = sun_position(*TOKYO)
+    ghi = np.clip(800.0 * cos_zenith, 0.0, None)
+    vertical = dict(tilts=[90.0], azimuths=[0.0])
+    with_ground = plane_of_array(ghi, cos_zenith, sun_azimuth, extraterrestrial, albedo=0.2, **vertical)[0]
+    without = plane_of_array(ghi, cos_zenith, sun_azimuth, extraterrestrial, albedo=0.0, **vertical)[0]
+    #鉛直面は地面の半分を見る: 地面反射日射量 = 全天日射量 x 反射率 / 2
+    np.testing.assert_allclose(with_ground - without, ghi * 0.2 / 2.0, atol=1e-9)
+    #天空日射も半分（夜間は全て天空日射として扱う）
+    night = (cos_zenith < MIN_COS_ZENITH) & (ghi > 0.0)
+    np.testing.assert_allclose(without[night], ghi[night] / 2.0)
+
+
+def test_tilted_irradiance(ea2020_file):
+    wea = Wea2File(ea2020_file, 3)
+    poa = tilted_irradiance(wea, [0.0, 90.0], [0.0, 0.0])
+    assert poa.shape == (2, 8760)
+    np.testing.assert_allclose(poa[0], np.maximum(wea.horizontal_global_solar_irradiations, 0.0), atol=1e-9)
+
+    cos_zenith, sun_azimuth, extraterrestrial = sun_position(wea.latitude, wea.longitude)
+    expected = plane_of_array(wea.horizontal_global_solar_irradiations, cos_zenith, sun_azimuth,
+                              extraterrestrial, [0.0, 90.0], [0.0, 0.0])
+    np.testing.assert_allclose(poa, expected)
+    np.testing.assert_allclose(tilted_irradiance(wea, [90.0], [0.0], latitude=wea.latitude,
+                                                 longitude=wea.longitude), expected[1:])
@@ -0,0 +1,136 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import math
+import numpy as np
+import pytest
+from weapy.stationindex import (EA_STATION_COUNT, read_ea_stations, check_ea_numbering, make_ea_stations,
+                                load_station_index, set_ea_stations, ea_stations, lookup_ea_station, main,
+                                StationLocator, EARTH_RADIUS)
+from weapy.weafile import WeaFile
+
+
+@pytest.fixture(autouse=True)
+def reset_stations():
+    yield
+    set_ea_stations(None)
+
+
+def test_bundled_numbering():
+    stations = read_ea_stations()
+    check_ea_numbering(stations)
+    assert np.all(np.diff(stations['no']) > 0)
+    with pytest.raises(ValueError):
+        check_ea_numbering(np.array([(1,), (1,)], dtype=[('no', 'i4')]))
+    with pytest.raises(ValueError):
+        check_ea_numbering(np.array([(EA_STATION_COUNT + 1,)], dtype=[('no', 'i4')]))
+
+
+def test_make_ea_stations(tmp_path, ea2020_file):
+    stations_count = len(load_station_index(ea2020_file, persist=False))
+    path = str(tmp_path / 'ea_stations.csv')
+    stations = make_ea_stations(ea2020_file, path, stations_count)
+    table = read_ea_stations(path)
+    np.testing.assert_array_equal(table['no'], np.arange(1, stations_count + 1))
+    np.testing.assert_allclose(table['latitude'], stations['latitude'], atol=5e-5)
+    np.testing.assert_allclose(table['elevation'], stations['elevation'], atol=5e-2)
+
+    #EAと地点数が異なるEA2020のファイルは使用しない
+    with pytest.raises(ValueError):
+        make_ea_stations(ea2020_file, path)
+    assert main([ea2020_file, '-o', path, '--stations', str(stations_count)]) == 0
+    with pytest.raises(SystemExit):
+        main([ea2020_file, '-o', path])
+
+
+def test_set_ea2020_file(ea_file, ea2020_file):
+    set_ea_stations(ea2020_file)
+    assert len(ea_stations()) == len(load_station_index(ea2020_file))
+    expected = load_station_index(ea2020_file)[4]
+    wea = WeaFile(ea_file, 5)
+    assert wea.elevaton == expected['elevation']
+    assert wea.latitude == expected['latitude'] and wea.longitude == expected['longitude']
+
+
+def test_location_with_elevation(ea_file, ea_stations):
+    #標高を指定した場合も、地点情報にあれば緯度、経度を設定する
+    wea = WeaFile(ea_file, 3, 100.0)
+    assert wea.elevaton == 100.0
+    assert wea.latitude == ea_stations['latitude'][2] and wea.longitude == ea_stations['longitude'][2]
+
+    set_ea_stations(None)
+    assert lookup_ea_station(3) is None
+    wea = WeaFile(ea_file, 3, 100.0)
+    assert wea.latitude is None and wea.longitude is None
+    with pytest.raises(ValueError):
+        WeaFile(ea_file, 3)
+
+
+# --------------------------------------------------------------------------------------------
+
+LOCATOR_STATIONS = np.array([(1, 35.69, 139.76, 6.0),       #東京
+                             (2, 35.44, 139.65, 39.0),      #横浜
+                             (3, 35.95, 138.47, 1350.0),    #野辺山
+                             (4, 34.69, 135.50, 23.0),      #大阪
+                             (5, 43.06, 141.33, 17.0)],     #札幌
+                            dtype=[('no', 'i4'), ('latitude', 'f8'), ('longitude', 'f8'), ('elevation', 'f8')])
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """大円距離[km]（haversineの式）"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2.0 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def test_locator_distances():
+    locator = StationLocator(LOCATOR_STATIONS)
+    site = (35.66, 139.70)
+    expected = [haversine(*site, st['latitude'], st['longitude']) for st in LOCATOR_STATIONS]
+    np.testing.assert_allclose(locator.distances(*site), expected, rtol=1e-9)
+    assert expected[3] == pytest.approx(397.0, abs=5.0)    #東京～大阪 約400km
+    assert locator.distances(35.69, 139.76)[0] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_locator_nearest():
+    locator = StationLocator(LOCATOR_STATIONS)
+    nos, dist = locator.nearest(35.66, 139.70, k=3)
+    np.testing.assert_array_equal(nos, [1, 2, 3])
+    assert np.all(np.diff(dist) >= 0.0)
+    assert dist[0] == pytest.approx(haversine(35.66, 139.70, 35.69, 139.76), rel=1e-9)
+
+    #地点数より大きいkは全地点
+    nos, dist = locator.nearest(35.66, 139.70, k=10)
+    np.testing.assert_array_equal(nos, [1, 2, 3, 4, 5])
+    assert dist.shape == (5,)
+
+    #複数の位置
+    nos, dist = locator.nearest(np.array([34.7, 43.0]), np.array([135.5, 141.3]), k=2)
+    assert nos.shape == dist.shape == (2, 2)
+    np.testing.assert_array_equal(nos[:, 0], [4, 5])
+
+
+def test_locator_within():
+    locator = StationLocator(LOCATOR_STATIONS)
+    nos, dist = locator.within(35.66, 139.70, 50.0)
+    np.testing.assert_array_equal(nos, [1, 2])
+    assert np.all(dist <= 50.0) and np.all(np.diff(dist) >= 0.0)
+    nos, dist = locator.within(35.66, 139.70, 1.0)
+    assert len(nos) == 0 and len(dist) == 0
+
+
+def test_locator_elevation_weight():
+    site = (35.75, 139.30)  #東京の西、標高1000m
+    plain = StationLocator(LOCATOR_STATIONS)
+    weighted = StationLocator(LOCATOR_STATIONS, elevation_weight=100.0)
+    horizontal = plain.distances(*site, elevation=1000.0)
+    dist = weighted.distances(*site, elevation=1000.0)
+    dz = (1000.0 - LOCATOR_STATIONS['elevation']) / 1000.0
+    np.testing.assert_allclose(dist, np.sqrt(horizontal ** 2 + (100.0 * dz) ** 2))
+    #標高差を加味すると、水平距離の近い東京より標高の近い野辺山が近い
+    assert plain.nearest(*site, elevation=1000.0)[0][0] == 1
+    assert weighted.nearest(*site, elevation=1000.0)[0][0] == 3
+    #標高を指定しない場合は水平距離のみ
+    np.testing.assert_array_equal(weighted.distances(*site), plain.distances(*site))
@@ -0,0 +1,43 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import numpy as np
+import pytest
+from weapy.weafile import WeaFile
+from weapy.wea2file import Wea2File
+
+ELEMENTS = ['ambient_temperatures', 'absolute_humidities', 'horizontal_global_solar_irradiations',
+            'downward_longwave_irradiations', 'wind_directions', 'wind_velocities',
+            'precipitation_amounts', 'sunshine_durations', 'relative_humidities']
+
+
+def open_file(kind, ea_file, ea2020_file, no, storage):
+    if kind == 'ea':
+        return WeaFile(ea_file, no, storage=storage)
+    return Wea2File(ea2020_file, no, storage=storage)
+
+
+@pytest.mark.parametrize('kind', ['ea', 'ea2020'])
+@pytest.mark.parametrize('storage', ['float32', 'int16'])
+def test_storage_values(kind, storage, ea_file, ea2020_file, ea_stations):
+    expected = open_file(kind, ea_file, ea2020_file, 4, 'float64')
+    wea = open_file(kind, ea_file, ea2020_file, 4, storage)
+    for name in ELEMENTS:
+        vals = getattr(wea, name)
+        assert vals.dtype == np.float32
+        np.testing.assert_allclose(vals, getattr(expected, name), rtol=1e-6, atol=1e-4)
+
+
+@pytest.mark.parametrize('kind', ['ea', 'ea2020'])
+def test_int16_keeps_derived_values(kind, ea_file, ea2020_file, ea_stations):
+    wea = open_file(kind, ea_file, ea2020_file, 4, 'int16')
+    assert wea.wind_directions is wea.wind_directions
+    assert wea.ambient_temperatures is not wea.ambient_temperatures #レコードの値は参照の都度デコードする
+    if kind == 'ea':
+        assert wea.relative_humidities is wea.relative_humidities
+
+
+def test_unknown_storage(ea2020_file):
+    with pytest.raises(ValueError):
+        Wea2File(ea2020_file, 1, storage='float16')
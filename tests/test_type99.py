@@ -0,0 +1,116 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from weapy.epwfile import EpwFile
+from weapy.weafile import WeaFile
+from weapy.wea2file import Wea2File
+from weapy.weamap import load_stations, EA2020_ELEMENTS
+from weapy.type99 import TYPE99_COLUMNS, TYPE99_EA2020_COLUMNS, type99_header, write_type99, write_type99_stations
+
+#examplesのpandasによる出力のヘッダー（<longitude>, <latitude>の行を除く）
+BASELINE_VARS = [
+    '<gmt>       9       ! time shift from GMT, east: positive (hours)',
+    '<interval>  1       ! Data file time interval between consecutive lines (hours)',
+    '<firsttime> 1       ! Time corresponding to first data line (hours)',
+    '<var>	IBEAM_H	<col>	0  <interp> 0  <add>  0  <mult>  1   <samp>   0	!',
+    '<var>	IBEAM_N	<col>	0  <interp> 0  <add>  0  <mult>  1   <samp>   0	!',
+    '<var>	IDIFF_H	<col>	0  <interp> 0  <add>  0  <mult>  1   <samp>   0	!',
+    '<var>	IGLOB_H	<col>	3  <interp> 0  <add>  0  <mult>  1   <samp>   0	! [W/m2]',
+    '<var>	TAMB	<col>	1  <interp> 2  <add>  0  <mult>  1   <samp>   0	! [C]',
+    '<var>	RHUM	<col>	2  <interp> 1  <add>  0  <mult>  1   <samp>   0	! [%]',
+    '<var>	WSPEED	<col>	6  <interp> 1  <add>  0  <mult>  1   <samp>   0	! [m/s]',
+    '<var>	WDIR	<col>	5  <interp> 1  <add>  0  <mult>  1   <samp>   0	! [deg.]',
+    '<var>	udef1	<col>	4  <interp> 0  <add>  0  <mult>  1   <samp>   0	! Atmosphric radiation [W/m^2]',
+    '<var>	udef2	<col>	7  <interp> 0  <add>  0  <mult>  1   <samp>   0	! Amount of rain [mm]',
+    '<var>	udef3	<col>	8  <interp> 0  <add>  0  <mult>  1   <samp>   0	! Solar Radiation Time[hour]',
+    '<var>	udef4	<col>	0  <interp> 0  <add>  0  <mult>  1   <samp>   0	!',
+    '<data>',
+]
+
+
+def baseline_type99(wea, latitude, longitude, columns):
+    """examples/type99の以前の出力（pandasのDataFrame.to_csv）"""
+    df = pd.DataFrame({column[0]: getattr(wea, column[1]) for column in columns})
+    df = df.round({column[0]: column[2] for column in columns})
+    header = [
+        '<userdefined>       ! This weather data is generated by Weapy example. https://github.com/TRNSYSJP/weapy',
+        '<longitude> {0} ! East of greenwich: negative'.format(longitude * (-1)),
+        '<latitude>  {0}   ! '.format(latitude),
+    ] + BASELINE_VARS + ['']
+    f = io.StringIO()
+    f.write('\n'.join(header))
+    df.to_csv(f, header=False, index=False, sep=' ', lineterminator='\n')
+    return f.getvalue()
+
+
+def written(*args, **kwargs):
+    f = io.StringIO()
+    write_type99(f, *args, **kwargs)
+    return f.getvalue()
+
+
+def test_ea_matches_baseline(ea_file, ea_stations):
+    wea = WeaFile(ea_file, 5)
+    assert written(wea, wea.latitude, wea.longitude) == \
+        baseline_type99(wea, wea.latitude, wea.longitude, TYPE99_COLUMNS)
+
+
+def test_ea2020_matches_baseline(ea2020_file):
+    wea = Wea2File(ea2020_file, 5)
+    assert written(wea, wea.latitude, wea.longitude) == \
+        baseline_type99(wea, wea.latitude, wea.longitude, TYPE99_EA2020_COLUMNS)
+
+
+def test_ea2020_format_does_not_decode_pressure(ea2020_file, monkeypatch):
+    def pressure(self):
+        raise AssertionError('pressure decoded')
+    monkeypatch.setattr(Wea2File, 'pressure', property(pressure))
+    wea = Wea2File(ea2020_file, 5)
+    text = written(wea, wea.latitude, wea.longitude)
+    assert text == baseline_type99(wea, wea.latitude, wea.longitude, TYPE99_EA2020_COLUMNS)
+
+
+def test_epw_fills_missing_columns(epw_file):
+    wea = EpwFile(epw_file)
+    lines = written(wea, 35.69, 139.76).splitlines()
+    data = [line.split(' ') for line in lines[lines.index('<data>') + 1:]]
+    assert len(data) == 8760
+    assert {row[7] for row in data} == {'0.0'}     #日照時間(udef3)は値が無いため0
+    assert [float(row[0]) for row in data[:24]] == [round(t, 1) for t in wea.ambient_temperatures[:24]]
+
+
+def test_stations_match_single(ea2020_file, tmp_path):
+    data, stations = load_stations(ea2020_file, [2, 3])
+    filenames = write_type99_stations(str(tmp_path), data, EA2020_ELEMENTS, stations, 'ea2020_{no:0=3}.99')
+    for filename, no in zip(filenames, [2, 3]):
+        wea = Wea2File(ea2020_file, no)
+        with open(filename, encoding='utf-8', newline='') as f:
+            assert f.read() == written(wea, wea.latitude, wea.longitude)
+
+
+def test_header_longitude_sign():
+    header = type99_header(35.69, 139.76)
+    assert '<longitude> -139.76 ' in header
+    assert header.endswith('<data>\n')
+
+
+def test_fmt(ea2020_file):
+    wea = Wea2File(ea2020_file, 1)
+    fmt = ['%.2f'] * len(TYPE99_EA2020_COLUMNS)
+    lines = written(wea, wea.latitude, wea.longitude, fmt=fmt).splitlines()
+    first = lines[lines.index('<data>') + 1].split(' ')
+    assert first[0] == '%.2f' % wea.ambient_temperatures[0]
+    with pytest.raises(ValueError):
+        written(wea, wea.latitude, wea.longitude, fmt=fmt[:3])
+
+
+def test_array_input(ea2020_file):
+    wea = Wea2File(ea2020_file, 1)
+    data = np.array([getattr(wea, column[1]) for column in TYPE99_EA2020_COLUMNS])
+    assert written(data, wea.latitude, wea.longitude, columns=TYPE99_EA2020_COLUMNS) == \
+        written(wea, wea.latitude, wea.longitude)
@@ -0,0 +1,59 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+import os
+import numpy as np
+import pytest
+from weapy import synthetic
+from weapy.stationindex import set_ea_stations, save_ea_stations
+from weapy.type99batch import main, parse_stations
+
+
+@pytest.fixture(autouse=True)
+def reset_stations():
+    yield
+    set_ea_stations(None)   #main(--station-table)で設定した地点情報を戻す
+
+
+@pytest.fixture(scope='module')
+def ea_job(tmp_path_factory):
+    """11地点（ファイルサイズではEA2020とも判定できる地点数）のEAと地点情報"""
+    folder = tmp_path_factory.mktemp('batch')
+    filename = str(folder / 'ea.wea')
+    table = str(folder / 'stations.csv')
+    save_ea_stations(synthetic.write_ea(filename, 11), table)
+    return filename, table
+
+
+def test_parse_stations():
+    np.testing.assert_array_equal(parse_stations('all', 4), [1, 2, 3, 4])
+    np.testing.assert_array_equal(parse_stations('3, 1-2,2', 10), [1, 2, 3])
+    with pytest.raises(ValueError):
+        parse_stations('0-3', 10)
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_ea_all_stations(ea_job, tmp_path, workers):
+    filename, table = ea_job
+    assert main([filename, '-o', str(tmp_path), '-j', workers, '--station-table', table, '-q']) == 0
+    names = sorted(os.listdir(str(tmp_path)))
+    assert len(names) == 11
+    assert names[0].startswith('ea_001_')
+
+
+def test_ea_without_station_table(ea_job, tmp_path, capsys):
+    filename, _ = ea_job
+    with pytest.raises(SystemExit) as e:
+        main([filename, '-o', str(tmp_path / 'out'), '-q'])
+    assert e.value.code == 2
+    assert '--station-table' in capsys.readouterr().err
+    assert not os.path.exists(str(tmp_path / 'out'))   #変換を始める前に終了する
+
+
+def test_ea2020_selected_stations(ea2020_file, tmp_path):
+    assert main([ea2020_file, '2,4-5', '-o', str(tmp_path), '-j', '1', '-q', '--solar']) == 0
+    names = sorted(os.listdir(str(tmp_path)))
+    assert [name[:10] for name in names] == ['ea2020_002', 'ea2020_004', 'ea2020_005']
+    with open(os.path.join(str(tmp_path), names[0]), encoding='utf-8') as f:
+        assert '<var>\tIBEAM_N\t<col>\t10' in f.read()
@@ -1,2 +1,42 @@
+__version__ = '0.2.0'
+
 from weapy.weatherdata import WeatherDataFile
 # import wea.weatherdata
+
+#主なクラス、関数は初回の参照時にモジュールを読み込む（import weapy でnumpy, pandasを読み込まない）
+#名前: モジュール
+_LAZY_ATTRS = {
+    'WeaFile': 'weafile',
+    'Wea2File': 'wea2file',
+    'EpwFile': 'epwfile',
+    'read_epw': 'epwfile',
+    'WeaMap': 'weamap',
+    'load_stations': 'weamap',
+    'load_all_stations': 'weamap',
+    'WeaSeries': 'weaseries',
+    'load_epw_files': 'epwbatch',
+    'load_station_index': 'stationindex',
+    'StationLocator': 'stationindex',
+    'DiskCache': 'diskcache',
+    'open_weafile': 'factory',
+    'open_wea2file': 'factory',
+    'open_epwfile': 'factory',
+    'write_type99': 'type99',
+    'resample_weather': 'resample',
+}
+
+__all__ = ['__version__', 'WeatherDataFile'] + list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError("module 'weapy' has no attribute '{0}'".format(name))
+    import importlib
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value #2回目以降は通常の属性として参照する
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,170 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+気温の日別統計、移動平均、度日、設計用温度、暖房期間を複数地点で一括で計算する
+
+1時間毎の値 shape (..., 8760) を (..., 365, 24) へ変形して、pandasを使用せずに計算する。
+地点、基準温度(判定温度)は配列の次元として扱い、1回の呼び出しで全ての組み合わせを計算する。
+"""
+
+import numpy as np
+
+HOURS_PER_DAY = 24
+
+
+def daily_values(vals):
+    """
+    1時間毎の値を日毎に変形する
+
+    Parameters
+    ----------
+    vals : ndarray
+    1時間毎の値, shape (..., 時間)（時間は24の倍数）
+
+    Returns
+    ----------
+    vals : ndarray
+    shape (..., 日, 24)の配列（コピー無し）
+    """
+    vals = np.asarray(vals)
+    if vals.shape[-1] % HOURS_PER_DAY != 0:
+        raise ValueError('時間数が24の倍数ではありません: {0}'.format(vals.shape[-1]))
+    return vals.reshape(vals.shape[:-1] + (-1, HOURS_PER_DAY))
+
+
+def daily_statistics(vals):
+    """
+    日最高、日平均、日最低の値を返す
+
+    Returns
+    ----------
+    maximum, mean, minimum : ndarray
+    shape (..., 日)の配列
+    """
+    days = daily_values(vals)
+    return days.max(axis=-1), days.mean(axis=-1), days.min(axis=-1)
+
+
+def moving_average(daily, window=9, passes=3):
+    """
+    日毎の値の移動平均（中心、年の始めと終わりをつないだ循環）を返す
+
+    既定はexamples/heating_periodの9日移動平均を3回繰り返すスムージングと同じ
+
+    Parameters
+    ----------
+    daily : ndarray
+    日毎の値, shape (..., 日)
+
+    window : int
+    移動平均の日数（奇数）
+
+    passes : int
+    移動平均を繰り返す回数
+    """
+    if window % 2 != 1:
+        raise ValueError('移動平均の日数は奇数を指定してください')
+    half = window // 2
+    vals = np.asarray(daily, dtype=np.float64)
+    for _ in range(passes):
+        padded = np.concatenate([vals[..., -half:], vals, vals[..., :half]], axis=-1) if half else vals
+        total = np.cumsum(padded, axis=-1)
+        total = np.concatenate([np.zeros(total.shape[:-1] + (1,)), total], axis=-1)
+        vals = (total[..., window:] - total[..., :-window]) / window
+    return vals
+
+
+def degree_days(vals, bases, cooling=False, hourly=False):
+    """
+    度日を計算する
+
+    Parameters
+    ----------
+    vals : ndarray
+    1時間毎の気温[C], shape (..., 時間)
+
+    bases : float or list of float
+    基準温度[C], shape (基準温度,)
+
+    cooling : bool
+    Falseの場合は暖房度日 Σ(基準温度 - 日平均気温)+、Trueの場合は冷房度日 Σ(日平均気温 - 基準温度)+
+
+    hourly : bool
+    Trueの場合は日平均気温の代わりに1時間毎の気温で計算する（度時 / 24）
+
+    Returns
+    ----------
+    degree_days : ndarray
+    度日[C・day], shape (..., 基準温度)
+    """
+    bases = np.atleast_1d(np.asarray(bases, dtype=np.float64))[:, np.newaxis]
+    temps = np.asarray(vals, dtype=np.float64) if hourly else daily_statistics(vals)[1]
+    temps = np.expand_dims(temps, -2)
+    diff = temps - bases if cooling else bases - temps
+    total = np.maximum(diff, 0.0).sum(axis=-1)
+    return total / HOURS_PER_DAY if hourly else total
+
+
+def design_temperatures(vals, percentiles=(0.4, 1.0, 99.0, 99.6)):
+    """
+    1時間毎の気温の百分位数(設計用温度)を返す
+
+    e.g. 0.4は年間の99.6%の時間が上回る温度（暖房設計用）、99.6は0.4%の時間が上回る温度（冷房設計用）
+
+    Returns
+    ----------
+    temperatures : ndarray
+    shape (..., 百分位数)の配列
+    """
+    temps = np.percentile(np.asarray(vals, dtype=np.float64), percentiles, axis=-1)
+    return np.moveaxis(np.atleast_1d(temps), 0, -1)
+
+
+def heating_periods(smoothed, thresholds):
+    """
+    移動平均した日平均気温から暖房期間を判定する（examples/heating_periodの判定方法）
+
+    最寒日から前後へ、気温が判定温度を超える日の手前までを暖房期間とする
+
+    Parameters
+    ----------
+    smoothed : ndarray
+    移動平均した日平均気温, shape (..., 日)（moving_averageの結果）
+
+    thresholds : float or list of float
+    判定温度[C], shape (判定温度,)
+
+    Returns
+    ----------
+    start, end : ndarray
+    暖房期間の開始日、終了日（0から、年をまたぐ場合は start > end）, shape (..., 判定温度)。
+    最寒日の気温が判定温度を超える場合は-1、年間を通じて判定温度以下の場合は0, 日数-1
+
+    days : ndarray
+    暖房期間の日数, shape (..., 判定温度)
+    """
+    smoothed = np.asarray(smoothed, dtype=np.float64)
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=np.float64))
+    count = smoothed.shape[-1]
+
+    #最寒日を先頭にして並べ替え、(..., 判定温度, 日)で判定温度を超える日を探す
+    coldest = smoothed.argmin(axis=-1)
+    order = (coldest[..., np.newaxis] + np.arange(count)) % count
+    rolled = np.take_along_axis(smoothed, order, axis=-1)
+    above = np.expand_dims(rolled, -2) > thresholds[:, np.newaxis]
+
+    forward = above[..., 1:]                #最寒日の翌日から進む
+    backward = above[..., :0:-1]            #最寒日の前日から遡る
+    found = forward.any(axis=-1)
+    after = np.where(found, forward.argmax(axis=-1), count - 1)
+    before = np.where(found, backward.argmax(axis=-1), 0)
+
+    coldest = coldest[..., np.newaxis]
+    start = np.where(found, (coldest - before) % count, 0)
+    end = np.where(found, (coldest + after) % count, count - 1)
+    days = np.where(found, before + after + 1, count)
+
+    none = above[..., 0]                    #最寒日の気温が判定温度を超える
+    return np.where(none, -1, start), np.where(none, -1, end), np.where(none, 0, days)
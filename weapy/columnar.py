@@ -0,0 +1,222 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+気象データをParquet, Arrow IPC(Feather)形式で出力する（pyarrowが必要）
+
+気象データを 地点(station), 気象要素(element), 日時(timestamp), 値(value, float32) の
+縦持ちの表として、地点毎のフォルダ(station=地点)へ圧縮して保存する(hive形式のパーティション)。
+"""
+
+import os
+import numpy as np
+from .weatherdata import HOURS_PER_YEAR
+
+FORMAT_EXT = {'parquet': '.parquet', 'feather': '.arrow'}    #形式毎のファイルの拡張子
+
+#collectで取り出す気象要素（WeatherDataFileのプロパティ名）
+ELEMENTS = ('ambient_temperatures', 'absolute_humidities', 'relative_humidities',
+            'horizontal_global_solar_irradiations', 'downward_longwave_irradiations',
+            'wind_directions', 'wind_velocities', 'precipitation_amounts', 'sunshine_durations')
+
+
+def _import_pyarrow():
+    """pyarrowを読み込む（オプションの依存パッケージ）"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Parquet, Arrow IPC(Feather)の入出力にはpyarrowが必要です。pip install pyarrow') from None
+    return pyarrow
+
+
+def timestamps(year=2001, hours=HOURS_PER_YEAR):
+    """
+    1時間毎の日時を返す
+
+    値は前1時間の値のため、1月1日1時から始まる（1時の値は0時～1時）
+
+    Returns
+    ----------
+    times : ndarray
+    datetime64[s]の配列, shape (hours,)
+    """
+    start = np.datetime64('{0:04d}-01-01T01:00:00'.format(year), 's')
+    return start + np.arange(hours) * np.timedelta64(3600, 's')
+
+
+def collect(weas, elements=None, stations=None):
+    """
+    WeatherDataFileのリストから、気象データを (地点, 要素, 時間) の配列へまとめる
+
+    Parameters
+    ----------
+    weas : list of WeatherDataFile
+    WeaFile, Wea2File, EpwFileなど
+
+    elements : list of str
+    取り出す気象要素のプロパティ名。省略時はELEMENTS。値の無い要素(NotImplementedError)はNaN
+
+    stations : list
+    地点の名前（int or str）。省略時は地点番号(station_no)、無ければファイル名
+
+    Returns
+    ----------
+    data : ndarray
+    float32の配列, shape (地点, 要素, 時間)
+
+    stations : list
+    地点の名前
+
+    elements : list of str
+    気象要素のプロパティ名
+    """
+    elements = list(ELEMENTS if elements is None else elements)
+    if stations is None:
+        stations = [getattr(wea, 'station_no', None) or os.path.splitext(os.path.basename(wea.file_name))[0]
+                    for wea in weas]
+
+    data = None
+    for i, wea in enumerate(weas):
+        for j, element in enumerate(elements):
+            try:
+                vals = np.asarray(getattr(wea, element), dtype=np.float32)
+            except NotImplementedError:
+                continue #EPWの絶対湿度など
+            if data is None:
+                data = np.full((len(weas), len(elements), len(vals)), np.nan, dtype=np.float32)
+            data[i, j] = vals
+
+    if data is None:
+        data = np.full((len(weas), len(elements), HOURS_PER_YEAR), np.nan, dtype=np.float32)
+    return data, list(stations), elements
+
+
+def _station_table(pa, vals, elements, times):
+    """1地点分の表(element, timestamp, value)を作成する"""
+    indices = np.repeat(np.arange(len(elements), dtype=np.int8), len(times))
+    return pa.table({
+        'element': pa.DictionaryArray.from_arrays(indices, elements),
+        'timestamp': pa.array(np.tile(times, len(elements))),
+        'value': pa.array(np.ascontiguousarray(vals, dtype=np.float32).ravel()),
+    })
+
+
+def write_dataset(path, data, stations, elements, format='parquet', compression='zstd', year=2001):
+    """
+    気象データを地点毎のファイルへ出力する
+
+    出力先のフォルダに path/station=地点/part-0.parquet（Featherは.arrow）の形式で保存する。
+
+    Parameters
+    ----------
+    path : string
+    出力先のフォルダ
+
+    data : ndarray
+    shape (地点, 要素, 時間)の配列。load_stations, load_epw_files, collectの結果
+
+    stations : list
+    地点の名前（地点番号など）
+
+    elements : list of str
+    気象要素の名前
+
+    format : str
+    'parquet', もしくは 'feather'(Arrow IPC)
+
+    compression : str
+    圧縮の形式 e.g. 'zstd', 'lz4', 'snappy'(parquetのみ), None
+
+    year : int
+    日時の年（標準年のデータは任意の年）
+    """
+    pa = _import_pyarrow()
+    if format not in FORMAT_EXT:
+        raise ValueError('formatは{0}のいずれかを指定してください'.format(list(FORMAT_EXT)))
+    if len(stations) != data.shape[0] or len(elements) != data.shape[1]:
+        raise ValueError('地点、気象要素の数がdataの形状{0}と一致しません'.format(data.shape))
+
+    times = timestamps(year, data.shape[2])
+    elements = [str(element) for element in elements]
+
+    #1地点ずつ表を作成して書き込む（全地点分の表をメモリへ展開しない）
+    for station, vals in zip(stations, data):
+        folder = os.path.join(path, 'station={0}'.format(station))
+        os.makedirs(folder, exist_ok=True)
+        filename = os.path.join(folder, 'part-0' + FORMAT_EXT[format])
+        table = _station_table(pa, vals, elements, times)
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, filename, compression=compression or 'none')
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, filename, compression=compression or 'uncompressed')
+
+
+def write_weather_files(path, weas, elements=None, stations=None, **kwargs):
+    """
+    WeatherDataFileのリストを地点毎のファイルへ出力する
+
+    collect(weas, elements, stations)の結果をwrite_datasetで出力する。kwargsはwrite_datasetの引数
+    """
+    data, stations, elements = collect(weas, elements, stations)
+    write_dataset(path, data, stations, elements, **kwargs)
+
+
+def read_dataset(path, stations=None, elements=None, format='parquet'):
+    """
+    write_datasetで出力した気象データを読み出す
+
+    Parameters
+    ----------
+    stations : list
+    読み出す地点の名前。省略時は全地点
+
+    elements : list of str
+    読み出す気象要素の名前。省略時は全要素
+
+    Returns
+    ----------
+    data : ndarray
+    float32の配列, shape (地点, 要素, 時間)
+
+    stations : list
+    地点の名前（並び順）。省略時は昇順
+
+    elements : list of str
+    気象要素の名前（並び順）。省略時は出力した時の並び（write_datasetのelementsの順）
+    """
+    pa = _import_pyarrow()
+    import pyarrow.dataset as ds
+    import pyarrow.compute as pc
+
+    dataset = ds.dataset(path, format='parquet' if format == 'parquet' else 'ipc', partitioning='hive')
+    condition = None
+    if stations is not None:
+        condition = ds.field('station').isin(list(stations))
+    if elements is not None:
+        selected = ds.field('element').isin(list(elements))
+        condition = selected if condition is None else condition & selected
+    table = dataset.to_table(filter=condition)
+
+    #地点、気象要素、日時の位置へ値を配置して (地点, 要素, 時間) の配列にする（並べ替えはしない）
+    table = table.combine_chunks()
+    station_values = table.column('station')
+    element_values = pc.cast(table.column('element'), 'string')
+
+    #気象要素は各地点の表へ出力した順に並んでいるので、出現した順(unique)が出力した時の並び
+    found_stations = pc.unique(station_values).to_pylist()
+    found_elements = pc.unique(element_values).to_pylist()
+    stations = sorted(found_stations) if stations is None else [s for s in stations if s in found_stations]
+    elements = found_elements if elements is None else [e for e in elements if e in found_elements]
+
+    i = pc.index_in(station_values, value_set=pa.array(stations)).to_numpy()
+    j = pc.index_in(element_values, value_set=pa.array(elements)).to_numpy()
+    seconds = table.column('timestamp').cast(pa.timestamp('s')).cast('int64').to_numpy()
+    k = (seconds - seconds.min()) // 3600 if len(seconds) else seconds
+    hours = int(k.max()) + 1 if len(k) else 0
+
+    data = np.full((len(stations), len(elements), hours), np.nan, dtype=np.float32)
+    data[i, j, k] = table.column('value').to_numpy()
+    return data, stations, elements
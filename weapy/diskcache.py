@@ -0,0 +1,190 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+読み出した気象データをディスクへキャッシュする（オプション）
+
+キャッシュは元のファイルのパス、サイズ、更新日時(またはファイルの内容のハッシュ)、
+地点番号、weapyのバージョンをキーとして、キャッシュフォルダへ1地点1ファイル(.npz)で保存する。
+キャッシュフォルダの合計サイズが上限を超えた場合は、最後に使用した日時が古いものから削除する。
+テキストの解析に時間のかかるEPW(EpwFile)で使用する。拡張アメダス気象データは地点のレコード一式を
+1回で読み出す方がキャッシュの読み込みより速いため、キャッシュしない。
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+import numpy as np
+
+CACHE_EXT = '.npz'  #キャッシュファイルの拡張子
+
+
+def default_cache_dir():
+    """
+    既定のキャッシュフォルダ(~/.cache/weapy)を返す
+    """
+    return os.path.join(os.path.expanduser('~'), '.cache', 'weapy')
+
+
+class DiskCache:
+    # コンストラクタの定義
+    def __init__(self, cache_dir=None, max_bytes=1024**3, content_hash=False):
+        """
+        ディスクキャッシュ
+
+        Parameters
+        ----------
+        cache_dir : string
+        キャッシュフォルダ。省略時は ~/.cache/weapy
+
+        max_bytes : int
+        キャッシュフォルダの合計サイズの上限[bytes]
+
+        content_hash : bool
+        Trueの場合、ファイルのサイズ、更新日時の代わりにファイルの内容のハッシュをキーに使用する
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.content_hash = content_hash
+        self.__file_hashes = {} #ファイルの内容のハッシュ, (パス, サイズ, 更新日時)毎に1回だけ計算する
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, filename, kind, no=0):
+        """
+        キャッシュのキーを返す
+
+        Parameters
+        ----------
+        filename : string
+        元の気象データファイル
+
+        kind : string
+        データの種類 e.g. 'ea', 'ea2020', 'epw'
+
+        no : int
+        地点番号（EPWは0）
+        """
+        from . import __version__
+
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        if self.content_hash:
+            source = self.__hash_file(path, st)
+        else:
+            source = '{0}:{1}'.format(st.st_size, st.st_mtime_ns)
+
+        text = '\n'.join([path, source, kind, str(no), __version__])
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def __hash_file(self, path, st):
+        """ファイルの内容のハッシュを返す"""
+        stamp = (path, st.st_size, st.st_mtime_ns)
+        digest = self.__file_hashes.get(stamp)
+        if digest is None:
+            h = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024*1024), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self.__file_hashes[stamp] = digest
+        return digest
+
+    def __path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_EXT)
+
+    def load(self, key):
+        """
+        キャッシュを読み出す
+
+        Returns
+        ----------
+        arrays : dict of ndarray
+        キャッシュが無い場合はNone
+        """
+        path = self.__path(key)
+        try:
+            with np.load(path) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            os.utime(path) #最後に使用した日時を更新
+        except FileNotFoundError:
+            return None #キャッシュが無い
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            #壊れたキャッシュ（書き込み途中で中断したファイルなど）は削除して、無い場合と同じにする
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return arrays
+
+    def save(self, key, arrays):
+        """
+        キャッシュを保存する。保存後、合計サイズが上限を超えていれば古いものから削除する
+
+        Parameters
+        ----------
+        arrays : dict of ndarray
+        """
+        #書き込み途中のファイルを他のプロセスが読まないように、一時ファイルへ書き込んでから置き換える
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.__path(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.evict()
+
+    def fetch(self, filename, kind, no, loader):
+        """
+        キャッシュがあれば読み出し、無ければloader()の結果を保存して返す
+
+        Parameters
+        ----------
+        loader : callable
+        元のファイルから読み出して、dict of ndarrayを返す関数
+        """
+        key = self.key(filename, kind, no)
+        arrays = self.load(key)
+        if arrays is None:
+            arrays = loader()
+            self.save(key, arrays)
+        return arrays
+
+    def evict(self):
+        """
+        合計サイズが上限以下になるまで、最後に使用した日時が古いキャッシュを削除する
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(CACHE_EXT):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue #他のプロセスが削除した
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        キャッシュを全て削除する
+        """
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(CACHE_EXT):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
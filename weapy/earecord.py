@@ -0,0 +1,119 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+拡張アメダス気象データ(EA)のレコードを一括で読み出し、デコードする
+
+EAのファイルは1地点あたり複数のレコード(18306 bytes)で構成される固定長のバイナリ。
+各レコードは、地点番号、種別、年(int16 x 3)のレコードヘッダーに続いて、
+1時間毎の値(int16)が並ぶ。値の1の位はリマーク(備考)なので、10で割って切り捨てる。
+"""
+
+import numpy as np
+from .weatherdata import HOURS_PER_YEAR
+
+RECORD_LENGTH = 18306                   #1レコードの長さ[bytes]
+RECORD_WORDS = RECORD_LENGTH // 2       #1レコードのint16の個数
+RECORD_HEADER_WORDS = 3                 #レコードヘッダー(地点番号、種別、年)のint16の個数
+
+EA_RECORDS = 8          #拡張アメダス標準年(EA)の1地点あたりのレコード数
+EA2020_RECORDS = 11     #拡張アメダス2020年版(EA2020)の1地点あたりのレコード数(地点情報レコードを含む)
+
+#EAで整数値としてエンコードされているデータから実数への換算係数
+#拡張アメダス気象データ 1981-2000, 表3.2 気象要素の単位
+#気温、絶対湿度、全天日射量、大気放射量、風向、風速、降水量、日照時間
+EA_SCALE_FACTORS = [0.1, 0.1, 0.01, 0.01, 1.0, 0.1, 1.0, 0.1]
+
+#拡張アメダス気象データ（EA 気象データ）基礎知識（2020 年版）2022 年12 月31 日 V.03
+#気温、絶対湿度、全天日射量、大気放射量、風向、風速、降水量、日照時間、気圧、相対湿度
+EA2020_SCALE_FACTORS = [0.1, 0.1, 0.01, 0.01, 1.0, 0.1, 0.1, 0.01, 1.0, 0.1]
+
+#デコードした値の保持方法と型
+#'float64': float64で保持する, 'float32': float32で保持する,
+#'int16': リマーク付きの値(int16)のみ保持し、参照の都度float32へデコードする（風向の角度、EAの相対湿度はfloat32で保持する）
+STORAGE_DTYPES = {'float64': np.float64, 'float32': np.float32, 'int16': np.float32}
+
+
+def read_block(f, no, records):
+    """
+    指定された地点のレコード一式を1回の読み出しで取得する
+
+    Parameters
+    ----------
+    f : file object
+    バイナリモードで開いたEAのファイル
+
+    no : int
+    拡張アメダスの地点番号[1-842]
+
+    records : int
+    1地点あたりのレコード数(EA_RECORDS, EA2020_RECORDS)
+
+    Returns
+    ----------
+    block : ndarray
+    int16の配列, shape (records, RECORD_WORDS)
+    """
+    block_length = RECORD_LENGTH * records
+    f.seek((no-1)*block_length) # go to the head of the specified station.
+    buf = f.read(block_length)
+    if len(buf) != block_length:
+        raise ValueError('地点番号{}のデータがファイルにありません'.format(no))
+
+    return np.frombuffer(buf, dtype='<i2').reshape(records, RECORD_WORDS)
+
+
+def element_codes(record, hours=HOURS_PER_YEAR):
+    """
+    レコードからレコードヘッダーを除いた、1時間毎の値(リマーク付き)を返す
+
+    Parameters
+    ----------
+    record : ndarray
+    int16の配列, 最後の次元がRECORD_WORDS
+
+    hours : int
+    読み出す時間数
+    """
+    return record[..., RECORD_HEADER_WORDS:RECORD_HEADER_WORDS + hours]
+
+
+def remove_remark(codes):
+    """
+    Remove the remark\n
+    リマーク(1の位)を除いた値を返す（負の値は切り捨て）
+    """
+    return np.floor_divide(codes, 10) # round the value down
+
+
+def decode_values(codes, sf, dtype=np.float64):
+    """
+    リマーク付きの値から、リマークを除いて実数値へ換算する
+
+    Parameters
+    ----------
+    codes : ndarray
+    リマーク付きの値(int16)
+
+    sf : float or ndarray
+    換算係数（ndarrayの場合はcodesとブロードキャスト可能な形状）
+
+    dtype : data-type
+    換算後の型(np.float64, np.float32)
+
+    Returns
+    ----------
+    vals : ndarray
+    dtypeの配列
+    """
+    return np.multiply(remove_remark(codes), sf, dtype=dtype)
+
+
+def storage_dtype(storage):
+    """
+    保持方法(STORAGE_DTYPES)のデコード後の型を返す
+    """
+    if storage not in STORAGE_DTYPES:
+        raise ValueError('storageは{0}のいずれかを指定してください'.format(list(STORAGE_DTYPES)))
+    return STORAGE_DTYPES[storage]
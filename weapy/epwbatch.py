@@ -0,0 +1,117 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+複数のEPWファイルをプロセスプールで並列に読み出す
+
+フォルダ、もしくはglobのパターンで指定したEPWファイルを読み出し、
+(ファイル, 列, 時間)の配列と、ファイル毎の地点情報を返す。
+読み出せなかったファイルは処理を中断せずに、エラーとしてまとめて返す。
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .weatherdata import HOURS_PER_YEAR
+from .epwfile import EPW_PROPERTY_LABELS, read_epw
+
+#地点情報の構造化配列の型
+LOCATION_DTYPE = [('file', 'U260'), ('city', 'U64'), ('state', 'U64'), ('country', 'U16'), ('wmo', 'U16'),
+                  ('latitude', 'f8'), ('longitude', 'f8'), ('time_zone', 'f8'), ('elevation', 'f8')]
+
+
+def find_epw_files(source):
+    """
+    EPWファイルのリストを返す
+
+    Parameters
+    ----------
+    source : string or list of string
+    フォルダ(フォルダ内の*.epw)、globのパターン、もしくはファイル名のリスト
+    """
+    if not isinstance(source, str):
+        return list(source)
+    if os.path.isdir(source):
+        source = os.path.join(source, '*.epw')
+    return sorted(glob.glob(source))
+
+
+def _read_file(filename, labels, dtype, hours):
+    """
+    1ファイル分を読み出す（プロセスプールで実行する）
+    """
+    header, columns = read_epw(filename, labels, dtype)
+    vals = np.stack([columns[label] for label in labels])
+    if vals.shape[1] != hours:
+        raise ValueError('データの行数が{0}ではありません({1}行)'.format(hours, vals.shape[1]))
+
+    loc = header.location
+    if loc is None:
+        raise ValueError('LOCATIONがありません')
+    location = (filename, loc.city, loc.state, loc.country, loc.wmo,
+                loc.latitude, loc.longitude, loc.time_zone, loc.elevation)
+    return vals, location
+
+
+def load_epw_files(source, labels=None, dtype=np.float64, max_workers=None, hours=HOURS_PER_YEAR):
+    """
+    複数のEPWファイルを並列に読み出す
+
+    Parameters
+    ----------
+    source : string or list of string
+    フォルダ(フォルダ内の*.epw)、globのパターン、もしくはファイル名のリスト
+
+    labels : list of str
+    読み出す列の名前(EPW_LABELS)。省略時はEpwFileのプロパティで使用する列(EPW_PROPERTY_LABELS)
+
+    dtype : data-type
+    読み出す値の型(np.float64, np.float32)
+
+    max_workers : int
+    ワーカープロセスの数。省略時はCPUの数。1の場合はプロセスプールを使用せずに順に読み出す
+
+    hours : int
+    1ファイルあたりのデータの行数。行数が異なるファイルはエラーとする
+
+    Returns
+    ----------
+    data : ndarray
+    shape (ファイル, 列, hours)の配列。列の並びはlabelsの通り
+
+    locations : ndarray
+    ファイル毎の地点情報の構造化配列(LOCATION_DTYPE)。dataと同じ並び
+
+    errors : dict
+    読み出せなかったファイル名とエラーメッセージ
+    """
+    if labels is None:
+        labels = EPW_PROPERTY_LABELS
+    files = find_epw_files(source)
+
+    results = {}
+    errors = {}
+    if max_workers == 1:
+        for filename in files:
+            try:
+                results[filename] = _read_file(filename, labels, dtype, hours)
+            except Exception as e:
+                errors[filename] = '{0}: {1}'.format(type(e).__name__, e)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {filename: executor.submit(_read_file, filename, labels, dtype, hours) for filename in files}
+            for filename, future in futures.items():
+                try:
+                    results[filename] = future.result()
+                except Exception as e:
+                    errors[filename] = '{0}: {1}'.format(type(e).__name__, e)
+
+    loaded = [filename for filename in files if filename in results]
+    data = np.empty((len(loaded), len(labels), hours), dtype=dtype)
+    locations = np.empty(len(loaded), dtype=LOCATION_DTYPE)
+    for i, filename in enumerate(loaded):
+        data[i], locations[i] = results[filename]
+
+    return data, locations, errors
@@ -3,68 +3,247 @@
 # copyright  quattro corporate design. All right reserved.
 
 from .weatherdata import WeatherDataFile
-import struct
-import math
 import numpy as np
-import pandas as pd
-import csv
+
+# ①-⑥	年,月,日,時,分,リマーク
+# ⑦ 外気温度[°Ｃ]
+# ⑧	露点温度[°Ｃ]
+# ⑨	相対湿度[％]
+# ⑩	大気圧[Pa]
+# ⑪	大気圏外水平面日射量[W/m2]
+# ⑫	大気圏外法線面直達日射量[W/m2]
+# ⑬	大気放射量[W/m2]
+# ⑭	全天日射量[W/m2]
+# ⑮	法線面直達日射量[W/m2]
+# ⑯	水平面天空日射量[W/m2]
+# ⑰	グローバル照度[lx]
+# ⑱	法線面直射照度[lx]
+# ⑲ 天空照度[lx]
+# ⑳ 天頂輝度[cd/m2]
+
+# ㉑ 風向[°]
+# ㉒ 風速[m/s]
+# ㉓ 雲量(0-10)
+# ㉔ 不透明雲量
+# ㉕ 視程[km]
+# ㉖ 雲高[m]
+# ㉗ 気象状況
+# ㉘ 気象コード
+# ㉙ 可降水量[mm]
+# ㉚ 大気の光学的厚さ
+# ㉛ 積雪量[cm]
+# ㉜ 最後の積雪からの日数[日]
+# ㉝ アルベド
+# ㉞ 降水量[mm]
+# ㉟ 降水時間[hr]
+
+
+# Date,HH:MM,Datasource,DryBulb {C},DewPoint {C},RelHum {%},Atmos Pressure {Pa},ExtHorzRad {Wh/m2},ExtDirRad {Wh/m2},HorzIRSky {Wh/m2},
+# GloHorzRad {Wh/m2},DirNormRad {Wh/m2},DifHorzRad {Wh/m2},GloHorzIllum {lux},DirNormIllum {lux},DifHorzIllum {lux},ZenLum {Cd/m2},WindDir {deg},WindSpd {m/s},
+# TotSkyCvr {.1},OpaqSkyCvr {.1},Visibility {km},Ceiling Hgt {m},PresWeathObs,PresWeathCodes,Precip Wtr {mm},Aerosol Opt Depth {.001},SnowDepth {cm},Days Last Snow,
+# Albedo {.01},Rain {mm},Rain Quantity {hr}
+EPW_LABELS = ['year','month','day','hour','min','Datasource','DryBulb','DewPoint','RelHum','AtmosPressure','ExtHorzRad','ExtDirRad','HorzIRSky',
+            'GloHorzRad','DirNormRad','DifHorzRad','GloHorzIllum','DirNormIllum','DifHorzIllum','ZenLum','WindDir','WindSpd',
+            'TotSkyCvr','OpaqSkyCvr','Visibility','CeilingHgt','PresWeathObs','PresWeathCodes','PrecipWtr','AerosolOptDepth','SnowDepth','DaysLastSnow',
+            'Albedo','Rain','RainQuantity']
+
+EPW_STRING_LABELS = ['Datasource', 'PresWeathCodes'] #数値として読み出せない列
+
+#EpwFileのプロパティで使用する列
+EPW_PROPERTY_LABELS = ['DryBulb', 'RelHum', 'GloHorzRad', 'HorzIRSky', 'WindDir', 'WindSpd', 'Rain']
+
+#EPWの仕様で整数の列（リストで返す場合は、値が全て整数であればintにする。pandas.read_csvで読み出した値と同じ型）
+EPW_INTEGER_LABELS = ['year', 'month', 'day', 'hour', 'min', 'RelHum', 'AtmosPressure', 'ExtHorzRad', 'ExtDirRad',
+                      'HorzIRSky', 'GloHorzRad', 'DirNormRad', 'DifHorzRad', 'GloHorzIllum', 'DirNormIllum',
+                      'DifHorzIllum', 'ZenLum', 'WindDir', 'TotSkyCvr', 'OpaqSkyCvr', 'CeilingHgt', 'PresWeathObs',
+                      'SnowDepth', 'DaysLastSnow']
+
+EPW_HEADER_LINES = 8 #ヘッダーの行数
+
+
+class epw_location:
+    """
+    LOCATION of the EPW header.
+
+    Attributes
+    ----------
+    city : str
+    state : str
+    country : str
+    source : str
+    wmo : str
+    latitude : float
+    longitude : float
+    time_zone : float
+    elevation : float
+    """
+    def __init__(self):
+        self.city = None        #都市名
+        self.state = None       #州、都道府県
+        self.country = None     #国
+        self.source = None      #データソース
+        self.wmo = None         #WMO地点番号
+        self.latitude = None    #緯度[deg] (北緯 +)
+        self.longitude = None   #経度[deg] (東経 +)
+        self.time_zone = None   #GMTとの時差[h] (東 +)
+        self.elevation = None   #標高[m]
+
+
+class design_conditions:
+    """
+    DESIGN CONDITIONS of the EPW header.
+
+    heating, cooling, extremesは各セクションの値(float)のリスト（空欄はnan）
+    """
+    def __init__(self):
+        self.source = None      #出典 e.g. Climate Design Data 2009 ASHRAE Handbook
+        self.heating = []       #暖房設計条件
+        self.cooling = []       #冷房設計条件
+        self.extremes = []      #極値
+
+
+class ground_temperature:
+    """
+    GROUND TEMPERATURES of the EPW header (one depth).
+    """
+    def __init__(self):
+        self.depth = None           #深さ[m]
+        self.conductivity = None    #土壌の熱伝導率[W/mK]（空欄はnan）
+        self.density = None         #土壌の密度[kg/m3]（空欄はnan）
+        self.specific_heat = None   #土壌の比熱[J/kgK]（空欄はnan）
+        self.temperatures = None    #月平均地中温度[C], ndarray(12)
+
+
+class data_period:
+    """
+    DATA PERIODS of the EPW header (one period).
+    """
+    def __init__(self):
+        self.name = None                #期間の名称
+        self.start_day_of_week = None   #開始日の曜日
+        self.start = None               #開始日 e.g. 1/ 1
+        self.end = None                 #終了日 e.g. 12/31
+
+
+class epw_header:
+    """
+    Header of the EPW file.
+
+    Attributes
+    ----------
+    location : epw_location
+    design_conditions : design_conditions
+    ground_temperatures : list of ground_temperature
+    data_periods : list of data_period
+    records_per_hour : int
+    lines : list of str
+    ヘッダーの8行（そのままの文字列）
+    """
+    def __init__(self):
+        self.location = None
+        self.design_conditions = None
+        self.ground_temperatures = []
+        self.data_periods = []
+        self.records_per_hour = None
+        self.lines = []
+
 
 class EpwFile(WeatherDataFile):
+    read_only = False   #共有するインスタンスの場合はTrue（wind_directions, wea_dataはコピーを返す）
+
     # コンストラクタの定義
-    def __init__(self, filename):
-        # ①-⑥	年,月,日,時,分,リマーク
-        # ⑦ 外気温度[°Ｃ]
-        # ⑧	露点温度[°Ｃ]
-        # ⑨	相対湿度[％]
-        # ⑩	大気圧[Pa]
-        # ⑪	大気圏外水平面日射量[W/m2]
-        # ⑫	大気圏外法線面直達日射量[W/m2]
-        # ⑬	大気放射量[W/m2]
-        # ⑭	全天日射量[W/m2]
-        # ⑮	法線面直達日射量[W/m2]
-        # ⑯	水平面天空日射量[W/m2]
-        # ⑰	グローバル照度[lx]
-        # ⑱	法線面直射照度[lx]
-        # ⑲ 天空照度[lx]
-        # ⑳ 天頂輝度[cd/m2]
-
-        # ㉑ 風向[°]
-        # ㉒ 風速[m/s]
-        # ㉓ 雲量(0-10)
-        # ㉔ 不透明雲量
-        # ㉕ 視程[km]
-        # ㉖ 雲高[m]
-        # ㉗ 気象状況
-        # ㉘ 気象コード
-        # ㉙ 可降水量[mm]
-        # ㉚ 大気の光学的厚さ
-        # ㉛ 積雪量[cm]
-        # ㉜ 最後の積雪からの日数[日]
-        # ㉝ アルベド
-        # ㉞ 降水量[mm]
-        # ㉟ 降水時間[hr]
-
-
-        # Date,HH:MM,Datasource,DryBulb {C},DewPoint {C},RelHum {%},Atmos Pressure {Pa},ExtHorzRad {Wh/m2},ExtDirRad {Wh/m2},HorzIRSky {Wh/m2},
-        # GloHorzRad {Wh/m2},DirNormRad {Wh/m2},DifHorzRad {Wh/m2},GloHorzIllum {lux},DirNormIllum {lux},DifHorzIllum {lux},ZenLum {Cd/m2},WindDir {deg},WindSpd {m/s},
-        # TotSkyCvr {.1},OpaqSkyCvr {.1},Visibility {km},Ceiling Hgt {m},PresWeathObs,PresWeathCodes,Precip Wtr {mm},Aerosol Opt Depth {.001},SnowDepth {cm},Days Last Snow,
-        # Albedo {.01},Rain {mm},Rain Quantity {hr}
-        labels = ['year','month','day','hour','min','Datasource','DryBulb','DewPoint','RelHum','AtmosPressure','ExtHorzRad','ExtDirRad','HorzIRSky',
-                    'GloHorzRad','DirNormRad','DifHorzRad','GloHorzIllum','DirNormIllum','DifHorzIllum','ZenLum','WindDir','WindSpd',
-                    'TotSkyCvr','OpaqSkyCvr','Visibility','CeilingHgt','PresWeathObs','PresWeathCodes','PrecipWtr','AerosolOptDepth','SnowDepth','DaysLastSnow',
-                    'Albedo','Rain','RainQuantity']
-        self.wea_data = pd.read_csv(filename, skiprows=8, sep=',', header=None, names=labels) #ヘッダーを読み飛ばして、Data Records のみ読み込む
+    def __init__(self, filename, cache=None, as_array=False, dtype=np.float64):
+        """
+        EPW形式の気象データを読み出す
+
+        Parameters
+        ----------
+        filename : string
+        EPWのファイル名
+
+        cache : DiskCache
+        ディスクキャッシュ（オプション）。指定した場合、読み出したデータをキャッシュする
+
+        as_array : bool
+        Trueの場合、各プロパティはリストの代わりに読み出し専用のndarray(WeaFileと同じ)を返す。
+        ndarrayは読み出したデータを参照し(コピー無し)、2回目以降のアクセスでは同じndarrayを返す
+
+        dtype : data-type
+        読み出す値の型(np.float64, np.float32)
+        """
+        self.file_name = filename
+        self.as_array = as_array
+        self.__data_frame = None
+
+        #プロパティで使用する列のみ読み出す
+        if cache is None:
+            self.header, self.columns = read_epw(filename, EPW_PROPERTY_LABELS, dtype)
+        else:
+            kind = 'epw-{}'.format(np.dtype(dtype).name)
+            arrays = cache.fetch(filename, kind, 0, lambda: self.__read_arrays(filename, dtype))
+            self.header = parse_epw_header(arrays.pop('header').tolist())
+            self.columns = arrays
+
+        for vals in self.columns.values():
+            vals.flags.writeable = False #as_arrayで返すndarrayは読み出し専用
+
+        #リストで返す場合にintにする列（値が全て整数の列のみ）
+        self.__integer_labels = {label for label, vals in self.columns.items()
+                                 if label in EPW_INTEGER_LABELS and np.all(np.mod(vals, 1) == 0)}
 
         # 風向
-        self.winddirs = self.wea_data['WindDir'].values.tolist()
-        
-        # 風速        
-        winspeeds = self.wea_data['WindSpd']
-        # indices = [i for i in range(0,8760) if winspeeds[i] == 0.0]
-        # for i in indices: 
-        #     #無風（静謐）あれば方位を -9999 へ変更する
-        #     self.winddirs[i] = -9999
+        if not as_array:
+            self.winddirs = self.__column('WindDir')
+
+    def __read_arrays(self, filename, dtype):
+        """
+        ファイルを読み出して、ヘッダーと列毎の配列(dict of ndarray)を返す（キャッシュ用）
+        """
+        header, columns = read_epw(filename, EPW_PROPERTY_LABELS, dtype)
+        columns['header'] = np.array(header.lines)
+        return columns
+
+    def __column(self, label):
+        """
+        列の値を返す。as_arrayの場合は読み出し専用のndarray、それ以外はリスト
+        """
+        vals = self.columns[label]
+        if not self.as_array:
+            if label in self.__integer_labels:
+                return vals.astype(np.int64).tolist() #相対湿度、日射量、風向などはint
+            return vals.tolist()
+        return vals
 
+    @property
+    def wea_data(self):
+        """
+        Get the DataFrame of all data records.\n
+        全ての列のDataFrameを返す（初回のアクセス時にファイルを読み出す）
+        """
+        if self.__data_frame is None:
+            import pandas as pd #pandasはDataFrameを使用する時のみ読み込む（importを速くする）
+
+            #ヘッダーを読み飛ばして、Data Records のみ読み込む
+            self.__data_frame = pd.read_csv(self.file_name, skiprows=EPW_HEADER_LINES, sep=',', header=None, names=EPW_LABELS)
+        if self.read_only:
+            return self.__data_frame.copy() #共有するインスタンスのDataFrameは変更させない
+        return self.__data_frame
+
+    @property
+    def location(self):
+        """
+        Get the LOCATION of the header.\n
+        ヘッダーの地点情報を返す
+        """
+        return self.header.location
+
+    @property
+    def nbytes(self):
+        """
+        Get the memory size of the data records. [bytes]\n
+        読み出したデータのメモリサイズを返す[bytes]
+        """
+        return sum(vals.nbytes for vals in self.columns.values())
 
     @property
     def ambient_temperatures(self):
@@ -72,7 +251,7 @@ class EpwFile(WeatherDataFile):
         Get the list of temperatures. [C]\n
         気温のリストを返す[C]
         """
-        return self.wea_data['DryBulb'].values.tolist()
+        return self.__column('DryBulb')
     
     # @ambient_temperatures.setter
     # def ambient_temperatures(self, val):        
@@ -96,7 +275,7 @@ class EpwFile(WeatherDataFile):
         Get the list of relative humidities.[g/kg]\n
         相対湿度のリストを返す[%]
         """
-        return self.wea_data['RelHum'].values.tolist()
+        return self.__column('RelHum')
     
     # @relative_humidities.setter
     # def relative_humidities(self, val):
@@ -109,7 +288,7 @@ class EpwFile(WeatherDataFile):
         全天日射量のリストを返す[W/m2]
         """
 
-        return self.wea_data['GloHorzRad'].values.tolist() #[Wh/m2]なんだけど結果OK?
+        return self.__column('GloHorzRad') #[Wh/m2]なんだけど結果OK?
 
     # @horizontal_global_solar_irradiations.setter
     # def horizontal_global_solar_irradiations(self, val):       
@@ -123,7 +302,7 @@ class EpwFile(WeatherDataFile):
         大気放射量のリストを返す[W/m2]
         """
         # raise NotImplementedError
-        return self.wea_data['HorzIRSky'].values.tolist()
+        return self.__column('HorzIRSky')
 
     # @downward_longwave_irradiations.setter
     # def downward_longwave_irradiations(self, val):
@@ -137,6 +316,10 @@ class EpwFile(WeatherDataFile):
         風向のリストを返す[deg]
         """
         # return self.wea_data['WindDir']
+        if self.as_array:
+            return self.__column('WindDir')
+        if self.read_only:
+            return list(self.winddirs) #共有するインスタンスのリストは変更させない
         return self.winddirs
     
     # @wind_directions.setter
@@ -149,7 +332,7 @@ class EpwFile(WeatherDataFile):
         Get the list of wind Velocities.[m/s]\n
         風速のリストを返す[m/s]
         """
-        return self.wea_data['WindSpd'].values.tolist()
+        return self.__column('WindSpd')
 
     # @wind_velocities.setter
     # def wind_velocities(self, val):
@@ -163,7 +346,7 @@ class EpwFile(WeatherDataFile):
         降水量のリストを返す[mm]
         """
         # raise NotImplementedError
-        return self.wea_data['Rain'].values.tolist()
+        return self.__column('Rain')
     
     # @precipitation_amounts.setter
     # def precipitation_amounts(self, val):
@@ -182,3 +365,145 @@ class EpwFile(WeatherDataFile):
     # @sunshine_durations.setter
     # def sunshine_durations(self, val):
     #     raise NotImplementedError
+
+# --------------------------------------------------------------------------------------------
+
+def read_epw(filename, labels=None, dtype=np.float64):
+    """
+    EPWのファイルから、ヘッダーと指定された列の値を読み出す
+
+    Parameters
+    ----------
+    filename : string
+    EPWのファイル名
+
+    labels : list of str
+    読み出す列の名前(EPW_LABELS)。省略時は数値の全ての列(EPW_STRING_LABELSを除く)
+
+    dtype : data-type
+    読み出す値の型(np.float64, np.float32)
+
+    Returns
+    ----------
+    header : epw_header
+    ヘッダー
+
+    columns : dict of ndarray
+    列の名前と値
+    """
+    if labels is None:
+        labels = [label for label in EPW_LABELS if label not in EPW_STRING_LABELS]
+    for label in labels:
+        if label not in EPW_LABELS or label in EPW_STRING_LABELS:
+            raise ValueError('数値の列を指定してください: {}'.format(label))
+    usecols = [EPW_LABELS.index(label) for label in labels]
+
+    with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+        lines = [f.readline().rstrip('\r\n') for _ in range(EPW_HEADER_LINES)]
+        #指定された列のみ数値へ変換する
+        vals = np.loadtxt(f, delimiter=',', usecols=usecols, dtype=dtype, ndmin=2)
+
+    columns = {label: np.ascontiguousarray(vals[:, i]) for i, label in enumerate(labels)}
+    return parse_epw_header(lines), columns
+
+
+def parse_epw_header(lines):
+    """
+    EPWのヘッダー(8行)を解析する
+
+    Parameters
+    ----------
+    lines : list of str
+    ヘッダーの行
+
+    Returns
+    ----------
+    header : epw_header
+    """
+    _header = epw_header()
+    _header.lines = list(lines)
+
+    for line in lines:
+        fields = [field.strip() for field in line.split(',')]
+        keyword = fields[0].upper()
+        if keyword == 'LOCATION':
+            _header.location = _parse_location(fields)
+        elif keyword == 'DESIGN CONDITIONS':
+            _header.design_conditions = _parse_design_conditions(fields)
+        elif keyword == 'GROUND TEMPERATURES':
+            _header.ground_temperatures = _parse_ground_temperatures(fields)
+        elif keyword == 'DATA PERIODS':
+            _header.records_per_hour = int(fields[2]) if fields[2:3] and fields[2].isdigit() else 1
+            _header.data_periods = _parse_data_periods(fields)
+
+    return _header
+
+
+def _to_float(field):
+    """数値へ変換する（空欄、数値以外はnan）"""
+    try:
+        return float(field)
+    except ValueError:
+        return float('nan')
+
+
+def _parse_location(fields):
+    """LOCATION,city,state,country,source,WMO,latitude,longitude,time zone,elevation"""
+    fields = fields + [''] * (10 - len(fields))
+    _location = epw_location()
+    _location.city = fields[1]
+    _location.state = fields[2]
+    _location.country = fields[3]
+    _location.source = fields[4]
+    _location.wmo = fields[5]
+    _location.latitude = _to_float(fields[6])
+    _location.longitude = _to_float(fields[7])
+    _location.time_zone = _to_float(fields[8])
+    _location.elevation = _to_float(fields[9])
+    return _location
+
+
+def _parse_design_conditions(fields):
+    """DESIGN CONDITIONS,n,source,,Heating,...,Cooling,...,Extremes,..."""
+    _conditions = design_conditions()
+    if len(fields) < 3 or _to_float(fields[1]) < 1:
+        return _conditions #設計条件無し
+
+    _conditions.source = fields[2]
+    section = None
+    for field in fields[3:]:
+        key = field.lower()
+        if key in ('heating', 'cooling', 'extremes'):
+            section = getattr(_conditions, key)
+        elif section is not None:
+            section.append(_to_float(field))
+    return _conditions
+
+
+def _parse_ground_temperatures(fields):
+    """GROUND TEMPERATURES,n,[depth,conductivity,density,specific heat,Jan,...,Dec] x n"""
+    temperatures = []
+    count = int(fields[1]) if fields[1:2] and fields[1].isdigit() else 0
+    for i in range(count):
+        values = [_to_float(field) for field in fields[2 + i*16: 2 + (i+1)*16]]
+        if len(values) < 16:
+            break #途中で終わっている
+        _ground = ground_temperature()
+        _ground.depth, _ground.conductivity, _ground.density, _ground.specific_heat = values[:4]
+        _ground.temperatures = np.array(values[4:])
+        temperatures.append(_ground)
+    return temperatures
+
+
+def _parse_data_periods(fields):
+    """DATA PERIODS,n,records per hour,[name,start day of week,start,end] x n"""
+    periods = []
+    count = int(fields[1]) if fields[1:2] and fields[1].isdigit() else 0
+    for i in range(count):
+        values = fields[3 + i*4: 3 + (i+1)*4]
+        if len(values) < 4:
+            break #途中で終わっている
+        _period = data_period()
+        _period.name, _period.start_day_of_week, _period.start, _period.end = values
+        periods.append(_period)
+    return periods
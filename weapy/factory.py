@@ -0,0 +1,143 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+WeaFile, Wea2File, EpwFileのインスタンスをプロセス内で共有する
+
+同じ引数で呼び出した場合は、読み出し済みのインスタンスを返す。
+インスタンスは件数、もしくはメモリサイズの上限を超えると、最後に使用したのが古いものから破棄する(LRU)。
+共有するインスタンスの気象データは読み出し専用(変更不可)のndarrayとして返す。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class InstanceCache:
+    # コンストラクタの定義
+    def __init__(self, max_entries=128, max_bytes=None):
+        """
+        インスタンスのLRUキャッシュ
+
+        Parameters
+        ----------
+        max_entries : int
+        保持するインスタンスの件数の上限
+
+        max_bytes : int
+        保持するインスタンスのメモリサイズの合計の上限[bytes]。Noneの場合は制限しない
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key, create):
+        """
+        keyのインスタンスを返す。無ければcreate()で生成して追加する
+
+        Parameters
+        ----------
+        key : tuple
+        インスタンスを区別するキー
+
+        create : callable
+        インスタンスを生成する関数
+        """
+        with self.__lock:
+            instance = self.__entries.get(key)
+            if instance is not None:
+                self.__entries.move_to_end(key) #最後に使用したものを末尾へ
+                return instance
+
+        #ファイルの読み出し中は他のスレッドを待たせない（同時に生成した場合は後から追加した方を残す）
+        instance = create()
+        instance.read_only = True
+
+        with self.__lock:
+            self.__entries[key] = instance
+            self.__entries.move_to_end(key)
+            self.__evict()
+        return instance
+
+    def __evict(self):
+        """上限を超えた分を、最後に使用したのが古いものから破棄する"""
+        while len(self.__entries) > max(self.max_entries, 1):
+            self.__entries.popitem(last=False)
+
+        if self.max_bytes is not None:
+            #遅延デコードでサイズは変化するので、都度合計する
+            total = sum(instance.nbytes for instance in self.__entries.values())
+            while len(self.__entries) > 1 and total > self.max_bytes:
+                _, instance = self.__entries.popitem(last=False)
+                total -= instance.nbytes
+
+    def clear(self):
+        """
+        全てのインスタンスを破棄する
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+
+#プロセス内で共有するキャッシュ
+_instances = InstanceCache()
+
+
+def configure(max_entries=128, max_bytes=None):
+    """
+    共有するインスタンスの件数、メモリサイズの上限を設定する（保持しているインスタンスは破棄する）
+    """
+    global _instances
+    _instances = InstanceCache(max_entries, max_bytes)
+
+
+def clear():
+    """
+    共有しているインスタンスを全て破棄する
+    """
+    _instances.clear()
+
+
+def _file_key(filename):
+    """ファイルのパスと更新日時（更新されたファイルは別のキーにする）"""
+    path = os.path.abspath(filename)
+    return path, os.stat(path).st_mtime_ns
+
+
+def open_weafile(filename, no, elevation=None, storage='float64'):
+    """
+    拡張アメダス気象データ標準年(EA)の共有インスタンス(WeaFile)を返す
+
+    引数はWeaFileと同じ
+    """
+    from .weafile import WeaFile
+    key = ('ea',) + _file_key(filename) + (no, elevation, storage)
+    return _instances.get(key, lambda: WeaFile(filename, no, elevation, storage=storage))
+
+
+def open_wea2file(filename, no, storage='float64'):
+    """
+    拡張アメダス気象データ2020年版(EA2020)の共有インスタンス(Wea2File)を返す
+
+    引数はWea2Fileと同じ
+    """
+    from .wea2file import Wea2File
+    key = ('ea2020',) + _file_key(filename) + (no, storage)
+    return _instances.get(key, lambda: Wea2File(filename, no, storage=storage))
+
+
+def open_epwfile(filename, as_array=False):
+    """
+    EPWの共有インスタンス(EpwFile)を返す
+
+    引数はEpwFileと同じ
+    """
+    from .epwfile import EpwFile
+    key = ('epw',) + _file_key(filename) + (as_array,)
+    return _instances.get(key, lambda: EpwFile(filename, as_array=as_array))
@@ -0,0 +1,192 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+1時間毎の気象データを、TRNSYS Type99の補間(<interp>)と同じ考え方で1～60分間隔へ変換する
+
+1時間毎の値は各時刻（1時～8760時）の値とし、変換後の値は各区間の終わりの時刻の値とする。
+    0 : 補間無し。前1時間の値をそのまま使用する（日射量、降水量など積算値の平均が変わらない）
+    1 : 前後の時刻の値を直線補間する
+    2 : 最も近い時刻と前後の時刻の3点を通る2次式で補間する（気温など、滑らかに変化する値）
+最初の時刻(1時)より前の値は、補間1、2では最初の値とする。
+"""
+
+import numpy as np
+from .columnar import timestamps
+
+INTERP_STEP = 0         #補間無し
+INTERP_LINEAR = 1       #直線補間
+INTERP_QUADRATIC = 2    #2次補間
+
+MINUTES = (1, 2, 3, 4, 5, 6, 10, 12, 15, 20, 30, 60)   #変換できる間隔[分]（60の約数）
+
+
+def sample_count(hours, minutes):
+    """
+    hours時間分をminutes分間隔へ変換した値の個数を返す
+    """
+    if minutes not in MINUTES:
+        raise ValueError('間隔[分]は{0}のいずれかを指定してください'.format(list(MINUTES)))
+    return hours * 60 // minutes
+
+
+def sample_times(hours, minutes, year=2001, start=0, stop=None):
+    """
+    変換後の値の日時（各区間の終わりの時刻）を返す
+
+    Returns
+    ----------
+    times : ndarray
+    datetime64[s]の配列。1月1日0時minutes分から始まる
+    """
+    stop = sample_count(hours, minutes) if stop is None else stop
+    origin = timestamps(year, 1)[0] - np.timedelta64(3600, 's') #1月1日0時
+    return origin + (np.arange(start, stop) + 1) * np.timedelta64(minutes * 60, 's')
+
+
+def resample(vals, minutes, interp=INTERP_STEP, start=0, stop=None):
+    """
+    1時間毎の値をminutes分間隔へ変換する
+
+    Parameters
+    ----------
+    vals : ndarray
+    1時間毎の値, shape (..., 時間)。最後の次元を変換する
+
+    minutes : int
+    変換後の間隔[分](MINUTES)
+
+    interp : int
+    補間の方法 0:補間無し, 1:直線補間, 2:2次補間（Type99の<interp>）
+
+    start, stop : int
+    変換する値の範囲（変換後の位置）。省略時は全期間
+
+    Returns
+    ----------
+    vals : ndarray
+    shape (..., stop - start)の配列
+    """
+    vals = np.asarray(vals)
+    hours = vals.shape[-1]
+    stop = sample_count(hours, minutes) if stop is None else stop
+    elapsed = (np.arange(start, stop) + 1) * minutes   #1月1日0時からの経過時間[分]
+
+    if interp == INTERP_STEP:
+        return vals[..., (elapsed - 1) // 60]
+
+    #1時間毎の値の位置（0から）、最初の時刻より前と最後の時刻より後は端の値
+    pos = np.clip(elapsed / 60.0 - 1.0, 0.0, hours - 1.0)
+    if interp == INTERP_LINEAR:
+        if hours < 2:
+            return vals[..., np.zeros(len(pos), dtype=int)]
+        i = np.minimum(pos.astype(int), hours - 2)
+        w = pos - i
+        return vals[..., i] * (1.0 - w) + vals[..., i + 1] * w
+
+    if interp == INTERP_QUADRATIC:
+        if hours < 3:
+            return resample(vals, minutes, INTERP_LINEAR, start, stop)
+        j = np.clip(np.rint(pos).astype(int), 1, hours - 2)  #最も近い時刻（端は内側の時刻）
+        u = pos - j
+        return (vals[..., j - 1] * (u * (u - 1.0) / 2.0) + vals[..., j] * (1.0 - u * u) +
+                vals[..., j + 1] * (u * (u + 1.0) / 2.0))
+
+    raise ValueError('補間の方法は0, 1, 2のいずれかを指定してください')
+
+
+def resample_columns(data, minutes, interps, start=0, stop=None):
+    """
+    列毎の補間の方法で、shape (列, 時間)の配列をminutes分間隔へ変換する
+
+    同じ補間の方法の列はまとめて変換する
+
+    Parameters
+    ----------
+    interps : list of int
+    列毎の補間の方法（type99.TYPE99_COLUMNSの<interp>など）
+
+    Returns
+    ----------
+    data : ndarray
+    shape (列, stop - start)の配列
+    """
+    data = np.asarray(data)
+    interps = np.asarray(interps)
+    if len(interps) != len(data):
+        raise ValueError('列の数と補間の方法の数が一致しません')
+    stop = sample_count(data.shape[-1], minutes) if stop is None else stop
+    result = np.empty((len(data), stop - start), dtype=np.result_type(data.dtype, np.float32))
+    for interp in np.unique(interps):
+        rows = np.flatnonzero(interps == interp)
+        result[rows] = resample(data[rows], minutes, int(interp), start, stop)
+    return result
+
+
+def iter_resample(data, minutes, interps, chunk_hours=24 * 7, year=2001):
+    """
+    shape (列, 時間)の配列を、chunk_hours時間毎に分けて順にminutes分間隔へ変換する
+
+    全期間の変換後の配列をメモリへ展開せずに、制御のシミュレーションなどへ順に渡す
+
+    Yields
+    ----------
+    times : ndarray
+    datetime64[s]の日時, shape (chunk,)
+
+    data : ndarray
+    shape (列, chunk)の配列
+    """
+    data = np.asarray(data)
+    total = sample_count(data.shape[-1], minutes)
+    chunk = sample_count(chunk_hours, minutes)
+    for start in range(0, total, chunk):
+        stop = min(start + chunk, total)
+        yield (sample_times(data.shape[-1], minutes, year, start, stop),
+               resample_columns(data, minutes, interps, start, stop))
+
+
+def resample_weather(wea, minutes, columns=None, year=2001):
+    """
+    WeatherDataFileの気象データを、Type99の列の補間の方法でminutes分間隔へ変換する
+
+    値の無い要素(NotImplementedError, EpwFileの日照時間など)の列は除く
+
+    Parameters
+    ----------
+    wea : WeatherDataFile
+    WeaFile, Wea2File, EpwFileなど
+
+    columns : list of tuple
+    変換する列(type99.TYPE99_COLUMNS)。省略時はTYPE99_COLUMNS（Wea2FileはTYPE99_EA2020_COLUMNS）
+
+    Returns
+    ----------
+    data : ndarray
+    shape (列, 時間 x 60 / minutes)の配列
+
+    times : ndarray
+    datetime64[s]の日時
+
+    columns : list of tuple
+    変換した列（値の無い列を除いたcolumns）
+    """
+    from .type99 import TYPE99_COLUMNS, TYPE99_EA2020_COLUMNS
+    from .wea2file import Wea2File
+
+    if columns is None:
+        columns = TYPE99_EA2020_COLUMNS if isinstance(wea, Wea2File) else TYPE99_COLUMNS
+    rows, available = [], []
+    for column in columns:
+        try:
+            rows.append(np.asarray(getattr(wea, column[1]), dtype=np.float64))
+        except NotImplementedError:
+            continue
+        available.append(column)
+    if not rows:
+        raise ValueError('変換できる列がありません')
+
+    data = np.array(rows)
+    return (resample_columns(data, minutes, [column[3] for column in available]),
+            sample_times(data.shape[-1], minutes, year), available)
@@ -0,0 +1,252 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+太陽位置と、全天日射量の直達、天空日射量への分離(Erbsのモデル)
+
+拡張アメダス気象データの1時間毎の値は前1時間の積算値(日本標準時)のため、
+太陽位置は各時間の中央の時刻（0時30分、1時30分、...）で計算する。
+地点(緯度、経度)の配列と時間の配列はブロードキャストして、地点 x 時間 を一括で計算する。
+傾斜面日射量は、太陽位置と分離した日射量を全ての面(方位角、傾斜角)で共有して一括で計算する(等方性天空)。
+"""
+
+import numpy as np
+from .weatherdata import HOURS_PER_YEAR
+
+SOLAR_CONSTANT = 1367.0     #太陽定数[W/m2]
+MIN_COS_ZENITH = 0.01       #直達日射を計算する太陽高度の下限(cos天頂角)。これより低い場合は全て天空日射とする
+
+
+def hour_angles(hours=HOURS_PER_YEAR):
+    """
+    1時間毎の値の通日(1～)と時刻[h]（各時間の中央）を返す
+    """
+    index = np.arange(hours)
+    return index // 24 + 1, index % 24 + 0.5
+
+
+def sun_position(latitude, longitude, hours=HOURS_PER_YEAR, gmt=9):
+    """
+    太陽位置を計算する（Spencerの式）
+
+    Parameters
+    ----------
+    latitude, longitude : float or ndarray
+    緯度、経度[deg]（北緯+、東経+）。地点の配列の場合はshape (地点,)
+
+    hours : int
+    時間数
+
+    gmt : float
+    GMTとの時差[h]（日本標準時は9）
+
+    Returns
+    ----------
+    cos_zenith : ndarray
+    天頂角の余弦, shape (地点, 時間)（緯度、経度がスカラーの場合は(時間,)）
+
+    azimuth : ndarray
+    太陽方位角[deg]（南0、西+、東-）
+
+    extraterrestrial : ndarray
+    大気外日射量(法線面)[W/m2], shape (時間,)
+    """
+    days, times = hour_angles(hours)
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))[..., np.newaxis]
+    lon = np.asarray(longitude, dtype=np.float64)[..., np.newaxis]
+
+    g = 2.0 * np.pi * (days - 1) / 365.0    #日角
+    decl = (0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g) - 0.006758 * np.cos(2 * g)
+            + 0.000907 * np.sin(2 * g) - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g)) #赤緯[rad]
+    eot = 229.18 * (0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+                    - 0.014615 * np.cos(2 * g) - 0.04089 * np.sin(2 * g))   #均時差[分]
+    extraterrestrial = SOLAR_CONSTANT * (1.00011 + 0.034221 * np.cos(g) + 0.00128 * np.sin(g)
+                                         + 0.000719 * np.cos(2 * g) + 0.000077 * np.sin(2 * g))
+
+    solar_time = times + (lon - 15.0 * gmt) / 15.0 + eot / 60.0    #真太陽時[h]
+    omega = np.radians(15.0 * (solar_time - 12.0))                  #時角
+    sin_decl, cos_decl = np.sin(decl), np.cos(decl)
+    cos_zenith = np.sin(lat) * sin_decl + np.cos(lat) * cos_decl * np.cos(omega)
+    azimuth = np.degrees(np.arctan2(np.sin(omega) * cos_decl,
+                                    np.sin(lat) * cos_decl * np.cos(omega) - np.cos(lat) * sin_decl))
+    return cos_zenith, azimuth, extraterrestrial
+
+
+def erbs_diffuse_fraction(kt):
+    """
+    Erbsのモデルで、晴天指数から天空日射量の割合を返す
+
+    Parameters
+    ----------
+    kt : ndarray
+    晴天指数（全天日射量 / 水平面の大気外日射量）
+    """
+    kt = np.asarray(kt, dtype=np.float64)
+    return np.where(kt <= 0.22, 1.0 - 0.09 * kt,
+                    np.where(kt <= 0.80,
+                             0.9511 - 0.1604 * kt + 4.388 * kt ** 2 - 16.638 * kt ** 3 + 12.336 * kt ** 4,
+                             0.165))
+
+
+def decompose(global_horizontal, cos_zenith, extraterrestrial):
+    """
+    全天日射量を直達日射量、天空日射量へ分離する(Erbsのモデル)
+
+    Parameters
+    ----------
+    global_horizontal : ndarray
+    全天日射量[W/m2], shape (地点, 時間) or (時間,)
+
+    cos_zenith, extraterrestrial : ndarray
+    sun_positionの結果
+
+    Returns
+    ----------
+    beam_horizontal : ndarray
+    水平面直達日射量[W/m2]
+
+    diffuse_horizontal : ndarray
+    水平面天空日射量[W/m2]
+
+    beam_normal : ndarray
+    法線面直達日射量[W/m2]
+    """
+    ghi = np.maximum(np.asarray(global_horizontal, dtype=np.float64), 0.0)
+    sunlit = cos_zenith >= MIN_COS_ZENITH
+    cos_z = np.where(sunlit, cos_zenith, 1.0)
+    kt = np.clip(ghi / (extraterrestrial * cos_z), 0.0, 1.0)
+
+    diffuse = np.where(sunlit, ghi * erbs_diffuse_fraction(kt), ghi)
+    beam_normal = np.minimum((ghi - diffuse) / cos_z, extraterrestrial)   #大気外日射量を上限とする
+    beam_horizontal = beam_normal * cos_z
+    diffuse = ghi - beam_horizontal
+    return beam_horizontal, diffuse, beam_normal
+
+
+def solar_components(global_horizontal, latitude, longitude, gmt=9):
+    """
+    地点の緯度、経度から太陽位置を計算して、全天日射量を分離する
+
+    Parameters
+    ----------
+    global_horizontal : ndarray
+    全天日射量[W/m2], shape (地点, 時間) or (時間,)
+
+    latitude, longitude : float or ndarray
+    緯度、経度[deg]（東経+）, shape (地点,)
+
+    Returns
+    ----------
+    beam_horizontal, diffuse_horizontal, beam_normal : ndarray
+    decomposeの結果
+    """
+    ghi = np.asarray(global_horizontal)
+    cos_zenith, _, extraterrestrial = sun_position(latitude, longitude, ghi.shape[-1], gmt)
+    return decompose(ghi, cos_zenith, extraterrestrial)
+
+
+def incidence_cosines(cos_zenith, sun_azimuth, tilts, azimuths):
+    """
+    面への日射の入射角の余弦を返す
+
+    Parameters
+    ----------
+    cos_zenith, sun_azimuth : ndarray
+    sun_positionの結果, shape (..., 時間)
+
+    tilts : float or ndarray
+    面の傾斜角[deg]（水平0、鉛直90）, shape (面,)
+
+    azimuths : float or ndarray
+    面の方位角[deg]（南0、西+、東-）, shape (面,)
+
+    Returns
+    ----------
+    cos_incidence : ndarray
+    shape (..., 面, 時間)の配列（負の値は面の裏側からの入射）
+    """
+    tilt = np.radians(np.atleast_1d(np.asarray(tilts, dtype=np.float64)))[:, np.newaxis]
+    azimuth = np.radians(np.atleast_1d(np.asarray(azimuths, dtype=np.float64)))[:, np.newaxis]
+    cos_z = np.expand_dims(cos_zenith, -2)
+    sin_z = np.sqrt(np.maximum(1.0 - cos_z * cos_z, 0.0))
+    sun_azimuth = np.radians(np.expand_dims(sun_azimuth, -2))
+    return np.cos(tilt) * cos_z + np.sin(tilt) * sin_z * np.cos(sun_azimuth - azimuth)
+
+
+def plane_of_array(global_horizontal, cos_zenith, sun_azimuth, extraterrestrial, tilts, azimuths, albedo=0.2):
+    """
+    複数の面の傾斜面日射量を一括で計算する（直達日射 + 等方性の天空日射 + 地面反射日射）
+
+    全天日射量はdecomposeで直達、天空日射量へ分離する（全ての面で1回のみ）
+
+    Parameters
+    ----------
+    global_horizontal : ndarray
+    全天日射量[W/m2], shape (..., 時間)
+
+    cos_zenith, sun_azimuth, extraterrestrial : ndarray
+    sun_positionの結果
+
+    tilts, azimuths : ndarray
+    面の傾斜角、方位角[deg], shape (面,)（incidence_cosines）
+
+    albedo : float
+    地面の日射反射率
+
+    Returns
+    ----------
+    irradiance : ndarray
+    傾斜面日射量[W/m2], shape (..., 面, 時間)
+    """
+    ghi = np.maximum(np.asarray(global_horizontal, dtype=np.float64), 0.0)
+    _, diffuse, beam_normal = decompose(ghi, cos_zenith, extraterrestrial)
+    cos_tilt = np.cos(np.radians(np.atleast_1d(np.asarray(tilts, dtype=np.float64))))[:, np.newaxis]
+
+    cos_incidence = incidence_cosines(cos_zenith, sun_azimuth, tilts, azimuths)
+    beam = np.expand_dims(beam_normal, -2) * np.maximum(cos_incidence, 0.0)
+    sky = np.expand_dims(diffuse, -2) * ((1.0 + cos_tilt) / 2.0)
+    ground = np.expand_dims(ghi, -2) * (albedo * (1.0 - cos_tilt) / 2.0)
+    return beam + sky + ground
+
+
+def weather_location(wea):
+    """
+    WeatherDataFileの緯度、経度[deg]（東経+）とGMTとの時差[h]を返す
+
+    Wea2Fileは地点情報レコード、WeaFileは地点情報(stationindex.ea_stations)、EpwFileはヘッダーのLOCATION
+    """
+    latitude = getattr(wea, 'latitude', None)
+    if latitude is not None:
+        return latitude, wea.longitude, 9
+    location = getattr(wea, 'location', None)
+    if location is not None and getattr(location, 'time_zone', None) is not None:
+        return location.latitude, location.longitude, location.time_zone
+    raise ValueError('気象データに緯度、経度がありません。latitude, longitudeを指定してください')
+
+
+def tilted_irradiance(wea, tilts, azimuths, albedo=0.2, latitude=None, longitude=None, gmt=9):
+    """
+    WeatherDataFileの全天日射量から、複数の面の傾斜面日射量を一括で計算する
+
+    Parameters
+    ----------
+    wea : WeatherDataFile
+    WeaFile, Wea2File, EpwFileなど
+
+    tilts, azimuths : ndarray
+    面の傾斜角（水平0、鉛直90）、方位角（南0、西+、東-）[deg], shape (面,)
+
+    latitude, longitude : float
+    緯度、経度[deg]（東経+）。省略時は気象データの地点情報(weather_location)
+
+    Returns
+    ----------
+    irradiance : ndarray
+    傾斜面日射量[W/m2], shape (面, 時間)
+    """
+    if latitude is None or longitude is None:
+        latitude, longitude, gmt = weather_location(wea)
+    ghi = np.asarray(wea.horizontal_global_solar_irradiations, dtype=np.float64)
+    cos_zenith, sun_azimuth, extraterrestrial = sun_position(latitude, longitude, ghi.shape[-1], gmt)
+    return plane_of_array(ghi, cos_zenith, sun_azimuth, extraterrestrial, tilts, azimuths, albedo)
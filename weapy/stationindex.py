@@ -0,0 +1,434 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+拡張アメダス気象データ2020年版(EA2020)の地点情報の一覧(インデックス)
+
+各地点の地点情報レコードのみを1回だけ走査して、地点番号、アメダス観測所番号、緯度、経度、
+標高、風速観測高さ、観測所名などの一覧(構造化配列)を作成する。1時間毎の値はデコードしない。
+作成した一覧はファイルと同じフォルダへ保存し(.stations.npy)、次回以降はそれを読み込む。
+
+コマンドライン: python -m weapy.stationindex ea2020file [-o ea_stations.csv]
+EA2020のファイルから、EAの地点情報(csv、既定は同梱の weapy/data/ea_stations.csv)を作成する。
+"""
+
+import argparse
+import csv
+import os
+import sys
+import numpy as np
+from .earecord import RECORD_HEADER_WORDS, EA2020_RECORDS
+from .weamap import WeaMap
+
+LOCATION_WORDS = 24         #地点情報(1日分)のint16の個数（ダミー13個を含む）
+LOCATION_DAYS = 366         #地点情報の日数
+NAME_OFFSET = (RECORD_HEADER_WORDS + LOCATION_WORDS * LOCATION_DAYS) * 2   #観測所名の位置[bytes]
+NAME_LENGTH = 30            #観測所名の長さ[bytes]
+
+INDEX_EXT = '.stations.npy' #保存する一覧のファイルの拡張子
+
+#地点情報の一覧の型
+STATION_DTYPE = [
+    ('no', 'i4'),                           #拡張アメダス(EA)地点番号
+    ('amedas_no', 'i4'),                    #アメダス観測所番号(5桁)
+    ('international_no', 'i4'),             #国際地点番号(5桁)
+    ('latitude', 'f8'),                     #緯度[deg]
+    ('longitude', 'f8'),                    #経度[deg]
+    ('elevation', 'f8'),                    #標高[m]
+    ('observed_wind_speed_height', 'f8'),   #風速観測高さ[m]
+    ('corrected_wind_speed_height', 'f8'),  #風速補正高さ[m]
+    ('station_name', 'U15'),                #観測所名(日本語)
+    ('station_roman_name', 'U30'),          #観測所名(ローマ字)
+    ('prefecture_name', 'U15'),             #都道府県名(日本語)
+    ('prefecture_roman_name', 'U30'),       #都道府県名(ローマ字)
+]
+
+
+def station_table(eamap, nos=None):
+    """
+    地点情報レコード(1/1の地点情報)から、指定された地点の一覧を作成する
+
+    Parameters
+    ----------
+    eamap : WeaMap
+    メモリマップしたEA2020のファイル
+
+    nos : list of int
+    拡張アメダスの地点番号[1-842]のリスト。省略時は全地点
+
+    Returns
+    ----------
+    stations : ndarray
+    地点情報の構造化配列(STATION_DTYPE)
+    """
+    if eamap.records != EA2020_RECORDS:
+        raise ValueError('拡張アメダス2020年版(EA2020)のファイルではありません。\nファイル：{0}'.format(eamap.file_name))
+    if nos is None:
+        nos = np.arange(1, eamap.station_count + 1)
+    nos = np.atleast_1d(np.asarray(nos, dtype=int))
+
+    records = np.array(eamap.blocks[nos - 1, 0])     #地点情報レコードのみ読み出す
+    location = records[:, RECORD_HEADER_WORDS:RECORD_HEADER_WORDS + 11].astype(float)
+    names = records.view(np.uint8)[:, NAME_OFFSET:NAME_OFFSET + NAME_LENGTH * 4]
+
+    stations = np.empty(len(nos), dtype=STATION_DTYPE)
+    stations['no'] = nos
+    stations['amedas_no'] = location[:, 0] * 1000 + location[:, 1]
+    stations['international_no'] = location[:, 2] * 1000 + location[:, 3]
+    stations['latitude'] = location[:, 4] + location[:, 5]/1000.0
+    stations['longitude'] = location[:, 6] + location[:, 7]/1000.0
+    stations['elevation'] = location[:, 8]*0.1
+    stations['observed_wind_speed_height'] = location[:, 9] * 0.1
+    stations['corrected_wind_speed_height'] = location[:, 10] * 0.1
+
+    fields = ['station_name', 'station_roman_name', 'prefecture_name', 'prefecture_roman_name']
+    for i, field in enumerate(fields):
+        stations[field] = [name[NAME_LENGTH*i:NAME_LENGTH*(i+1)].tobytes().decode('shift-jis').strip()
+                            for name in names]
+    return stations
+
+
+def index_path(filename):
+    """
+    保存する一覧のファイル名を返す
+    """
+    return filename + INDEX_EXT
+
+
+def load_station_index(filename, persist=True):
+    """
+    全地点の一覧を返す
+
+    保存した一覧がファイルより新しければ読み込み、無ければ作成する。
+
+    Parameters
+    ----------
+    filename : string or WeaMap
+    EA2020のファイル名、もしくはメモリマップしたファイル(WeaMap)
+
+    persist : bool
+    Trueの場合、作成した一覧をファイルと同じフォルダへ保存する（保存できない場合は保存しない）
+
+    Returns
+    ----------
+    stations : ndarray
+    地点情報の構造化配列(STATION_DTYPE)
+    """
+    eamap = filename if isinstance(filename, WeaMap) else None
+    if eamap is not None:
+        filename = eamap.file_name
+
+    path = index_path(filename)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(filename):
+            stations = np.load(path)
+            if stations.dtype == np.dtype(STATION_DTYPE):
+                return stations
+    except (OSError, ValueError):
+        pass #保存した一覧が無い、もしくは読み込めない
+
+    if eamap is None:
+        eamap = WeaMap(filename, EA2020_RECORDS)
+    stations = station_table(eamap)
+
+    if persist:
+        try:
+            with open(path, 'wb') as f:
+                np.save(f, stations)
+        except OSError:
+            pass #書き込みできないフォルダ
+    return stations
+
+
+# --------------------------------------------------------------------------------------------
+
+EARTH_RADIUS = 6371.0088    #地球の平均半径[km]
+
+
+def _unit_vectors(latitudes, longitudes):
+    """緯度、経度[deg]を単位球面上の3次元ベクトルへ変換する"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class StationLocator:
+    # コンストラクタの定義
+    def __init__(self, stations, elevation_weight=0.0):
+        """
+        地点の一覧から、指定された位置に近い地点を検索する
+
+        距離は大円距離(haversine)[km]。地点数(842)程度であれば、木構造を辿るよりも
+        全地点との距離を配列演算でまとめて計算する方が速いため、全地点との距離を計算する。
+
+        Parameters
+        ----------
+        stations : ndarray
+        地点情報の構造化配列。'no', 'latitude', 'longitude'('elevation')のフィールドを使用する
+
+        elevation_weight : float
+        標高差の重み。標高差1km を水平距離 elevation_weight[km] とみなして、
+        sqrt(水平距離^2 + (elevation_weight * 標高差[km])^2) を距離とする。0の場合は水平距離のみ
+        """
+        self.stations = stations
+        self.elevation_weight = elevation_weight
+        self.__vectors = _unit_vectors(stations['latitude'], stations['longitude']) #(地点, 3)
+
+    def distances(self, latitude, longitude, elevation=None):
+        """
+        指定された位置から全地点までの距離[km]を返す
+
+        Parameters
+        ----------
+        latitude, longitude : float or ndarray
+        位置の緯度、経度[deg]（複数の位置は同じ形状の配列）
+
+        elevation : float or ndarray
+        位置の標高[m]。elevation_weightが0でない場合に使用する
+
+        Returns
+        ----------
+        distances : ndarray
+        shape (位置の形状..., 地点)
+        """
+        sites = _unit_vectors(latitude, longitude)
+        #弦の長さから大円距離を求める(haversineと同じ)
+        chord2 = np.clip(2.0 - 2.0 * (sites @ self.__vectors.T), 0.0, 4.0)
+        dist = 2.0 * EARTH_RADIUS * np.arcsin(np.sqrt(chord2) / 2.0)
+
+        if self.elevation_weight and elevation is not None:
+            dz = (np.asarray(elevation, dtype=float)[..., np.newaxis] - self.stations['elevation']) / 1000.0
+            dist = np.sqrt(dist**2 + (self.elevation_weight * dz)**2)
+        return dist
+
+    def nearest(self, latitude, longitude, k=1, elevation=None):
+        """
+        指定された位置から近いk地点を返す
+
+        Returns
+        ----------
+        nos : ndarray
+        地点番号, shape (位置の形状..., k) 近い順
+
+        distances : ndarray
+        距離[km], shape (位置の形状..., k)
+        """
+        dist = self.distances(latitude, longitude, elevation)
+        k = min(k, dist.shape[-1])
+        idx = np.argpartition(dist, k - 1, axis=-1)[..., :k]
+        part = np.take_along_axis(dist, idx, axis=-1)
+        order = np.argsort(part, axis=-1)
+        idx = np.take_along_axis(idx, order, axis=-1)
+        return self.stations['no'][idx], np.take_along_axis(part, order, axis=-1)
+
+    def within(self, latitude, longitude, radius, elevation=None):
+        """
+        指定された位置から半径radius[km]以内の地点を返す（1か所の位置のみ）
+
+        Returns
+        ----------
+        nos : ndarray
+        地点番号 近い順
+
+        distances : ndarray
+        距離[km]
+        """
+        dist = self.distances(latitude, longitude, elevation)
+        idx = np.flatnonzero(dist <= radius)
+        idx = idx[np.argsort(dist[idx])]
+        return self.stations['no'][idx], dist[idx]
+
+
+# --------------------------------------------------------------------------------------------
+
+#拡張アメダス気象データ標準年(EA)の地点情報（パッケージに同梱）
+EA_STATIONS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'ea_stations.csv')
+
+#EAの地点情報の型
+EA_STATION_DTYPE = [('no', 'i4'), ('latitude', 'f8'), ('longitude', 'f8'), ('elevation', 'f8'),
+                    ('station_roman_name', 'U30')]
+
+EA_STATION_COUNT = 842  #EAの地点数（EA2020と同じ地点番号）
+
+_ea_stations = None     #読み込み済みのEAの地点情報（初回の参照時に読み込む）
+
+
+def read_ea_stations(path=EA_STATIONS_PATH):
+    """
+    EAの地点情報(csv)を読み込む
+
+    Parameters
+    ----------
+    path : string
+    地点情報のファイル名。'#'で始まる行はコメント、1行目は列名(no,latitude,longitude,elevation,station_roman_name)
+
+    Returns
+    ----------
+    stations : ndarray
+    地点番号順の地点情報の構造化配列(EA_STATION_DTYPE)
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = [row for row in csv.reader(f) if row and not row[0].startswith('#')]
+    names = rows[0]
+    stations = np.zeros(len(rows) - 1, dtype=EA_STATION_DTYPE)
+    for name, _ in EA_STATION_DTYPE:
+        if name in names:
+            i = names.index(name)
+            stations[name] = [row[i].strip() for row in rows[1:]]
+    return np.sort(stations, order='no')
+
+
+def save_ea_stations(stations, path):
+    """
+    地点情報をEAの地点情報(csv)として保存する
+
+    EA2020の一覧(load_station_index)から、set_ea_stations()で使用する全地点の一覧を作成する。
+
+    Parameters
+    ----------
+    stations : ndarray
+    'no', 'latitude', 'longitude', 'elevation'('station_roman_name')のフィールドを持つ構造化配列
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('# 拡張アメダス気象データ標準年(EA)の地点情報\n')
+        f.write('# no: 地点番号[1-842], latitude: 緯度[deg], longitude: 経度(東経+)[deg], elevation: 標高[m]\n')
+        f.write(','.join(name for name, _ in EA_STATION_DTYPE) + '\n')
+        for st in np.sort(stations, order='no'):
+            name = st['station_roman_name'] if 'station_roman_name' in stations.dtype.names else ''
+            f.write('{0},{1:.4f},{2:.4f},{3:.1f},{4}\n'.format(
+                st['no'], st['latitude'], st['longitude'], st['elevation'], name))
+
+
+def check_ea_numbering(stations, station_count=EA_STATION_COUNT):
+    """
+    地点情報の地点番号がEAの地点番号(1～station_count、重複無し)であることを確認する
+
+    EA2020の地点番号はEAと同じ並び(1～842)のため、EA2020の全地点の一覧はstation_count地点の連番になる
+
+    Parameters
+    ----------
+    stations : ndarray
+    'no'のフィールドを持つ構造化配列
+    """
+    nos = np.sort(np.asarray(stations['no']))
+    if len(nos) == 0 or nos[0] < 1 or nos[-1] > station_count or np.any(np.diff(nos) == 0):
+        raise ValueError('地点番号は1～{0}の重複の無い番号で指定してください。'.format(station_count))
+
+
+def make_ea_stations(filename, path=EA_STATIONS_PATH, station_count=EA_STATION_COUNT):
+    """
+    EA2020のファイルの全地点の地点情報から、EAの地点情報(csv)を作成する
+
+    同梱の地点情報(EA_STATIONS_PATH)はこの関数で作成する。EA2020の地点数がEAの地点数と異なる場合はValueError
+
+    Parameters
+    ----------
+    filename : string or WeaMap
+    EA2020のファイル名、もしくはメモリマップしたファイル(WeaMap)
+
+    path : string
+    出力先のファイル名(csv)。既定は同梱の地点情報
+
+    Returns
+    ----------
+    stations : ndarray
+    地点情報の構造化配列(STATION_DTYPE)
+    """
+    stations = load_station_index(filename, persist=False)
+    check_ea_numbering(stations, station_count)
+    if len(stations) != station_count:
+        raise ValueError('EA2020の地点数({0})がEAの地点数({1})と一致しません。'.format(len(stations), station_count))
+    save_ea_stations(stations, path)
+    return stations
+
+
+def set_ea_stations(stations=None):
+    """
+    EAの地点情報を差し替える
+
+    Parameters
+    ----------
+    stations : string or ndarray
+    地点情報のファイル名(csv)、EA2020のファイル名（全地点の一覧, load_station_index）、
+    もしくは構造化配列。Noneの場合は同梱の地点情報に戻す
+    """
+    global _ea_stations
+    if isinstance(stations, (str, os.PathLike)):
+        if os.fspath(stations).lower().endswith('.csv'):
+            stations = read_ea_stations(stations)
+        else:
+            stations = load_station_index(stations)
+            check_ea_numbering(stations)
+    elif stations is not None:
+        stations = np.sort(np.asarray(stations), order='no')
+    _ea_stations = stations
+
+
+def ea_stations():
+    """
+    EAの地点情報を返す（同梱の地点情報は初回の呼び出し時に1回だけ読み込む）
+    """
+    global _ea_stations
+    if _ea_stations is None:
+        _ea_stations = read_ea_stations()
+    return _ea_stations
+
+
+def find_ea_stations(nos):
+    """
+    指定された地点番号のEAの地点情報を返す
+
+    Parameters
+    ----------
+    nos : int or list of int
+    拡張アメダスの地点番号
+
+    Returns
+    ----------
+    stations : ndarray
+    地点情報の構造化配列。地点情報に無い地点番号はValueError
+    """
+    stations = ea_stations()
+    nos = np.asarray(nos, dtype=int)
+    idx = np.clip(np.searchsorted(stations['no'], nos), 0, len(stations) - 1)
+    unknown = stations['no'][idx] != nos
+    if np.any(unknown):
+        raise ValueError('地点情報に地点番号{0}がありません。標高を指定するか、set_ea_stations()で地点情報を設定してください'
+                        .format(np.atleast_1d(nos)[np.atleast_1d(unknown)].tolist()))
+    return stations[idx]
+
+
+def lookup_ea_station(no):
+    """
+    指定された地点番号のEAの地点情報を返す。地点情報に無い場合はNone
+    """
+    stations = ea_stations()
+    i = np.searchsorted(stations['no'], no)
+    if i < len(stations) and stations['no'][i] == no:
+        return stations[i]
+    return None
+
+
+def main(argv=None):
+    """
+    コマンドラインからEAの地点情報(csv)を作成する
+    """
+    parser = argparse.ArgumentParser(prog='python -m weapy.stationindex',
+                                     description='EA2020のファイルから、EAの地点情報(csv)を作成する')
+    parser.add_argument('ea2020file', help='拡張アメダス気象データ2020年版(EA2020)のデータファイル')
+    parser.add_argument('-o', '--output', default=EA_STATIONS_PATH,
+                        help='出力先のファイル名（既定: 同梱の地点情報 weapy/data/ea_stations.csv）')
+    parser.add_argument('--stations', type=int, default=EA_STATION_COUNT, help='EAの地点数')
+    args = parser.parse_args(argv)
+
+    try:
+        stations = make_ea_stations(args.ea2020file, args.output, args.stations)
+    except (OSError, ValueError) as e:
+        parser.exit(1, '{0}\n'.format(e))
+    print('{0}地点の地点情報を出力しました: {1}'.format(len(stations), args.output), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
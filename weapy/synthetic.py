@@ -0,0 +1,275 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+拡張アメダス気象データ(EA, EA2020)、EPWと同じレイアウトの合成データを作成する
+
+拡張アメダス気象データは再配布できないため、読み出し、キャッシュ、メモリ使用量などの
+検証用に、任意の地点数、乱数のシードで実際のファイルと同じ形式のデータを作成する。
+値は緯度、標高、季節、時刻に応じたもっともらしい範囲で作成し、相対湿度は気温と絶対湿度から矛盾の無い値とする。
+値は気象データとしての正しさを保証しない（ベンチマーク、試験用）。
+
+コマンドライン: python -m weapy.synthetic {ea,ea2020,epw} filename [--stations 842] [--seed 0]
+"""
+
+import argparse
+import sys
+import numpy as np
+from .weatherdata import HOURS_PER_YEAR
+from .earecord import RECORD_WORDS, RECORD_HEADER_WORDS, EA_RECORDS, EA2020_RECORDS
+from .earecord import EA_SCALE_FACTORS, EA2020_SCALE_FACTORS
+from .stationindex import LOCATION_WORDS, LOCATION_DAYS, NAME_OFFSET, NAME_LENGTH, STATION_DTYPE
+from .weafile import GetPws
+
+STATION_COUNT = 842     #拡張アメダスの地点数
+CHUNK_STATIONS = 64     #1回に作成する地点数（全地点分の値を一度にメモリへ展開しない）
+
+
+def synthetic_stations(stations=STATION_COUNT, seed=0):
+    """
+    合成データの地点情報を返す
+
+    Returns
+    ----------
+    stations : ndarray
+    地点情報の構造化配列(stationindex.STATION_DTYPE)
+    """
+    rng = np.random.default_rng([seed, 0])
+    nos = np.arange(1, stations + 1)
+    table = np.zeros(stations, dtype=STATION_DTYPE)
+    table['no'] = nos
+    table['amedas_no'] = 47000 + nos
+    table['latitude'] = np.round(np.sort(rng.uniform(24.05, 45.52, stations))[::-1], 3)  #北から南へ
+    table['longitude'] = np.round(rng.uniform(123.01, 145.75, stations), 3)
+    table['elevation'] = np.round(np.clip(rng.exponential(150.0, stations) - 3.0, -3.0, 1350.0), 1)
+    table['observed_wind_speed_height'] = 10.0
+    table['corrected_wind_speed_height'] = 10.0
+    table['station_name'] = ['地点{0}'.format(no) for no in nos]
+    table['station_roman_name'] = ['Station{0}'.format(no) for no in nos]
+    table['prefecture_name'] = ['県{0}'.format(no % 47 + 1) for no in nos]
+    table['prefecture_roman_name'] = ['Pref{0}'.format(no % 47 + 1) for no in nos]
+    return table
+
+
+def synthetic_values(stations, seed=0, ea2020=False):
+    """
+    地点毎の1時間毎の気象要素の値（EAの単位、換算前）を作成する
+
+    Parameters
+    ----------
+    stations : ndarray
+    地点情報の構造化配列（'no', 'latitude', 'elevation'）
+
+    Returns
+    ----------
+    vals : list of ndarray
+    shape (地点, 8760)の配列のリスト。
+    気温[C]、絶対湿度[g/kg]、全天日射量、大気放射量[MJ/hm2]、風向(16方位, 0:静穏)、風速[m/s]、
+    降水量[mm]、日照時間[h]（EA2020は気圧[hPa]、相対湿度[%]を追加）
+    """
+    rng = np.random.default_rng([seed, 1, int(stations['no'][0])])
+    shape = (len(stations), HOURS_PER_YEAR)
+    lat = stations['latitude'][:, np.newaxis]
+    elevation = stations['elevation'][:, np.newaxis]
+
+    hours = np.arange(HOURS_PER_YEAR)
+    hour = hours % 24
+    season = -np.cos(2 * np.pi * (hours - 24 * 20) / HOURS_PER_YEAR)      #1月20日頃が-1、7月20日頃が+1
+    daylight = np.clip(np.sin(np.pi * (hour - 6 + 1.5 * season) / (12 + 3 * season)), 0.0, None)
+
+    #雲の量（日毎に変化）と日照
+    cloud = np.repeat(rng.beta(1.2, 1.5, (len(stations), HOURS_PER_YEAR // 24)), 24, axis=1)
+    clearness = np.clip(1.0 - cloud + rng.normal(0.0, 0.1, shape), 0.05, 1.0)
+
+    #気温: 緯度、標高、季節、日変化（晴れの日ほど大きい）
+    mean = 23.0 - 0.75 * (lat - 24.0) - 0.0065 * elevation
+    amplitude = 6.0 + 0.3 * (lat - 24.0)
+    daily = 2.0 + 4.0 * clearness
+    tamb = mean + amplitude * season - daily * np.cos(2 * np.pi * (hour - 3) / 24) + rng.normal(0.0, 0.8, shape)
+
+    #相対湿度 -> 絶対湿度（標高から求めた大気圧で換算）
+    rh = np.clip(75.0 + 10.0 * season - 15.0 * clearness * daylight + rng.normal(0.0, 6.0, shape), 15.0, 100.0)
+    pressure = 1013.2 - 0.12 * elevation + 5.44e-6 * elevation**2 + rng.normal(0.0, 4.0, shape)    #[hPa]
+    pw = rh / 100.0 * GetPws(tamb)                                                  #[kPa]
+    abs_hum = 0.62198 * pw / (pressure / 10.0 - pw) * 1000.0                        #[g/kg']
+
+    #日射量[MJ/hm2], 日照時間[h]
+    solar = 3.3 * (0.75 + 0.25 * season) * daylight * (0.2 + 0.8 * clearness)
+    sunshine = np.where(daylight > 0.1, np.clip(clearness * 1.3 - 0.3, 0.0, 1.0), 0.0)
+
+    #大気放射量[MJ/hm2]: 気温と雲量から
+    emissivity = 0.7 + 0.2 * cloud
+    longwave = emissivity * 5.67e-8 * (tamb + 273.15)**4 * 3.6 / 1000.0
+
+    #風速[m/s], 風向(16方位, 静穏は0)
+    windspd = np.clip(rng.gamma(2.0, 1.6, shape) * (0.8 + 0.2 * daylight), 0.0, 30.0)
+    winddir = np.where(windspd < 0.3, 0, rng.integers(1, 17, shape)).astype(float)
+
+    #降水量[mm]: 雲の多い日に発生
+    rain = np.where(rng.random(shape) < 0.25 * cloud**2, rng.exponential(2.5, shape), 0.0)
+
+    vals = [tamb, abs_hum, solar, longwave, winddir, windspd, rain, sunshine]
+    if ea2020:
+        vals += [pressure, rh]
+    return vals
+
+
+def _encode(vals, sf, rng):
+    """実数値を換算係数で整数化し、リマーク(1の位)を付ける"""
+    codes = np.round(vals / sf).astype(np.int64) * 10 + rng.integers(0, 9, vals.shape)
+    return np.clip(codes, -32768, 32767).astype('<i2')
+
+
+def _location_record(stations):
+    """EA2020の地点情報レコードの値（366日分、同じ値）と観測所名"""
+    location = np.zeros((len(stations), LOCATION_DAYS, LOCATION_WORDS), dtype='<i2')
+    values = [stations['amedas_no'] // 1000, stations['amedas_no'] % 1000,
+              stations['international_no'] // 1000, stations['international_no'] % 1000,
+              np.floor(stations['latitude']), np.round(stations['latitude'] % 1 * 1000),
+              np.floor(stations['longitude']), np.round(stations['longitude'] % 1 * 1000),
+              np.round(stations['elevation'] * 10), np.round(stations['observed_wind_speed_height'] * 10),
+              np.round(stations['corrected_wind_speed_height'] * 10)]
+    for i, vals in enumerate(values):
+        location[:, :, i] = np.asarray(vals)[:, np.newaxis]
+    return location.reshape(len(stations), -1)
+
+
+def _write(filename, records, scale_factors, stations, seed, year):
+    """地点をまとめた単位で値を作成し、ファイルへ順に書き込む"""
+    ea2020 = records == EA2020_RECORDS
+    first = 1 if ea2020 else 0
+    with open(filename, 'wb') as f:
+        for start in range(0, len(stations), CHUNK_STATIONS):
+            chunk = stations[start:start + CHUNK_STATIONS]
+            rng = np.random.default_rng([seed, 2, start])
+            blocks = np.zeros((len(chunk), records, RECORD_WORDS), dtype='<i2')
+            blocks[:, :, 0] = chunk['no'][:, np.newaxis]   #地点番号
+            blocks[:, :, 1] = np.arange(records)            #種別
+            blocks[:, :, 2] = year                          #年
+            for i, vals in enumerate(synthetic_values(chunk, seed, ea2020)):
+                blocks[:, first + i, RECORD_HEADER_WORDS:RECORD_HEADER_WORDS + HOURS_PER_YEAR] = \
+                    _encode(vals, scale_factors[i], rng)
+
+            if ea2020:
+                blocks[:, 0, RECORD_HEADER_WORDS:RECORD_HEADER_WORDS + LOCATION_DAYS * LOCATION_WORDS] = \
+                    _location_record(chunk)
+                #観測所名(Shift-JIS, 30bytes) 1/1と12/31
+                names = blocks[:, 0].view(np.uint8)
+                fields = ['station_name', 'station_roman_name', 'prefecture_name', 'prefecture_roman_name']
+                for s, station in enumerate(chunk):
+                    text = b''.join(str(station[field]).encode('shift-jis').ljust(NAME_LENGTH, b' ')
+                                    for field in fields * 2)
+                    names[s, NAME_OFFSET:NAME_OFFSET + len(text)] = np.frombuffer(text, dtype=np.uint8)
+            f.write(blocks.tobytes())
+
+
+def write_ea(filename, stations=STATION_COUNT, seed=0, year=8195):
+    """
+    拡張アメダス標準年(EA)の形式(1地点8レコード)の合成データを作成する
+
+    Parameters
+    ----------
+    stations : int or ndarray
+    地点数、もしくは地点情報の構造化配列(synthetic_stations)
+
+    seed : int
+    乱数のシード（同じシードでは同じファイルを作成する）
+
+    year : int
+    レコードヘッダーの年
+
+    Returns
+    ----------
+    stations : ndarray
+    地点情報の構造化配列。EAのファイルには地点情報が無いため、
+    stationindex.set_ea_stations(stations)で標高、緯度、経度を設定して使用する
+    """
+    if np.isscalar(stations):
+        stations = synthetic_stations(stations, seed)
+    _write(filename, EA_RECORDS, EA_SCALE_FACTORS, stations, seed, year)
+    return stations
+
+
+def write_ea2020(filename, stations=STATION_COUNT, seed=0, year=1120):
+    """
+    拡張アメダス2020年版(EA2020)の形式(1地点11レコード、[0]は地点情報レコード)の合成データを作成する
+
+    引数、戻り値はwrite_eaと同じ
+    """
+    if np.isscalar(stations):
+        stations = synthetic_stations(stations, seed)
+    _write(filename, EA2020_RECORDS, EA2020_SCALE_FACTORS, stations, seed, year)
+    return stations
+
+
+EPW_HEADER = [
+    'LOCATION,{city},TK,JPN,SRC-TMYx,{wmo},{latitude:.3f},{longitude:.3f},9.0,{elevation:.1f}',
+    'DESIGN CONDITIONS,1,Climate Design Data 2009 ASHRAE Handbook,,Heating,1,-0.4,0.6,-14.8,1.1,6.3,-12.5,1.3,7.2,'
+    '11.9,8.3,10.8,7.8,3.7,320,Cooling,8,6.8,33.3,24.8,32,24.5,31,24.1,26.4,31.4,25.8,30.7,25.3,30,5.4,180,25.1,20.4,'
+    '29.5,24.5,19.6,28.8,24,19,28.3,82.1,31.4,79.7,30.6,77.6,29.8,872,Extremes,11.9,10.5,9.4,29.8,-2.7,36.1,1.8,1.6,'
+    '-4,37.2,-5,38.1,-6,38.9,-7.3,40',
+    'TYPICAL/EXTREME PERIODS,1,Summer - Week Nearest Max Temperature For Period,Extreme,8/ 3,8/ 9',
+    'GROUND TEMPERATURES,1,.5,,,,7.83,6.82,8.01,10.21,15.52,19.47,22.76,24.44,23.77,21.30,17.42,12.83',
+    'HOLIDAYS/DAYLIGHT SAVINGS,No,0,0,0',
+    'COMMENTS 1,"synthetic data generated by weapy"',
+    'COMMENTS 2,""',
+    'DATA PERIODS,1,1,Data,Sunday, 1/ 1,12/31',
+]
+
+
+def write_epw(filename, seed=0, city='Synthetic', year=2001):
+    """
+    EPWの形式(ヘッダー8行、35列x8760行)の合成データを作成する
+    """
+    station = synthetic_stations(1, seed)
+    tamb, _, solar, longwave, winddir, windspd, rain, _, pressure, rh = synthetic_values(station, seed, True)
+    tamb, solar, longwave, winddir, windspd, rain, pressure, rh = \
+        [vals[0] for vals in (tamb, solar, longwave, winddir, windspd, rain, pressure, rh)]
+
+    times = np.datetime64('{0:04d}-01-01T00'.format(year), 'h') + np.arange(HOURS_PER_YEAR)
+    months = times.astype('datetime64[M]').astype(int) % 12 + 1
+    days = (times.astype('datetime64[D]') - times.astype('datetime64[M]')).astype(int) + 1
+    hours = np.arange(HOURS_PER_YEAR) % 24 + 1
+    dewpoint = tamb - (100.0 - rh) / 5.0
+
+    header = [line.format(city=city, wmo=476710 + seed, latitude=station['latitude'][0],
+                          longitude=station['longitude'][0], elevation=station['elevation'][0])
+              for line in EPW_HEADER]
+    lines = ['{0},{1},{2},{3},60,?9?9?9?9E0?9?9?9?9?9?9?9?9?9?9?9?9?9?9*9*9?9*9,{4:.1f},{5:.1f},{6:.0f},{7:.0f},'
+             '0,0,{8:.0f},{9:.0f},0,0,0,0,0,0,{10:.0f},{11:.1f},5,5,10.0,77777,9,999999999,20,0.0500,0,88,0.170,{12:.1f},1.0'
+             .format(year, m, d, h, t, td, r, p * 100.0, ir / 3.6 * 1000.0, gh / 3.6 * 1000.0, wd * 22.5 % 360, ws, pr)
+             for m, d, h, t, td, r, p, ir, gh, wd, ws, pr
+             in zip(months, days, hours, tamb, dewpoint, rh, pressure, longwave, solar, winddir, windspd, rain)]
+    with open(filename, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(header + lines) + '\n')
+
+
+def main(argv=None):
+    """
+    コマンドラインから合成データを作成する
+    """
+    parser = argparse.ArgumentParser(prog='python -m weapy.synthetic',
+                                     description='拡張アメダス気象データ(EA, EA2020)、EPWの合成データを作成する')
+    parser.add_argument('kind', choices=['ea', 'ea2020', 'epw'], help='形式')
+    parser.add_argument('filename', help='出力先のファイル名')
+    parser.add_argument('--stations', type=int, default=STATION_COUNT, help='地点数（EA, EA2020）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数のシード')
+    parser.add_argument('--station-table', default=None,
+                        help='EAの地点情報(csv)の出力先（stationindex.set_ea_stationsで使用する）')
+    args = parser.parse_args(argv)
+
+    if args.kind == 'epw':
+        write_epw(args.filename, args.seed)
+        return 0
+
+    writer = write_ea if args.kind == 'ea' else write_ea2020
+    stations = writer(args.filename, args.stations, args.seed)
+    if args.station_table is not None:
+        from .stationindex import save_ea_stations
+        save_ea_stations(stations, args.station_table)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+TRNSYS, Type99(Weather Data Reader)形式のファイルを出力する
+
+気象データの配列から列毎の書式で文字列へ変換し、ヘッダーとデータを1回の書き込みで出力する。
+既定の書式は、列毎に丸めた値をPythonの実数の表記(repr)で出力する（examplesのpandasによる出力と同じ）。
+"""
+
+import os
+import numpy as np
+
+#Type99のデータの列（出力する順）
+#(変数名, WeatherDataFileのプロパティ名, 丸める桁数, interp, コメント)
+TYPE99_COLUMNS = [
+    ('TAMB', 'ambient_temperatures', 1, 2, '[C]'),
+    ('RHUM', 'relative_humidities', 3, 1, '[%]'),
+    ('IGLOB_H', 'horizontal_global_solar_irradiations', 3, 0, '[W/m2]'),
+    ('udef1', 'downward_longwave_irradiations', 3, 0, 'Atmosphric radiation [W/m^2]'),
+    ('WDIR', 'wind_directions', 1, 1, '[deg.]'),
+    ('WSPEED', 'wind_velocities', 1, 1, '[m/s]'),
+    ('udef2', 'precipitation_amounts', 1, 0, 'Amount of rain [mm]'),
+    ('udef3', 'sunshine_durations', 1, 0, 'Solar Radiation Time[hour]'),
+]
+
+#EA2020の列（日照時間は0.01h単位のため2桁）
+TYPE99_EA2020_COLUMNS = TYPE99_COLUMNS[:-1] + [('udef3', 'sunshine_durations', 2, 0, 'Solar Radiation Time[hour]')]
+
+#全天日射量から分離した直達、天空日射量の列(solar.solar_components)
+TYPE99_SOLAR_COLUMNS = [
+    ('IBEAM_H', 'beam_horizontal', 3, 0, '[W/m2]'),
+    ('IBEAM_N', 'beam_normal', 3, 0, '[W/m2]'),
+    ('IDIFF_H', 'diffuse_horizontal', 3, 0, '[W/m2]'),
+]
+
+#ヘッダーの<var>の並び（列に無い変数は<col> 0）
+TYPE99_VARS = ['IBEAM_H', 'IBEAM_N', 'IDIFF_H', 'IGLOB_H', 'TAMB', 'RHUM', 'WSPEED', 'WDIR',
+               'udef1', 'udef2', 'udef3', 'udef4']
+
+USERDEFINED = 'This weather data is generated by Weapy example. https://github.com/TRNSYSJP/weapy'
+
+
+def type99_header(latitude, longitude, gmt=9, columns=TYPE99_COLUMNS, userdefined=USERDEFINED):
+    """
+    Type99のヘッダーを返す
+
+    Parameters
+    ----------
+    latitude : float
+    緯度[deg]
+
+    longitude : float
+    経度[deg]（東経+）。Type99の表記(東経 -、西経 +)へ符号を反転して出力する
+
+    gmt : float
+    GMTとの時差[h]（東+）
+
+    columns : list of tuple
+    データの列(TYPE99_COLUMNS)
+
+    Returns
+    ----------
+    header : str
+    <data>の行までのヘッダー（改行を含む）
+    """
+    cols = {column[0]: (i + 1, column) for i, column in enumerate(columns)}
+    lines = [
+        '<userdefined>       ! {0}'.format(userdefined),
+        '<longitude> {0} ! East of greenwich: negative'.format(-longitude + 0.0),
+        '<latitude>  {0}   ! '.format(latitude),
+        '<gmt>       {0}       ! time shift from GMT, east: positive (hours)'.format(gmt),
+        '<interval>  1       ! Data file time interval between consecutive lines (hours)',
+        '<firsttime> 1       ! Time corresponding to first data line (hours)',
+    ]
+    for var in TYPE99_VARS + [column[0] for column in columns if column[0] not in TYPE99_VARS]:
+        col, interp, comment = 0, 0, ''
+        if var in cols:
+            col, (_, _, _, interp, comment) = cols[var][0], cols[var][1]
+        lines.append('<var>\t{0}\t<col>\t{1}  <interp> {2}  <add>  0  <mult>  1   <samp>   0\t!{3}'.format(
+            var, col, interp, ' ' + comment if comment else ''))
+    lines.append('<data>')
+    return '\n'.join(lines) + '\n'
+
+
+def _format_column(vals, formatter):
+    """
+    列の値を文字列のリストへ変換する
+
+    気象データは同じ値が多い（風向、降水量など）ため、重複の無い値のみ変換して展開する
+    """
+    uniques, inverse = np.unique(vals, return_inverse=True)
+    texts = [formatter(val) for val in uniques.tolist()]
+    return [texts[i] for i in inverse.tolist()]
+
+
+def format_columns(data, decimals=None, fmt=None):
+    """
+    列毎の書式で、データを1行1時間のテキストへ変換する
+
+    Parameters
+    ----------
+    data : ndarray
+    shape (列, 時間)の配列
+
+    decimals : list of int
+    列毎に丸める桁数。丸めた値をPythonの実数の表記(repr)で出力する。省略時はTYPE99_COLUMNSの桁数
+
+    fmt : list of str
+    列毎の%書式 e.g. ['%.1f', '%.3f', ...]。指定した場合はdecimalsより優先する
+
+    Returns
+    ----------
+    text : str
+    空白区切り、改行(\\n)区切りのテキスト
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if fmt is not None:
+        cols = [_format_column(vals, f.__mod__) for f, vals in zip(fmt, data)]
+    else:
+        if decimals is None:
+            decimals = [column[2] for column in TYPE99_COLUMNS]
+        cols = [_format_column(np.round(vals, d), repr) for d, vals in zip(decimals, data)]
+    if len(cols) != len(data):
+        raise ValueError('列の数と書式の数が一致しません')
+    return '\n'.join(map(' '.join, zip(*cols))) + '\n'
+
+
+def type99_data(wea, columns=TYPE99_COLUMNS, missing=0.0):
+    """
+    WeatherDataFileからType99の列の値を取り出す
+
+    Parameters
+    ----------
+    missing : float
+    値の無い要素(NotImplementedError, EpwFileの日照時間など)の列の値
+
+    Returns
+    ----------
+    data : ndarray
+    shape (列, 時間)の配列
+    """
+    rows = []
+    for column in columns:
+        try:
+            rows.append(np.asarray(getattr(wea, column[1]), dtype=np.float64))
+        except NotImplementedError:
+            rows.append(None)
+    hours = max((len(row) for row in rows if row is not None), default=0)
+    return np.array([np.full(hours, missing) if row is None else row for row in rows], dtype=np.float64)
+
+
+def add_solar_columns(data, columns, latitude, longitude, gmt=9):
+    """
+    全天日射量(IGLOB_H)の列を直達、天空日射量へ分離して、TYPE99_SOLAR_COLUMNSの列を追加する
+
+    Parameters
+    ----------
+    data : ndarray
+    shape (列, 時間)、もしくは複数地点の shape (地点, 列, 時間)の配列
+
+    latitude, longitude : float or ndarray
+    緯度、経度[deg]（東経+）。複数地点の場合はshape (地点,)
+
+    Returns
+    ----------
+    data : ndarray
+    列を追加した配列
+
+    columns : list of tuple
+    列を追加したデータの列
+    """
+    from .solar import solar_components
+
+    ghi = data[..., [column[0] for column in columns].index('IGLOB_H'), :]
+    beam_h, diffuse_h, beam_n = solar_components(ghi, latitude, longitude, gmt)
+    data = np.concatenate([data, np.stack([beam_h, beam_n, diffuse_h], axis=-2)], axis=-2)
+    return data, list(columns) + TYPE99_SOLAR_COLUMNS
+
+
+def write_type99(filename, data, latitude, longitude, gmt=9, columns=None, fmt=None, solar=False):
+    """
+    Type99形式のファイルを出力する
+
+    Parameters
+    ----------
+    filename : string or file object
+    出力先のファイル名、もしくはテキストモードで開いたファイル
+
+    data : ndarray or WeatherDataFile
+    shape (列, 時間)の配列（列の並びはcolumns）、もしくはWeaFile, Wea2File, EpwFile。
+    EpwFileの日照時間など値の無い列は0を出力する(type99_data)
+
+    latitude, longitude : float
+    緯度、経度[deg]（東経+）
+
+    columns : list of tuple
+    データの列。省略時はTYPE99_COLUMNS（Wea2FileはTYPE99_EA2020_COLUMNS）
+
+    fmt : list of str
+    列毎の%書式。省略時はcolumnsの桁数で丸めて出力する
+
+    solar : bool
+    Trueの場合、全天日射量を直達、天空日射量(IBEAM_H, IBEAM_N, IDIFF_H)へ分離して出力する
+    """
+    from .wea2file import Wea2File
+
+    if columns is None:
+        columns = TYPE99_EA2020_COLUMNS if isinstance(data, Wea2File) else TYPE99_COLUMNS
+    if not isinstance(data, np.ndarray):
+        data = type99_data(data, columns)
+    if solar:
+        data, columns = add_solar_columns(data, columns, latitude, longitude, gmt)
+    text = type99_header(latitude, longitude, gmt, columns) + \
+        format_columns(data, [column[2] for column in columns], fmt)
+
+    if hasattr(filename, 'write'):
+        filename.write(text)
+    else:
+        with open(filename, mode='w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+
+
+def station_columns(elements, columns=TYPE99_COLUMNS):
+    """
+    気象要素の並び(weamap.EA_ELEMENTS, EA2020_ELEMENTS)から、Type99の列の位置を返す
+    """
+    elements = list(elements)
+    return [elements.index(column[1]) for column in columns]
+
+
+def write_type99_stations(folder, data, elements, stations, filename_format='ea_{no:0=3}_{name}.99',
+                          gmt=9, columns=None, fmt=None, solar=False):
+    """
+    複数地点の気象データを、地点毎のType99形式のファイルへ出力する
+
+    Parameters
+    ----------
+    folder : string
+    出力先のフォルダ
+
+    data : ndarray
+    shape (地点, 要素, 時間)の配列。weamap.load_stationsの結果
+
+    elements : list of str
+    要素の並び(weamap.EA_ELEMENTS, EA2020_ELEMENTS)
+
+    stations : ndarray
+    地点情報の構造化配列('no', 'latitude', 'longitude', ('station_roman_name'))。
+    緯度、経度が無い場合は地点情報(stationindex.ea_stations)から取得する
+
+    filename_format : str
+    ファイル名の書式。{no}は地点番号、{name}は地点名(ローマ字)
+
+    columns : list of tuple
+    データの列。省略時はTYPE99_COLUMNS（EA2020の要素の並びはTYPE99_EA2020_COLUMNS）
+
+    solar : bool
+    Trueの場合、全天日射量を直達、天空日射量へ分離して出力する（全地点を一括で計算する）
+
+    Returns
+    ----------
+    filenames : list of str
+    出力したファイル名
+    """
+    from .stationindex import find_ea_stations
+
+    names = stations.dtype.names
+    if 'latitude' not in names or 'longitude' not in names:
+        stations = find_ea_stations(stations['no'])
+        names = stations.dtype.names
+
+    if columns is None:
+        columns = TYPE99_EA2020_COLUMNS if 'pressure' in elements else TYPE99_COLUMNS
+
+    os.makedirs(folder, exist_ok=True)
+    data = data[:, station_columns(elements, columns)]
+    if solar:
+        data, columns = add_solar_columns(data, columns, stations['latitude'], stations['longitude'], gmt)
+    filenames = []
+    for vals, station in zip(data, stations):
+        name = station['station_roman_name'] if 'station_roman_name' in names else ''
+        filename = os.path.join(folder, filename_format.format(no=int(station['no']), name=name))
+        write_type99(filename, vals, float(station['latitude']), float(station['longitude']),
+                     gmt, columns, fmt)
+        filenames.append(filename)
+    return filenames
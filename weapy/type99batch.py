@@ -0,0 +1,227 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+拡張アメダス気象データの複数地点を、地点毎のType99形式のファイルへ一括で変換する
+
+ファイルはメモリマップで開き、地点をまとめた単位でプロセスプールへ振り分けて変換、出力する。
+コマンドライン: weapy-type99 weafile [stations] [-o folder] [-j workers]
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .earecord import EA_RECORDS, EA2020_RECORDS
+from .weamap import WeaMap, EA_ELEMENTS, EA2020_ELEMENTS, load_stations
+from .type99 import write_type99_stations
+
+#既定の出力ファイル名の書式
+EA_FILENAME_FORMAT = 'ea_{no:0=3}_{name}.99'
+EA2020_FILENAME_FORMAT = 'ea2020_{no:0=3}_{name}.99'
+
+
+def parse_stations(text, station_count):
+    """
+    地点の指定を地点番号の配列へ変換する
+
+    Parameters
+    ----------
+    text : str
+    'all'、もしくは地点番号、範囲のカンマ区切り e.g. '363', '1-100', '1,99,363-370'
+
+    station_count : int
+    ファイルに含まれる地点数
+
+    Returns
+    ----------
+    nos : ndarray
+    重複の無い、昇順の地点番号
+    """
+    if text.strip().lower() == 'all':
+        return np.arange(1, station_count + 1)
+
+    nos = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            nos.extend(range(int(first), int(last) + 1))
+        else:
+            nos.append(int(part))
+
+    nos = np.unique(np.asarray(nos, dtype=int))
+    if len(nos) == 0 or nos[0] < 1 or nos[-1] > station_count:
+        raise ValueError('地点番号は1～{}の番号で指定してください。'.format(station_count))
+    return nos
+
+
+def ea_station_table(nos):
+    """
+    EAの地点の地点情報（緯度、経度、標高）を返す
+
+    EAのファイルには地点情報が無いため、stationindex.ea_stationsの地点情報を使用する。
+    地点情報に無い地点がある場合は、件数と最初の地点番号を示してValueError
+    """
+    from .stationindex import ea_stations
+
+    stations = ea_stations()
+    missing = np.setdiff1d(nos, stations['no'])
+    if len(missing):
+        raise ValueError('EAのファイルの変換には地点の緯度、経度、標高が必要ですが、地点情報に{0}地点がありません'
+                         '（地点番号 {1}{2}）。\n--station-table（stationindex.set_ea_stations）で全地点の地点情報(csv)、'
+                         'もしくはEA2020のファイルを指定してください。'.format(len(missing), ', '.join(map(str, missing[:10])),
+                                           ' ...' if len(missing) > 10 else ''))
+    return stations[np.searchsorted(stations['no'], nos)]
+
+
+def _convert_chunk(filename, stations, folder, filename_format, fmt, solar=False):
+    """
+    地点のまとまりを変換して出力する（プロセスプールで実行する）
+    """
+    eamap = WeaMap(filename)
+    if eamap.records == EA2020_RECORDS:
+        data, stations = load_stations(eamap, stations['no'])
+        elements = EA2020_ELEMENTS
+    else:
+        data, _ = load_stations(eamap, stations['no'], stations['elevation'])
+        elements = EA_ELEMENTS
+    return write_type99_stations(folder, data, elements, stations, filename_format, fmt=fmt, solar=solar)
+
+
+def convert(filename, nos=None, folder='.', max_workers=None, chunk_size=16,
+            filename_format=None, fmt=None, progress=None, solar=False):
+    """
+    指定された地点をType99形式のファイルへ変換する
+
+    Parameters
+    ----------
+    filename : string
+    拡張アメダス気象データ(EA, EA2020)のファイル名
+
+    nos : list of int
+    拡張アメダスの地点番号のリスト。省略時は全地点
+
+    folder : string
+    出力先のフォルダ
+
+    max_workers : int
+    ワーカープロセスの数。省略時はCPUの数。1の場合はプロセスプールを使用せずに順に変換する
+
+    chunk_size : int
+    1回にワーカーへ振り分ける地点数
+
+    filename_format : str
+    出力ファイル名の書式。省略時はEA_FILENAME_FORMAT, EA2020_FILENAME_FORMAT
+
+    fmt : list of str
+    列毎の%書式(type99.write_type99)
+
+    progress : callable
+    地点のまとまりを出力する毎に progress(出力済みの地点数, 地点数, 出力したファイル名のリスト) で呼び出す
+
+    solar : bool
+    Trueの場合、全天日射量を直達、天空日射量(IBEAM_H, IBEAM_N, IDIFF_H)へ分離して出力する
+
+    Returns
+    ----------
+    filenames : list of str
+    出力したファイル名（地点番号順）
+    """
+    from .stationindex import load_station_index
+
+    eamap = WeaMap(filename)
+    if nos is None:
+        nos = np.arange(1, eamap.station_count + 1)
+    nos = np.atleast_1d(np.asarray(nos, dtype=int))
+
+    #地点情報（緯度、経度、標高）は親プロセスで1回だけ用意して、ワーカーへ渡す
+    if eamap.records == EA2020_RECORDS:
+        stations = load_station_index(eamap)[nos - 1]
+        default_format = EA2020_FILENAME_FORMAT
+    else:
+        stations = ea_station_table(nos) #地点情報に無い場合はValueError（変換を始める前に確認する）
+        default_format = EA_FILENAME_FORMAT
+    if filename_format is None:
+        filename_format = default_format
+
+    os.makedirs(folder, exist_ok=True)
+    chunks = [stations[i:i + chunk_size] for i in range(0, len(stations), chunk_size)]
+
+    results = []
+    done = 0
+    if max_workers == 1:
+        for chunk in chunks:
+            results.append(_convert_chunk(filename, chunk, folder, filename_format, fmt, solar))
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(stations), results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_convert_chunk, filename, chunk, folder, filename_format, fmt, solar)
+                       for chunk in chunks]
+            for future in as_completed(futures):
+                filenames = future.result()
+                results.append(filenames)
+                done += len(filenames)
+                if progress is not None:
+                    progress(done, len(stations), filenames)
+
+    return sorted(name for filenames in results for name in filenames)
+
+
+def main(argv=None):
+    """
+    コマンドラインから変換する
+    """
+    parser = argparse.ArgumentParser(prog='weapy-type99',
+                                     description='拡張アメダス気象データをType99形式のファイルへ一括で変換する')
+    parser.add_argument('weafile', help='拡張アメダス気象データ(EA, EA2020)のデータファイル', type=str)
+    parser.add_argument('stations', nargs='?', default='all',
+                        help="地点番号 'all', '363', '1-100', '1,99,363-370'（既定: all）")
+    parser.add_argument('-o', '--output', default='.', help='出力先のフォルダ')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='ワーカープロセスの数（既定: CPUの数）')
+    parser.add_argument('--chunk-size', type=int, default=16, help='1回にワーカーへ振り分ける地点数')
+    parser.add_argument('--station-table', default=None,
+                        help='EAの地点情報(csv)、もしくはEA2020のファイル。標高、緯度、経度に使用する'
+                             '（stationindex.set_ea_stations）')
+    parser.add_argument('--solar', action='store_true',
+                        help='全天日射量を直達、天空日射量(IBEAM_H, IBEAM_N, IDIFF_H)へ分離して出力する')
+    parser.add_argument('-q', '--quiet', action='store_true', help='進捗を表示しない')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.weafile):
+        parser.error('指定されたファイルが見つかりません。\nファイル：{0}'.format(args.weafile))
+
+    try:
+        eamap = WeaMap(args.weafile)
+        nos = parse_stations(args.stations, eamap.station_count)
+        if args.station_table is not None:
+            from .stationindex import set_ea_stations
+            set_ea_stations(args.station_table) #ワーカーへは地点情報を引数で渡す
+        if eamap.records == EA_RECORDS:
+            try:
+                ea_station_table(nos)
+            except ValueError as e:
+                parser.error(str(e)) #地点情報が足りない場合は変換を始めずに終了する
+
+        def report(done, total, filenames):
+            if not args.quiet:
+                print('{0}/{1} {2}'.format(done, total, os.path.basename(filenames[-1])), file=sys.stderr)
+
+        filenames = convert(args.weafile, nos, args.output, args.workers, args.chunk_size, progress=report,
+                            solar=args.solar)
+    except ValueError as e:
+        parser.exit(1, '{0}\n'.format(e))
+
+    if not args.quiet:
+        print('{0}ファイルを出力しました: {1}'.format(len(filenames), args.output), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
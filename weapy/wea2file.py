@@ -3,6 +3,10 @@
 # copyright  quattro corporate design. All right reserved.
 
 from .weatherdata import WeatherDataFile
+from .earecord import EA2020_RECORDS, EA2020_SCALE_FACTORS, read_block, element_codes, decode_values, storage_dtype
+from .weamap import WeaMap
+from .stationindex import LOCATION_WORDS, LOCATION_DAYS
+import io
 import struct
 import math
 import numpy as np
@@ -68,21 +72,26 @@ class name_info:
 
 
 class Wea2File(WeatherDataFile):
+    read_only = False   #Trueの場合、デコードした値を変更不可(読み出し専用)のndarrayにする
+
     # コンストラクタの定義
-    def __init__(self, filename, no):
+    def __init__(self, filename, no, storage='float64'):
         """
         拡張アメダス気象データの指定された地点のデータを読み出す
 
         Parameters
         ----------
-        filename : string
-        拡張アメダス気象データ標準年のファイル名
+        filename : string or WeaMap
+        拡張アメダス気象データ標準年のファイル名、もしくはメモリマップしたファイル(WeaMap)
 
         no : int
         拡張アメダスの地点番号[1-842]
 
-        elevation : float
-        地点の標高[m]
+        storage : str
+        デコードした値の保持方法(earecord.STORAGE_DTYPES)。
+        'float64', 'float32'はデコードした値を保持する。'int16'はリマーク付きの値(int16)のみ保持し、
+        プロパティの参照の都度float32へデコードする（O(時間数)）。
+        計算で求める値（風向の角度、EAの相対湿度）は'int16'でもfloat32で保持する
 
         """
 
@@ -94,38 +103,21 @@ class Wea2File(WeatherDataFile):
         self.file_name = filename   #標準年気象データファイル
         self.station_no = no        #地点番号
         # self.elevaton = elevation   #標高[m]
-        self.wea_data = []          #地点の気象データ一式
+        self.storage = storage      #デコードした値の保持方法
+        self.__dtype = storage_dtype(storage)   #デコードした値の型
+        self.block = None           #地点のレコード一式(デコード前のint16)
+        self.__values = {}          #デコード済みの気象要素（プロパティの初回アクセス時にデコードする）
 
         #地点の標準年データを取得
         #-----------------------------------------------
         self.__load(filename, no)
 
-        #日射量の単位換算
-        #-----------------------------------------------
-        self.wea_data[3] = self.wea_data[3]/3.6*1000.0 # 日射量の単位をMJ/hm2 -> W/m2へ換算
-
-        #大気放射量の単位換算
-        #-----------------------------------------------
-        self.wea_data[4] = self.wea_data[4]/3.6*1000.0 # 日射量の単位をMJ/hm2 -> W/m2へ換算
-        
-        #風向
-        #-----------------------------------------------
-        # 16方位を角度へ変換(N:360, E:90, S:180, W:270)
-        self.winddir = self.wea_data[5] * 22.5
-        #-----------------------------------------------
-
     def __read_int16(self, f):
         """Reads a 2-byte signed integer from the file"""
         bytes = f.read(2)
         val = struct.unpack('<h', bytes)[0] #Convert bytes to a 2-byte signed integer (int16)
         return val
 
-    def __skip_record_header(self, f):
-        """Read the station no, entity no and the year"""
-        station_number = self.__read_int16(f)
-        entity_number  = self.__read_int16(f)
-        year = self.__read_int16(f)
-
     def remove_remark(self, val):
         """Remove the remark"""
         return math.floor(val/10.0) # round the value down
@@ -135,9 +127,9 @@ class Wea2File(WeatherDataFile):
         Read the header information from the file
         """
         _header = header()
-        header.ea_no = self.__read_int16(f)            # 拡張アメダス(EA)地点番号
-        header.entity_number = self.__read_int16(f)    # 種別
-        header.year = self.__read_int16(f)             # e.g 1120, (EA2020)
+        _header.ea_no = self.__read_int16(f)            # 拡張アメダス(EA)地点番号
+        _header.entity_number = self.__read_int16(f)    # 種別
+        _header.year = self.__read_int16(f)             # e.g 1120, (EA2020)
         self.header = _header # Add the header property to the instance of the WEA2 class
 
 
@@ -145,41 +137,38 @@ class Wea2File(WeatherDataFile):
         """
         Read the location and name information from the file
         """
-        location_list = []
-        for i in range(366):
-
-            _location = location_info()
-            location_list.append(_location)
-
-            #アメダス観測所番号(上2桁), AMeDAS station number (upper 2 digits)
-            _location.station_number_upper2 = self.__read_int16(f)
-            #アメダス観測所番号(下3桁), AMeDAS station number (lower 3 digits)
-            _location.station_number_lower3 = self.__read_int16(f)
-            #国際地点番号(上2桁), International location number (upper 2 digits)
-            _location.international_location_number_upper2=self.__read_int16(f)
-            #国際地点番号(下3桁), International location number (lower 3 digits)
-            _location.international_location_number_lower3=self.__read_int16(f)
-            #緯度(整数部), Latitude (integer part)
-            _location.latitude_int_part=self.__read_int16(f)
-            #緯度(小数部分3桁), Latitude (decimal part)
-            _location.latitude_decimal_part=self.__read_int16(f)
-            #経度(整数部), Longitude (integer part)
-            _location.longitude_int_part=self.__read_int16(f)
-            #経度(小数部分3桁), Longitude (decimal part)
-            _location.longitude_decimal_part=self.__read_int16(f)
-            #標高（ｍ）, Elevation (m)
-            _location.elevation = self.__read_int16(f)
-            #風速観測高さ（0.1m単位）, Observed wind speed height (0.1m unit)
-            _location.observed_wind_speed_height = self.__read_int16(f) * 0.1
-            #風速補正高さ (0.1m単位), Corrected wind speed height (0.1m unit)
-            _location.corrected_wind_speed_height = self.__read_int16(f) * 0.1
-            # Skip dummy code, 26 bytes
-            for i in range(13):
-                dummy = self.__read_int16(f)
-            # f.seek(26,1) #26 bytes dummy code
+        #地点情報は366日分あるが、1日目(1/1)のみ読み出す
+        _location = location_info()
+        #アメダス観測所番号(上2桁), AMeDAS station number (upper 2 digits)
+        _location.station_number_upper2 = self.__read_int16(f)
+        #アメダス観測所番号(下3桁), AMeDAS station number (lower 3 digits)
+        _location.station_number_lower3 = self.__read_int16(f)
+        #国際地点番号(上2桁), International location number (upper 2 digits)
+        _location.international_location_number_upper2=self.__read_int16(f)
+        #国際地点番号(下3桁), International location number (lower 3 digits)
+        _location.international_location_number_lower3=self.__read_int16(f)
+        #緯度(整数部), Latitude (integer part)
+        _location.latitude_int_part=self.__read_int16(f)
+        #緯度(小数部分3桁), Latitude (decimal part)
+        _location.latitude_decimal_part=self.__read_int16(f)
+        #経度(整数部), Longitude (integer part)
+        _location.longitude_int_part=self.__read_int16(f)
+        #経度(小数部分3桁), Longitude (decimal part)
+        _location.longitude_decimal_part=self.__read_int16(f)
+        #標高（ｍ）, Elevation (m)
+        _location.elevation = self.__read_int16(f)
+        #風速観測高さ（0.1m単位）, Observed wind speed height (0.1m unit)
+        _location.observed_wind_speed_height = self.__read_int16(f) * 0.1
+        #風速補正高さ (0.1m単位), Corrected wind speed height (0.1m unit)
+        _location.corrected_wind_speed_height = self.__read_int16(f) * 0.1
+        # Skip dummy code, 26 bytes
+        f.seek(26,1) #26 bytes dummy code
 
         #1日目のlocationをWEA2へプロパティとして追加する
-        self.location = location_list[0]
+        self.location = _location
+
+        # Skip the location of the other 365 days
+        f.seek(LOCATION_WORDS * 2 * (LOCATION_DAYS - 1), 1)
 
         # Read the name information of the station
         _name = name_info()
@@ -208,38 +197,69 @@ class Wea2File(WeatherDataFile):
         """
         指定された標準年のファイルから、指定の地点の気象データ一式を取得する
         """
-        RECORD_LENGTH = 18306
-        BLOCK_LENGTH = RECORD_LENGTH * 11
+        #値の読み出し処理
+        if isinstance(weafile, WeaMap):
+            if weafile.records != EA2020_RECORDS:
+                raise ValueError('拡張アメダス2020年版(EA2020)のファイルではありません。\nファイル：{0}'.format(weafile.file_name))
+            block = weafile.block(no) # メモリマップから地点のレコード一式を参照する（コピー無し）
+        else:
+            block = self.__read(weafile, no)
+        self.block = block
 
-        #EAで整数値としてエンコードされているデータから実数への換算係数
-        #拡張アメダス気象データ（EA 気象データ）基礎知識（2020 年版）2022 年12 月31 日 V.03
-        sf=[-999, 0.1, 0.1, 0.01, 0.01, 1.0, 0.1, 0.1, 0.01, 1.0, 0.1] # 地点情報（ダミー）,気温、絶対湿度、全天日射量、大気放射量、風向、風速、降水量、日照時間、 気圧、相対湿度
+        # [0]地点情報レコード
+        f = io.BytesIO(block[0].tobytes())
+        self.read_header(f) #ヘッダー情報を読み込む
+        self.read_location(f) #地点情報を読み込む
 
-        #値の読み出し処理
+    def __read(self, weafile, no):
+        """
+        ファイルから地点のレコード一式を1回で読み出す
+        """
         with open(weafile, 'rb') as f:
-            # [0]地点情報レコード
-
-            for i in range(11):
-                #ファイルの先頭から、指定された地点データのレコードの先頭へ移動
-                head = (no-1)*BLOCK_LENGTH + i * RECORD_LENGTH
-                f.seek(head)
-                if(i==0):
-                    self.wea_data.append([]) #地点情報レコードは、空のリストを追加
-                    self.read_header(f) #ヘッダー情報を読み込む
-                    self.read_location(f) #地点情報を読み込む
-                    continue
-
-                # read the station no, entity no and the year
-                self.__skip_record_header(f)
-                vals = []
-                for day in range(365):      #365 days
-                    for hour in range(24):  #24 hours
-                        val = self.__read_int16(f)
-                        val = self.remove_remark(val) #remove the remark
-                        # val = val * sf[i] #unit conversion
-                        vals.append(val)
-
-                self.wea_data.append(np.array(vals) * sf[i]) #ndarrayに変換して、単位換算後にリストへ追加
+            return read_block(f, no, EA2020_RECORDS)
+
+    def __element(self, i):
+        """
+        i番目のレコードの気象要素を返す。初回のアクセス時にデコードし、以降はデコード済みの値を返す
+
+        [1-10]気温、絶対湿度、全天日射量、大気放射量、風向、風速、降水量、日照時間、 気圧、相対湿度
+        """
+        vals = self.__values.get(i)
+        if vals is None:
+            codes = element_codes(self.block[i]) # レコードヘッダーを除いた365日x24時間の値
+            vals = decode_values(codes, EA2020_SCALE_FACTORS[i-1], self.__dtype) #リマークを除き、単位換算
+            if i == 3 or i == 4:
+                vals = vals/3.6*1000.0 # 日射量、大気放射量の単位をMJ/hm2 -> W/m2へ換算
+            self.__store(i, vals)
+        return vals
+
+    def __store(self, key, vals):
+        """
+        デコードした値を保持する（読み出し専用のインスタンスでは変更不可にする）
+        storageが'int16'の場合は、レコードからデコードしただけの値(keyがレコードの番号)は保持しない（参照の都度デコードする）。
+        計算で求める値(keyが'winddir', 'rh')は毎回計算すると遅いため保持する
+        """
+        if self.storage == 'int16' and not isinstance(key, str):
+            return
+        if self.read_only:
+            vals.flags.writeable = False
+        self.__values[key] = vals
+
+    @property
+    def nbytes(self):
+        """
+        Get the memory size of the records and decoded elements. [bytes]\n
+        レコード一式とデコード済みの気象要素のメモリサイズを返す[bytes]
+        """
+        return self.block.nbytes + sum(vals.nbytes for vals in self.__values.values())
+
+    @property
+    def wea_data(self):
+        """
+        Get the list of all elements.\n
+        地点の気象データ一式のリストを返す（[0]は地点情報レコードのため空のリスト）
+        """
+        return [[]] + [self.__element(i) for i in range(1, EA2020_RECORDS)]
 
     @property
     def ambient_temperatures(self):
@@ -247,7 +267,7 @@ class Wea2File(WeatherDataFile):
         Get the list of temperatures. [C]\n
         気温のリストを返す[C]
         """
-        return self.wea_data[1]
+        return self.__element(1)
 
     @property
     def absolute_humidities(self):
@@ -255,7 +275,7 @@ class Wea2File(WeatherDataFile):
         Get the list of absolute humidities.[g/kg]\n
         絶対湿度のリストを返す[g/kg]
         """
-        return self.wea_data[2]
+        return self.__element(2)
 
     @property
     def horizontal_global_solar_irradiations(self):
@@ -263,7 +283,7 @@ class Wea2File(WeatherDataFile):
         Get the list of horizoltal global solar irradiations.[W/m2]\n
         全天日射量のリストを返す[W/m2]
         """
-        return self.wea_data[3]
+        return self.__element(3)
         #return self.it
 
     @property
@@ -272,7 +292,7 @@ class Wea2File(WeatherDataFile):
         Get or set the  array of downward longwave irradiations.[W/m2]\n
         大気放射量のリストを返す[W/m2]
         """
-        return self.wea_data[4]
+        return self.__element(4)
 
     @property
     def wind_directions(self):
@@ -281,8 +301,12 @@ class Wea2File(WeatherDataFile):
         風向のリストを返す[deg]\n
         16 方位(22.5:北北東～360:北,0:静穏)
         """
-        # return self.wea_data[4]
-        return self.winddir
+        winddir = self.__values.get('winddir')
+        if winddir is None:
+            # 16方位を角度へ変換(N:360, E:90, S:180, W:270)
+            winddir = self.__element(5) * 22.5
+            self.__store('winddir', winddir)
+        return winddir
 
     @property
     def wind_velocities(self):
@@ -290,7 +314,7 @@ class Wea2File(WeatherDataFile):
         Get the list of wind Velocities.[m/s]\n
         風速のリストを返す[m/s]
         """
-        return self.wea_data[6]
+        return self.__element(6)
 
     @property
     def precipitation_amounts(self):
@@ -298,7 +322,7 @@ class Wea2File(WeatherDataFile):
         Get the list of precipitation amount.[mm]\n
         降水量のリストを返す[mm]
         """
-        return self.wea_data[7]
+        return self.__element(7)
 
     @property
     def sunshine_durations(self):
@@ -306,7 +330,7 @@ class Wea2File(WeatherDataFile):
         Get the list of sunshine durations.[h]\n
         日照時間のリストを返す[h]
         """
-        return self.wea_data[8]
+        return self.__element(8)
 
     @property
     def pressure(self):
@@ -314,15 +338,15 @@ class Wea2File(WeatherDataFile):
         Get the list of pressure.[hPa]\n
         気圧のリストを返す[hPa]
         """
-        return self.wea_data[9]
+        return self.__element(9)
 
     @property
     def relative_humidities(self):
         """
         Get the list of relative humidities.[%]\n
-        相対湿度のリストを返す[%]
+        相対湿度のリストを返す[%]（EA2020はレコードの値。storageが'int16'の場合は参照の都度デコードする）
         """
-        return self.wea_data[10]
+        return self.__element(10)
 
     @property
     def station_name(self):
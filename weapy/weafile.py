@@ -3,28 +3,38 @@
 # copyright  quattro corporate design. All right reserved.
 
 from .weatherdata import WeatherDataFile
-import struct
+from .earecord import EA_RECORDS, EA_SCALE_FACTORS, read_block, element_codes, decode_values, storage_dtype
+from .weamap import WeaMap
+from .stationindex import find_ea_stations, lookup_ea_station
 import math
 import numpy as np
 
 KELVIN = 273.15 #絶対温度(摂氏0℃）
 
 class WeaFile(WeatherDataFile):
+    read_only = False   #Trueの場合、デコードした値を変更不可(読み出し専用)のndarrayにする
+
     # コンストラクタの定義
-    def __init__(self, filename, no, elevation):
+    def __init__(self, filename, no, elevation=None, storage='float64'):
         """
         拡張アメダス気象データの指定された地点のデータを読み出す
 
         Parameters
         ----------
-        filename : string
-        拡張アメダス気象データ標準年のファイル名
+        filename : string or WeaMap
+        拡張アメダス気象データ標準年のファイル名、もしくはメモリマップしたファイル(WeaMap)
         
         no : int
         拡張アメダスの地点番号[1-842]
         
         elevation : float
-        地点の標高[m]
+        地点の標高[m]。省略時は地点情報(stationindex.ea_stations)の標高を使用する
+
+        storage : str
+        デコードした値の保持方法(earecord.STORAGE_DTYPES)。
+        'float64', 'float32'はデコードした値を保持する。'int16'はリマーク付きの値(int16)のみ保持し、
+        プロパティの参照の都度float32へデコードする（O(時間数)）。
+        計算で求める値（風向の角度、EAの相対湿度）は'int16'でもfloat32で保持する
         
         """
 
@@ -32,46 +42,24 @@ class WeaFile(WeatherDataFile):
         #-----------------------------------------------
         self.file_name = filename   #標準年気象データファイル
         self.station_no = no        #地点番号
+        self.latitude = None        #緯度[deg]（地点情報にある場合）
+        self.longitude = None       #経度[deg]（地点情報にある場合、東経+）
+        if elevation is None:
+            elevation = float(find_ea_stations(no)['elevation']) #地点情報に無い場合はValueError
+        station = lookup_ea_station(no) #標高を指定した場合も、地点情報にあれば緯度、経度を設定する
+        if station is not None:
+            self.latitude = float(station['latitude'])
+            self.longitude = float(station['longitude'])
         self.elevaton = elevation   #標高[m]
-        self.wea_data = []          #地点の気象データ一式
+        self.storage = storage      #デコードした値の保持方法
+        self.__dtype = storage_dtype(storage)   #デコードした値の型
+        self.block = None           #地点のレコード一式(デコード前のint16)
+        self.__values = {}          #デコード済みの気象要素（プロパティの初回アクセス時にデコードする）
         
         #地点の標準年データを取得
         #-----------------------------------------------
         self.__load(filename, no)
 
-        #日射量の単位換算
-        #-----------------------------------------------
-        self.wea_data[2] = self.wea_data[2]/3.6*1000.0 # 日射量の単位をMJ/hm2 -> W/m2へ換算
-        
-        #大気放射量の単位換算
-        #-----------------------------------------------
-        self.wea_data[3] = self.wea_data[3]/3.6*1000.0 # 日射量の単位をMJ/hm2 -> W/m2へ換算
-
-        #相対湿度
-        #-----------------------------------------------
-        abs_hum = self.wea_data[1]  #絶対湿度[g/kg']
-        abs_hum = np.array(abs_hum) / 1000.0 #単位換算 [g/kg'] -> [kg/kg']
-        #相対湿度[%]　絶対湿度、気温、標高から相対湿度を計算する
-        self.rh = calc_relative_humidity(abs_hum, np.array(self.wea_data[0]), self.elevaton)#相対湿度
-
-        #風向
-        #-----------------------------------------------
-        # 16方位を角度へ変換(N:360, E:90, S:180, W:270)
-        self.winddir = self.wea_data[4] * 22.5
-        #-----------------------------------------------
-
-    def __read_int16(self, f):
-        """Reads a 2-byte signed integer from the file"""
-        bytes = f.read(2)
-        val = struct.unpack('<h', bytes)[0] #Convert bytes to a 2-byte signed integer (int16)
-        return val
-
-    def __skip_record_header(self, f):
-        """Read the station no, entity no and the year"""
-        station_number = self.__read_int16(f)
-        entity_number  = self.__read_int16(f)
-        year = self.__read_int16(f)
-
     def remove_remark(self, val):
         """Remove the remark"""
         return math.floor(val/10.0) # round the value down
@@ -80,31 +68,61 @@ class WeaFile(WeatherDataFile):
         """
         指定された標準年のファイルから、指定の地点の気象データ一式を取得する
         """
-        RECORD_LENGTH = 18306
-        BLOCK_LENGTH = RECORD_LENGTH * 8        
-        
-        #EAで整数値としてエンコードされているデータから実数への換算係数
-        #拡張アメダス気象データ 1981-2000, 表3.2 気象要素の単位
-        sf=[0.1, 0.1, 0.01, 0.01, 1.0, 0.1, 1.0, 0.1] 
-
         #値の読み出し処理
+        if isinstance(weafile, WeaMap):
+            if weafile.records != EA_RECORDS:
+                raise ValueError('拡張アメダス標準年(EA)のファイルではありません。\nファイル：{0}'.format(weafile.file_name))
+            self.block = weafile.block(no) # メモリマップから地点のレコード一式を参照する（コピー無し）
+        else:
+            self.block = self.__read(weafile, no)
+
+    def __read(self, weafile, no):
+        """
+        ファイルから地点のレコード一式を1回で読み出す
+        """
         with open(weafile, 'rb') as f:
-            for i in range(8):          
-                head = (no-1)*BLOCK_LENGTH + i * RECORD_LENGTH         
-                f.seek(head) # go to the head of the specified station and data.
-                # read the station no, entity no and the year
-                self.__skip_record_header(f)
+            return read_block(f, no, EA_RECORDS)
 
-                vals = []
-                for day in range(365):      #365 days                    
-                    for hour in range(24):  #24 hours
-                        val = self.__read_int16(f)
-                        val = self.remove_remark(val) #remove the remark
-                        # val = val * sf[i] #unit conversion
-                        vals.append(val)
+    def __element(self, i):
+        """
+        i番目の気象要素を返す。初回のアクセス時にデコードし、以降はデコード済みの値を返す
+        """
+        vals = self.__values.get(i)
+        if vals is None:
+            codes = element_codes(self.block[i]) # レコードヘッダーを除いた365日x24時間の値
+            vals = decode_values(codes, EA_SCALE_FACTORS[i], self.__dtype) #リマークを除き、単位換算
+            if i == 2 or i == 3:
+                vals = vals/3.6*1000.0 # 日射量、大気放射量の単位をMJ/hm2 -> W/m2へ換算
+            self.__store(i, vals)
+        return vals
+
+    def __store(self, key, vals):
+        """
+        デコードした値を保持する（読み出し専用のインスタンスでは変更不可にする）
+        storageが'int16'の場合は、レコードからデコードしただけの値(keyがレコードの番号)は保持しない（参照の都度デコードする）。
+        計算で求める値(keyが'winddir', 'rh')は毎回計算すると遅いため保持する
+        """
+        if self.storage == 'int16' and not isinstance(key, str):
+            return
+        if self.read_only:
+            vals.flags.writeable = False
+        self.__values[key] = vals
 
-                self.wea_data.append(np.array(vals) * sf[i]) #ndarrayに変換して、単位換算後にリストへ追加
+    @property
+    def nbytes(self):
+        """
+        Get the memory size of the records and decoded elements. [bytes]\n
+        レコード一式とデコード済みの気象要素のメモリサイズを返す[bytes]
+        """
+        return self.block.nbytes + sum(vals.nbytes for vals in self.__values.values())
 
+    @property
+    def wea_data(self):
+        """
+        Get the list of all elements.\n
+        地点の気象データ一式のリストを返す（未デコードの要素はデコードする）
+        """
+        return [self.__element(i) for i in range(EA_RECORDS)]
 
     @property
     def ambient_temperatures(self):
@@ -112,7 +130,7 @@ class WeaFile(WeatherDataFile):
         Get the list of temperatures. [C]\n
         気温のリストを返す[C]
         """
-        return self.wea_data[0]
+        return self.__element(0)
 
     # @ambient_temperatures.setter
     # def ambient_temperatures(self, val):
@@ -127,7 +145,7 @@ class WeaFile(WeatherDataFile):
         Get the list of absolute humidities.[g/kg]\n
         絶対湿度のリストを返す[g/kg]
         """
-        return self.wea_data[1]
+        return self.__element(1)
     
     # @absolute_humidities.setter
     # def absolute_humidities(self, val):
@@ -139,8 +157,13 @@ class WeaFile(WeatherDataFile):
         Get the list of relative humidities.[g/kg]\n
         相対湿度のリストを返す[%]
         """
-        # raise NotImplementedError
-        return self.rh
+        rh = self.__values.get('rh')
+        if rh is None:
+            abs_hum = self.__element(1) / 1000.0 #単位換算 [g/kg'] -> [kg/kg']
+            #相対湿度[%]　絶対湿度、気温、標高から相対湿度を計算する
+            rh = calc_relative_humidity(abs_hum, self.__element(0), self.elevaton).astype(self.__dtype, copy=False)
+            self.__store('rh', rh)
+        return rh
 
     # @relative_humidities.setter
     # def relative_humidities(self, val):
@@ -153,7 +176,7 @@ class WeaFile(WeatherDataFile):
         Get the list of horizoltal global solar irradiations.[W/m2]\n
         全天日射量のリストを返す[W/m2]
         """
-        return self.wea_data[2]
+        return self.__element(2)
         #return self.it
 
     # @horizontal_global_solar_irradiations.setter
@@ -166,7 +189,7 @@ class WeaFile(WeatherDataFile):
         Get or set the  array of downward longwave irradiations.[W/m2]\n
         大気放射量のリストを返す[W/m2]
         """
-        return self.wea_data[3]
+        return self.__element(3)
 
     # @downward_longwave_irradiations.setter
     # def downward_longwave_irradiations(self, val):
@@ -180,8 +203,12 @@ class WeaFile(WeatherDataFile):
         風向のリストを返す[deg]\n
         16 方位(22.5:北北東～360:北,0:静穏)
         """
-        # return self.wea_data[4]
-        return self.winddir
+        winddir = self.__values.get('winddir')
+        if winddir is None:
+            # 16方位を角度へ変換(N:360, E:90, S:180, W:270)
+            winddir = self.__element(4) * 22.5
+            self.__store('winddir', winddir)
+        return winddir
 
     # @wind_directions.setter
     # def wind_directions(self, val):
@@ -193,7 +220,7 @@ class WeaFile(WeatherDataFile):
         Get the list of wind Velocities.[m/s]\n
         風速のリストを返す[m/s]
         """
-        return self.wea_data[5]
+        return self.__element(5)
 
     # @wind_velocities.setter
     # def wind_velocities(self, val):
@@ -206,7 +233,7 @@ class WeaFile(WeatherDataFile):
         Get the list of precipitation amount.[mm]\n
         降水量のリストを返す[mm]
         """
-        return self.wea_data[6]
+        return self.__element(6)
         
     # @precipitation_amounts.setter
     # def precipitation_amounts(self, val):
@@ -219,7 +246,7 @@ class WeaFile(WeatherDataFile):
         Get the list of sunshine durations.[h]\n
         日照時間のリストを返す[h]
         """
-        return self.wea_data[7]
+        return self.__element(7)
         
     # @sunshine_durations.setter
     # def sunshine_durations(self, val):
@@ -265,33 +292,31 @@ def GetPws(tambs):
 
     Parameters
     ----------
-    tambs : float
-    乾球温度[C]
-    
+    tambs : float or ndarray
+    乾球温度[C]（任意の形状の配列）
+
     Returns
     ----------
-    Pws: float
-    飽和水蒸気圧[kPa]
+    Pws: ndarray
+    飽和水蒸気圧[kPa]（tambsと同じ形状）
     """
+    t = np.asarray(tambs, dtype=float)
+    Tab = C2K(t)#[C]->[K]　絶対温度へ換算
+    ln_Tab = np.log(Tab)
 
-    Pws = [] #飽和水蒸気圧のリストを初期化
-    for t in tambs:
-        Tab = C2K(t)#[C]->[K]　絶対温度へ換算
+    #水の上(0℃以上)
+    pws_water = np.exp(-5800.2206 / Tab + 1.3914993 - 0.048640239 * Tab
+        + 0.4176768 * 10.0**(-4) * Tab**2
+        - 0.14452093 * 10.0**(-7) * Tab**3
+        + 6.5459673 * ln_Tab) / 1000.0
 
-        if t >= 0.0:
-            pws0 = math.exp(-5800.2206 / Tab + 1.3914993 - 0.048640239 * Tab
-                + 0.4176768 * 10.0**(-4) * Tab**2
-                - 0.14452093 * 10.0**(-7) * Tab**3
-                + 6.5459673 * math.log(Tab)) / 1000.0
-            Pws.append(pws0)
-        else:
-            pws0 = math.exp(-5674.5359 / Tab + 6.3925247  - 0.9677843*10**(-2) * Tab
-                + 0.62215701 * 10.0**(-6) * Tab**2
-                + 0.20747825 * 10.0**(-8) * Tab**3
-                - 0.9484024 * 10.0**(-12) * Tab**4 + 4.1635019 * math.log(Tab)) / 1000.0
-            Pws.append(pws0)
-    
-    return Pws
+    #氷の上(0℃未満)
+    pws_ice = np.exp(-5674.5359 / Tab + 6.3925247  - 0.9677843*10**(-2) * Tab
+        + 0.62215701 * 10.0**(-6) * Tab**2
+        + 0.20747825 * 10.0**(-8) * Tab**3
+        - 0.9484024 * 10.0**(-12) * Tab**4 + 4.1635019 * ln_Tab) / 1000.0
+
+    return np.where(t >= 0.0, pws_water, pws_ice)
 
 def calc_relative_humidity(abs_hum, tambs, elevation):
     """
@@ -299,15 +324,22 @@ def calc_relative_humidity(abs_hum, tambs, elevation):
 
     Parameters
     ----------
-    abs_hum : float
+    abs_hum : float or ndarray
     絶対湿度[kg/kg']
-    tambs   : float
+    tambs   : float or ndarray
     気温[C]
+    elevation : float or ndarray
+    標高[m]
+
+    abs_hum, tambs, elevationはブロードキャスト可能な形状で指定する。
+    例）(地点, 8760)の絶対湿度、気温に対して、標高は(地点, 1)
+    np.exp, np.logで一括で計算するため、1値ずつmath.exp, math.logで計算した値とは
+    丸め誤差の分(相対湿度で1e-13%程度)異なる（tests/test_decode.py）
     
     Returns
     ----------
-    Pw: float
-    水蒸気分圧[kPa]
+    rh: ndarray
+    相対湿度[%]
     """
     #水蒸気分圧[kPa]
     pw = GetPw(abs_hum, elevation) #水蒸気分圧[kPa]
@@ -317,8 +349,7 @@ def calc_relative_humidity(abs_hum, tambs, elevation):
 
     #相対湿度[%]
     rh = pw/pws *100.0
-    rh = np.where(rh<0.0, 0.0, rh) # 計算上負の値は（無いと思うが）0.0%へ
-    rh = np.where(rh>100.0, 100.0, rh) # 計算上100.0%を超える値があれば100.0%へ
+    rh = np.clip(rh, 0.0, 100.0) # 計算上負の値は（無いと思うが）0.0%へ、100.0%を超える値があれば100.0%へ
     
     return rh
 
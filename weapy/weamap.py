@@ -0,0 +1,259 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+拡張アメダス気象データ(EA, EA2020)のファイル全体をメモリマップで扱う
+
+ファイルを一度だけマップし、全地点のデータを (地点, 要素, 8760) のint16の配列として
+コピー無しで参照する。実数への換算は値を取り出す時に行う。
+"""
+
+import os
+import numpy as np
+from .weatherdata import HOURS_PER_YEAR
+from .earecord import RECORD_LENGTH, RECORD_WORDS, EA_RECORDS, EA2020_RECORDS
+from .earecord import EA_SCALE_FACTORS, EA2020_SCALE_FACTORS, element_codes, remove_remark, decode_values
+
+
+def convert_units(vals, element):
+    """
+    換算係数を掛けた気象要素の値を、WeaFile, Wea2Fileのプロパティと同じ単位へ換算する
+
+    日射量、大気放射量はMJ/hm2 -> W/m2、風向は16方位 -> 角度(N:360, E:90, S:180, W:270)
+
+    Parameters
+    ----------
+    element : int
+    気象要素の番号(0から、EA2020では地点情報レコードを除く)
+    """
+    if element == 2 or element == 3:
+        return vals/3.6*1000.0 # 日射量、大気放射量の単位をMJ/hm2 -> W/m2へ換算
+    if element == 4:
+        return vals * 22.5      # 16方位を角度へ変換
+    return vals
+
+
+def detect_records(filename):
+    """
+    ファイルサイズから、1地点あたりのレコード数(EA_RECORDS, EA2020_RECORDS)を判定する
+
+    地点数が8と11の公倍数（EAの11, 22地点、EA2020の8, 16地点など）でどちらのサイズとも一致する場合は、
+    [8]レコードのレコードヘッダーの地点番号で判定する（EAは2地点目の[0]レコード、EA2020は1地点目のレコード）
+    """
+    size = os.path.getsize(filename)
+    candidates = [records for records in (EA_RECORDS, EA2020_RECORDS)
+                    if size > 0 and size % (RECORD_LENGTH * records) == 0]
+    if len(candidates) == 2:
+        with open(filename, 'rb') as f:
+            first = np.frombuffer(f.read(2), dtype='<i2')[0]    #[0]レコードの地点番号
+            f.seek(RECORD_LENGTH * EA_RECORDS)
+            second = np.frombuffer(f.read(2), dtype='<i2')[0]   #[8]レコードの地点番号
+        candidates = [EA2020_RECORDS if first == second else EA_RECORDS]
+    if len(candidates) != 1:
+        raise ValueError('拡張アメダス気象データの形式を判定できません。\nファイル：{0}'.format(filename))
+    return candidates[0]
+
+
+class WeaMap:
+    # コンストラクタの定義
+    def __init__(self, filename, records=None):
+        """
+        拡張アメダス気象データのファイル全体をメモリマップする
+
+        Parameters
+        ----------
+        filename : string
+        拡張アメダス気象データのファイル名
+
+        records : int
+        1地点あたりのレコード数(EA:8, EA2020:11)。省略時はファイルサイズから判定する
+        """
+        if records is None:
+            records = detect_records(filename)
+        if records not in (EA_RECORDS, EA2020_RECORDS):
+            raise ValueError('レコード数は{0}または{1}を指定してください'.format(EA_RECORDS, EA2020_RECORDS))
+
+        self.file_name = filename   #気象データファイル
+        self.records = records      #1地点あたりのレコード数
+
+        words = np.memmap(filename, dtype='<i2', mode='r')
+        stations = len(words) // (records * RECORD_WORDS)
+        #(地点, レコード, RECORD_WORDS)
+        self.blocks = words[:stations * records * RECORD_WORDS].reshape(stations, records, RECORD_WORDS)
+
+        if records == EA2020_RECORDS:
+            self.first_element = 1  #[0]は地点情報レコード
+            self.scale_factors = np.array(EA2020_SCALE_FACTORS)
+        else:
+            self.first_element = 0
+            self.scale_factors = np.array(EA_SCALE_FACTORS)
+
+    @property
+    def station_count(self):
+        """
+        Get the number of stations in the file.\n
+        ファイルに含まれる地点数を返す
+        """
+        return self.blocks.shape[0]
+
+    @property
+    def element_count(self):
+        """
+        Get the number of elements per station.\n
+        1地点あたりの気象要素の数を返す
+        """
+        return self.records - self.first_element
+
+    @property
+    def codes(self):
+        """
+        Get the zero-copy view of the encoded values.\n
+        リマーク付きの値(int16)を (地点, 要素, 8760) の配列として返す（コピー無し、読み出し専用）
+        """
+        return element_codes(self.blocks[:, self.first_element:], HOURS_PER_YEAR)
+
+    def block(self, no):
+        """
+        指定された地点のレコード一式を返す（コピー無し）
+
+        Parameters
+        ----------
+        no : int
+        拡張アメダスの地点番号[1-842]
+
+        Returns
+        ----------
+        block : ndarray
+        int16の配列, shape (records, RECORD_WORDS)
+        """
+        if no < 1 or self.station_count < no:
+            raise ValueError('地点番号は1～{}の番号で指定してください。'.format(self.station_count))
+        return self.blocks[no-1]
+
+    def values(self, element, nos=None, dtype=np.float64):
+        """
+        指定された気象要素の値を実数へ換算して返す
+
+        単位はWeaFile, Wea2Fileのプロパティと同じ（日射量、大気放射量はW/m2、風向は角度, convert_units）
+
+        Parameters
+        ----------
+        element : int
+        気象要素の番号(0から、EA2020では地点情報レコードを除く)
+
+        nos : list of int
+        拡張アメダスの地点番号のリスト。省略時は全地点
+
+        dtype : data-type
+        換算後の型(np.float64, np.float32)
+
+        Returns
+        ----------
+        vals : ndarray
+        dtypeの配列, shape (地点, 8760)
+        """
+        codes = self.codes[:, element]
+        if nos is not None:
+            codes = codes[np.asarray(nos) - 1]
+        return convert_units(decode_values(codes, self.scale_factors[element], dtype), element)
+
+    def station_values(self, no, dtype=np.float64):
+        """
+        指定された地点の全気象要素の値を実数へ換算して返す（単位はvaluesと同じ）
+
+        Returns
+        ----------
+        vals : ndarray
+        dtypeの配列, shape (要素, 8760)
+        """
+        codes = element_codes(self.block(no)[self.first_element:], HOURS_PER_YEAR)
+        vals = decode_values(codes, self.scale_factors[:, np.newaxis], dtype)
+        for element in (2, 3, 4):
+            vals[element] = convert_units(vals[element], element)
+        return vals
+
+
+# --------------------------------------------------------------------------------------------
+
+#load_stationsで返す気象要素の並び（WeaFile, Wea2Fileのプロパティ名）
+EA_ELEMENTS = ('ambient_temperatures', 'absolute_humidities',
+                'horizontal_global_solar_irradiations', 'downward_longwave_irradiations',
+                'wind_directions', 'wind_velocities', 'precipitation_amounts', 'sunshine_durations',
+                'relative_humidities')
+
+EA2020_ELEMENTS = ('ambient_temperatures', 'absolute_humidities',
+                'horizontal_global_solar_irradiations', 'downward_longwave_irradiations',
+                'wind_directions', 'wind_velocities', 'precipitation_amounts', 'sunshine_durations',
+                'pressure', 'relative_humidities')
+
+
+def load_stations(filename, nos=None, elevations=None, dtype=np.float64):
+    """
+    複数地点の気象データをファイルから一括で読み出す
+
+    Parameters
+    ----------
+    filename : string or WeaMap
+    拡張アメダス気象データのファイル名、もしくはメモリマップしたファイル(WeaMap)
+
+    nos : list of int
+    拡張アメダスの地点番号[1-842]のリスト。省略時は全地点
+
+    elevations : float or list of float
+    地点の標高[m]。EAでは相対湿度の計算に使用する（EA2020では不要）
+    EAで省略時は地点情報(stationindex.ea_stations)の標高を使用する
+
+    dtype : data-type
+    値の型。np.float32の場合はnp.float64の半分のメモリで全地点を保持できる
+
+    Returns
+    ----------
+    data : ndarray
+    dtypeの配列, shape (地点, 要素, 8760)。要素の並びはEA_ELEMENTS, EA2020_ELEMENTSの通り
+
+    stations : ndarray
+    地点情報の構造化配列（地点番号、標高など）。EA2020はstationindex.STATION_DTYPE
+    """
+    from .weafile import calc_relative_humidity
+    from .stationindex import station_table, find_ea_stations
+
+    eamap = filename if isinstance(filename, WeaMap) else WeaMap(filename)
+    if nos is None:
+        nos = np.arange(1, eamap.station_count + 1)
+    nos = np.atleast_1d(np.asarray(nos, dtype=int))
+    if np.any(nos < 1) or np.any(nos > eamap.station_count):
+        raise ValueError('地点番号は1～{}の番号で指定してください。'.format(eamap.station_count))
+
+    #EAは相対湿度（計算値）の分を追加した配列へ、指定された地点のレコードを1回でデコードする
+    elements = len(EA_ELEMENTS) if eamap.records == EA_RECORDS else len(EA2020_ELEMENTS)
+    data = np.empty((len(nos), elements, HOURS_PER_YEAR), dtype=dtype)
+    vals = data[:, :eamap.element_count]
+    np.multiply(remove_remark(eamap.codes[nos - 1]), eamap.scale_factors[:, np.newaxis], out=vals)
+
+    vals[:, 2] = vals[:, 2]/3.6*1000.0 # 日射量の単位をMJ/hm2 -> W/m2へ換算
+    vals[:, 3] = vals[:, 3]/3.6*1000.0 # 大気放射量の単位をMJ/hm2 -> W/m2へ換算
+    vals[:, 4] = vals[:, 4] * 22.5      # 16方位を角度へ変換(N:360, E:90, S:180, W:270)
+
+    if eamap.records == EA2020_RECORDS:
+        return data, station_table(eamap, nos)
+
+    #EAは絶対湿度、気温、標高から相対湿度を計算する
+    if elevations is None:
+        elevations = find_ea_stations(nos)['elevation'] #地点情報に無い場合はValueError
+    elevations = np.broadcast_to(np.asarray(elevations, dtype=float), nos.shape)
+    data[:, EA_RECORDS] = calc_relative_humidity(vals[:, 1] / 1000.0, vals[:, 0], elevations[:, np.newaxis])
+
+    stations = np.empty(len(nos), dtype=[('no', 'i4'), ('elevation', 'f8')])
+    stations['no'] = nos
+    stations['elevation'] = elevations
+    return data, stations
+
+
+def load_all_stations(filename, elevations=None, dtype=np.float64):
+    """
+    全地点の気象データをファイルから一括で読み出す
+
+    load_stations(filename, None, elevations, dtype)と同じ
+    """
+    return load_stations(filename, None, elevations, dtype)
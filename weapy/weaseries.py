@@ -0,0 +1,212 @@
+# coding: utf-8
+# author     Yuichi Yasuda @ quattro corporate design
+# copyright  quattro corporate design. All right reserved.
+
+"""
+年毎の拡張アメダス気象データ(EA, EA2020, 実況年)のファイルを、複数年の連続した時系列として扱う
+
+フォルダ内のファイルをレコードヘッダーの年で索引し、指定された地点、期間の年のみ
+メモリマップから読み出してデコードする。うるう年は8784時間として扱う。
+"""
+
+import calendar
+import fnmatch
+import os
+import numpy as np
+from .earecord import EA_RECORDS, EA_SCALE_FACTORS, EA2020_SCALE_FACTORS, element_codes, decode_values
+from .weamap import WeaMap, EA_ELEMENTS, EA2020_ELEMENTS, convert_units
+from .columnar import timestamps
+
+
+def hours_in_year(year):
+    """
+    年間の時間数を返す（うるう年は8784）
+    """
+    return 8784 if calendar.isleap(year) else 8760
+
+
+def header_year(code):
+    """
+    レコードヘッダーの年を西暦へ変換する
+
+    実況年のファイルは西暦(e.g. 2010)。標準年のファイル(e.g. 8195, 1120)は対象期間を表すためValueError
+    """
+    if 1900 <= code <= 2100:
+        return int(code)
+    raise ValueError('レコードヘッダーの年({0})は西暦ではありません（標準年のファイル）。'
+                     'year_ofで年を指定してください'.format(code))
+
+
+class WeaSeries:
+    # コンストラクタの定義
+    def __init__(self, files, pattern='*.wea*', year_of=None):
+        """
+        年毎の拡張アメダス気象データのファイルを年で索引する
+
+        Parameters
+        ----------
+        files : string or list of string
+        ファイルのあるフォルダ、もしくはファイル名のリスト
+
+        pattern : str
+        フォルダを指定した場合のファイル名のパターン（大文字、小文字を区別しない）
+
+        year_of : callable
+        year_of(ファイル名, レコードヘッダーの年) で西暦を返す関数。省略時はheader_year
+        """
+        if isinstance(files, (str, os.PathLike)):
+            folder = files
+            files = [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                     if fnmatch.fnmatch(name.lower(), pattern.lower())]
+        if len(files) == 0:
+            raise ValueError('拡張アメダス気象データのファイルがありません')
+
+        self.files = {}         #{西暦: ファイル名}
+        self.__maps = {}        #{西暦: WeaMap}（参照した年のみ）
+        self.records = None     #1地点あたりのレコード数
+        self.station_count = None
+        for filename in files:
+            eamap = WeaMap(filename)
+            if self.records is None:
+                self.records, self.station_count = eamap.records, eamap.station_count
+            elif (eamap.records, eamap.station_count) != (self.records, self.station_count):
+                raise ValueError('ファイルの形式(EA, EA2020)、地点数が一致しません。\nファイル：{0}'.format(filename))
+
+            code = int(eamap.blocks[0, 0, 2]) #[1]地点の[0]レコードヘッダーの年
+            year = header_year(code) if year_of is None else int(year_of(filename, code))
+            if year in self.files:
+                raise ValueError('{0}年のファイルが重複しています。\nファイル：{1}\n　　　　　{2}'.format(
+                    year, self.files[year], filename))
+            self.files[year] = filename
+
+        if self.records == EA_RECORDS:
+            self.elements = EA_ELEMENTS
+            self.scale_factors = EA_SCALE_FACTORS
+        else:
+            self.elements = EA2020_ELEMENTS
+            self.scale_factors = EA2020_SCALE_FACTORS
+
+    @property
+    def years(self):
+        """
+        Get the sorted list of years.\n
+        索引した年（昇順）のリストを返す
+        """
+        return sorted(self.files)
+
+    def weamap(self, year):
+        """
+        指定された年のファイルのメモリマップ(WeaMap)を返す（初回の参照時にマップする）
+        """
+        eamap = self.__maps.get(year)
+        if eamap is None:
+            if year not in self.files:
+                raise ValueError('{0}年のファイルがありません'.format(year))
+            eamap = WeaMap(self.files[year], self.records)
+            self.__maps[year] = eamap
+        return eamap
+
+    def period(self, start=None, end=None):
+        """
+        期間の年のリストを返す（途中の年のファイルが無い場合はValueError）
+
+        Parameters
+        ----------
+        start, end : int
+        最初、最後の年（endを含む）。省略時は索引した最初、最後の年
+        """
+        years = self.years
+        start = years[0] if start is None else start
+        end = years[-1] if end is None else end
+        missing = [year for year in range(start, end + 1) if year not in self.files]
+        if start > end or missing:
+            raise ValueError('{0}～{1}年のうち、ファイルの無い年があります: {2}'.format(start, end, missing))
+        return list(range(start, end + 1))
+
+    def times(self, start=None, end=None):
+        """
+        期間の1時間毎の日時を返す
+
+        Returns
+        ----------
+        times : ndarray
+        datetime64[s]の配列（各年の1月1日1時～翌年1月1日0時）
+        """
+        return np.concatenate([timestamps(year, hours_in_year(year)) for year in self.period(start, end)])
+
+    def __decode(self, year, no, elements, elevation, dtype):
+        """
+        1年分の指定された気象要素をデコードする, shape (要素, 時間)
+        """
+        eamap = self.weamap(year)
+        codes = element_codes(eamap.block(no)[eamap.first_element:], hours_in_year(year))
+
+        def element(k):
+            return convert_units(decode_values(codes[k], self.scale_factors[k], dtype), k)
+
+        vals = np.empty((len(elements), codes.shape[-1]), dtype=dtype)
+        for i, name in enumerate(elements):
+            k = self.elements.index(name)
+            if k < len(codes):
+                vals[i] = element(k)
+            else:
+                #EAは絶対湿度、気温、標高から相対湿度を計算する
+                from .weafile import calc_relative_humidity
+                vals[i] = calc_relative_humidity(element(1) / 1000.0, element(0), elevation)
+        return vals
+
+    def station_values(self, no, start=None, end=None, elements=None, elevation=None, dtype=np.float64):
+        """
+        指定された地点の期間の気象データを、年を連結した配列で返す
+
+        Parameters
+        ----------
+        no : int
+        拡張アメダスの地点番号[1-842]
+
+        start, end : int
+        最初、最後の年（endを含む）。省略時は索引した最初、最後の年
+
+        elements : list of str
+        気象要素のプロパティ名(weamap.EA_ELEMENTS, EA2020_ELEMENTS)。省略時は全要素
+
+        elevation : float
+        標高[m]。EAの相対湿度の計算に使用する。省略時は地点情報(stationindex.ea_stations)の標高
+
+        dtype : data-type
+        値の型(np.float64, np.float32)
+
+        Returns
+        ----------
+        vals : ndarray
+        dtypeの配列, shape (要素, 期間の時間数)
+
+        times : ndarray
+        datetime64[s]の日時, shape (期間の時間数,)
+        """
+        elements = list(self.elements if elements is None else elements)
+        unknown = [name for name in elements if name not in self.elements]
+        if unknown:
+            raise ValueError('気象要素は{0}のいずれかを指定してください: {1}'.format(list(self.elements), unknown))
+        if elevation is None and self.records == EA_RECORDS and 'relative_humidities' in elements:
+            from .stationindex import find_ea_stations
+            elevation = float(find_ea_stations([no])['elevation'][0]) #地点情報に無い場合はValueError
+
+        years = self.period(start, end)
+        vals = np.concatenate([self.__decode(year, no, elements, elevation, dtype) for year in years], axis=1)
+        return vals, self.times(years[0], years[-1])
+
+    def values(self, element, no, start=None, end=None, elevation=None, dtype=np.float64):
+        """
+        指定された地点、気象要素の期間の値を返す
+
+        Returns
+        ----------
+        vals : ndarray
+        dtypeの配列, shape (期間の時間数,)
+
+        times : ndarray
+        datetime64[s]の日時, shape (期間の時間数,)
+        """
+        vals, times = self.station_values(no, start, end, [element], elevation, dtype)
+        return vals[0], times